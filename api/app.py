@@ -1,22 +1,59 @@
-from fastapi import FastAPI, HTTPException, status
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+import orjson
 import uvicorn
 
+from typing import Optional
 from api.models import QueryRequest, QueryResponse, DocumentResponse, HealthResponse
-from src.graph import app as rag_app
-from src.retrieval import VectorRetriever
+from src.graph import get_app
+from src.nodes import retriever as shared_retriever, aclassify_intent
+from src.embeddings import embedding_model
+from src.intent_classifier import get_intent_classifier
+from src.semantic_cache import SemanticCache
 from src.exceptions import RAGException
 from src.logger import setup_logger
+import config
 
 logger = setup_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Share the graph's VectorRetriever for the app lifetime
+    
+    The retriever (Qdrant client + embedding model) is built once when the
+    graph is imported; health checks reuse it instead of reconnecting.
+    """
+    app.state.retriever = shared_retriever
+    get_app()  # Compile the graph at startup, not on the first request
+    if config.WARMUP_ENABLED:
+        await asyncio.to_thread(embedding_model.warmup)
+        if config.EMBEDDING_INTENT_ENABLED:
+            await asyncio.to_thread(get_intent_classifier)  # Embed the intent prototypes up front
+        await shared_retriever.awarmup()
+    app.state.semantic_cache = None
+    if config.SEMANTIC_CACHE_ENABLED:
+        try:
+            app.state.semantic_cache = SemanticCache(
+                shared_retriever.client, async_client=shared_retriever.async_client
+            )
+        except Exception as e:
+            logger.warning(f"Semantic cache unavailable, continuing without it: {str(e)}")
+    logger.info("API startup complete, shared retriever attached")
+    yield
+
+
 app = FastAPI(
     title="Government Schemes RAG API",
     description="Multi-agent RAG system for Indian government schemes",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS
@@ -40,10 +77,10 @@ async def root():
 
 
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint"""
     try:
-        retriever = VectorRetriever()
+        await request.app.state.retriever.async_client.get_collections()
         qdrant_connected = True
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
@@ -56,37 +93,84 @@ async def health_check():
     )
 
 
+def _build_response(result: dict, query: str, top_k: Optional[int] = None) -> QueryResponse:
+    """Convert final RAG state into a QueryResponse (all docs if top_k is None)"""
+    docs = []
+    for doc in result.get("retrieved_docs") or []:
+        payload = doc["payload"]
+        docs.append(DocumentResponse(
+            id=str(doc["id"]),
+            score=doc["score"],
+            scheme_name=payload.get("scheme_name", "Unknown"),
+            theme=payload.get("theme", "Unknown"),
+            text=payload.get("text", ""),
+            official_url=payload.get("official_url")
+        ))
+    
+    return QueryResponse(
+        query=result.get("query", query),
+        intent=result.get("intent", "GENERAL"),
+        answer=result.get("answer", ""),
+        retrieved_docs=docs[:top_k],
+        needs_reflection=result.get("needs_reflection", False),
+        needs_correction=result.get("needs_correction", False)
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format a Server-Sent Event"""
+    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+
+
+async def _cache_response(cache: SemanticCache, query_vector, response: QueryResponse):
+    """Store a response in the semantic cache and drop expired entries (async Qdrant client)"""
+    try:
+        await cache.astore(query_vector, response.model_dump())
+        await cache.apurge_expired()
+    except Exception as e:
+        logger.warning(f"Semantic cache write failed: {str(e)}")
+
+
 @app.post("/query", response_model=QueryResponse, tags=["RAG"])
-async def query_schemes(request: QueryRequest):
+async def query_schemes(request: QueryRequest, http_request: Request, background_tasks: BackgroundTasks):
     """Query government schemes"""
     try:
         logger.info(f"Received query: {request.query}")
         
+        # Semantic cache lookup (paraphrases of recent queries)
+        cache = http_request.app.state.semantic_cache
+        query_vector = None
+        intent = None
+        if cache is not None:
+            try:
+                # Encoding is CPU-bound: keep it off the event loop
+                query_vector = await asyncio.to_thread(embedding_model.embed_query, request.query)
+                # Near-identical embeddings can ask different things ("eligibility for X"
+                # vs "benefits of X"): only reuse answers given for the same intent.
+                # On a miss the intent is handed to the graph, which then skips classification.
+                intent = await aclassify_intent(request.query, query_vector)
+                cached = await cache.alookup(query_vector, intent=intent)
+                if cached is not None:
+                    response = QueryResponse(**cached)
+                    response.retrieved_docs = response.retrieved_docs[:request.top_k]
+                    logger.info(f"Query served from semantic cache. Intent: {response.intent}")
+                    return response
+            except Exception as e:
+                logger.warning(f"Semantic cache lookup failed: {str(e)}")
+        
         # Run RAG pipeline
-        result = rag_app.invoke({
-            "query": request.query
+        result = await get_app().ainvoke({
+            "query": request.query,
+            "query_embedding": query_vector,  # Reuse the cache-lookup embedding if computed
+            "intent": intent
         })
         
-        # Format response
-        docs = []
-        for doc in result.get("retrieved_docs", []):
-            payload = doc["payload"]
-            docs.append(DocumentResponse(
-                id=str(doc["id"]),
-                score=doc["score"],
-                scheme_name=payload.get("scheme_name", "Unknown"),
-                theme=payload.get("theme", "Unknown"),
-                text=payload.get("text", ""),
-                official_url=payload.get("official_url")
-            ))
+        full_response = _build_response(result, request.query)
+        if cache is not None and query_vector is not None:
+            background_tasks.add_task(_cache_response, cache, query_vector, full_response)
         
-        response = QueryResponse(
-            query=result.get("query", request.query),
-            intent=result.get("intent", "GENERAL"),
-            answer=result.get("answer", ""),
-            retrieved_docs=docs[:request.top_k],
-            needs_reflection=result.get("needs_reflection", False),
-            needs_correction=result.get("needs_correction", False)
+        response = full_response.model_copy(
+            update={"retrieved_docs": full_response.retrieved_docs[:request.top_k]}
         )
         
         logger.info(f"Query processed successfully. Intent: {response.intent}")
@@ -106,6 +190,58 @@ async def query_schemes(request: QueryRequest):
         )
 
 
+@app.post("/query/stream", tags=["RAG"])
+async def query_schemes_stream(request: QueryRequest):
+    """Query government schemes, streaming progress as Server-Sent Events
+    
+    Events:
+        intent:    classified intent
+        documents: retrieved documents (re-sent after reflection/correction)
+        token:     answer token from the generation LLM
+        answer:    complete answer (re-sent if corrective RAG regenerates it)
+        done:      final QueryResponse payload
+        error:     processing failed
+    """
+    logger.info(f"Received streaming query: {request.query}")
+    
+    async def event_stream():
+        state = {"query": request.query}
+        try:
+            async for mode, chunk in get_app().astream(
+                # Tokens are forwarded from the answer node only, so no speculative draft
+                {"query": request.query, "speculative_answer": False},
+                stream_mode=["updates", "messages"]
+            ):
+                if mode == "messages":
+                    message, metadata = chunk
+                    if metadata.get("langgraph_node") == "answer" and message.content:
+                        yield _sse("token", {"content": message.content})
+                    continue
+                
+                for node, update in chunk.items():
+                    if not update:
+                        continue
+                    state.update(update)
+                    if "intent" in update:
+                        yield _sse("intent", {"intent": update["intent"]})
+                    if "retrieved_docs" in update:
+                        docs = _build_response(state, request.query, request.top_k).retrieved_docs
+                        yield _sse("documents", {"documents": [d.model_dump() for d in docs]})
+                    if "answer" in update:
+                        yield _sse("answer", {"answer": update["answer"]})
+            
+            response = _build_response(state, request.query, request.top_k)
+            logger.info(f"Streaming query processed successfully. Intent: {response.intent}")
+            yield _sse("done", response.model_dump())
+            
+        except Exception as e:
+            logger.error(f"Streaming query failed: {str(e)}")
+            detail = f"RAG processing failed: {str(e)}" if isinstance(e, RAGException) else "Internal server error"
+            yield _sse("error", {"detail": detail})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.exception_handler(RAGException)
 async def rag_exception_handler(request, exc):
     """Handle RAG exceptions"""
@@ -120,6 +256,6 @@ if __name__ == "__main__":
         "api.app:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=config.ENVIRONMENT == "development",
         log_level="info"
     )
@@ -9,9 +9,16 @@ __all__ = [
     'GROQ_API_KEY',
     'QDRANT_URL',
     'QDRANT_API_KEY',
+    'QDRANT_POOL_SIZE',
+    'QDRANT_GRPC_OPTIONS',
     'OLLAMA_BASE_URL',
     'EMBEDDING_MODEL',
+    'MODEL_CACHE_DIR',
+    'EMBEDDING_BACKEND',
+    'EMBEDDING_MODEL_FILE',
+    'EMBEDDING_INT8',
     'OLLAMA_MODEL',
+    'OLLAMA_KEEP_ALIVE',
     'GROQ_MODEL',
     'CHUNKING_MODEL',
     'TEMPERATURE',
@@ -19,8 +26,15 @@ __all__ = [
     'TOP_K',
     'MIN_SIMILARITY_SCORE',
     'INTENT_LABELS',
+    'INTENT_LABEL_SET',
+    'EMBEDDING_INTENT_ENABLED',
+    'ENVIRONMENT',
     'LOG_LEVEL',
     'LOG_FORMAT',
     'MAX_REFLECTION_ITERATIONS',
-    'MAX_CORRECTION_ITERATIONS'
+    'MAX_CORRECTION_ITERATIONS',
+    'PARALLEL_INTENT_RETRIEVAL',
+    'SPECULATIVE_ANSWER',
+    'BATCH_JUDGES',
+    'JUDGE_SHORTCUTS_ENABLED'
 ]
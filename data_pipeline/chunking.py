@@ -1,6 +1,9 @@
 """LLM-powered intelligent chunking for government schemes"""
+import asyncio
 import json
+import orjson
 from typing import List, Dict
+from tqdm import tqdm
 from langchain_community.chat_models import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
 import data_pipeline.config as config
@@ -13,7 +16,8 @@ class LLMChunker:
         self.llm = ChatOllama(
             model=config.CHUNKING_MODEL,
             temperature=config.TEMPERATURE,
-            base_url=config.OLLAMA_BASE_URL
+            base_url=config.OLLAMA_BASE_URL,
+            format="json"  # Constrained decoding: response is always valid JSON
         )
         self.chunking_prompt = self._build_prompt()
     
@@ -23,7 +27,8 @@ class LLMChunker:
             ("system", 
              f"You are a government scheme analyzer. Given scheme text, split it into "
              f"logical chunks based on these themes: {', '.join(config.THEME_CATEGORIES)}.\n"
-             f"Return ONLY a JSON array of chunks with 'theme' and 'text' keys.\n"
+             f"Return ONLY a JSON object of the form {{{{\"chunks\": [...]}}}} where each "
+             f"chunk has 'theme' and 'text' keys.\n"
              f"Keep chunks between {config.MIN_CHUNK_SIZE}-{config.MAX_CHUNK_SIZE} tokens."),
             ("human", 
              "Scheme Name: {scheme_name}\n"
@@ -31,66 +36,90 @@ class LLMChunker:
              "Scheme Text:\n{text}")
         ])
     
+    def _prompt_inputs(self, scheme_data: Dict) -> Dict:
+        """Build prompt variables for a scheme"""
+        return {
+            "scheme_name": scheme_data.get("scheme_name", "Unknown"),
+            "official_url": scheme_data.get("official_url", ""),
+            "text": scheme_data.get("text", "")
+        }
+    
+    def _parse_chunks(self, scheme_data: Dict, content: str) -> List[Dict]:
+        """Parse LLM response and add scheme metadata to each chunk"""
+        data = orjson.loads(content)
+        chunks = data.get("chunks", []) if isinstance(data, dict) else data
+        
+        enriched_chunks = []
+        for chunk in chunks:
+            enriched_chunks.append({
+                "scheme_name": scheme_data.get("scheme_name"),
+                "official_url": scheme_data.get("official_url"),
+                "ministry": scheme_data.get("ministry"),
+                "theme": chunk.get("theme", "general"),
+                "text": chunk.get("text", "")
+            })
+        
+        return enriched_chunks
+    
+    def _fallback_chunk(self, scheme_data: Dict, error: Exception) -> List[Dict]:
+        """Single-chunk fallback when LLM chunking fails"""
+        tqdm.write(f"Error chunking scheme {scheme_data.get('scheme_name')}: {str(error)}")
+        return [{
+            "scheme_name": scheme_data.get("scheme_name"),
+            "official_url": scheme_data.get("official_url"),
+            "ministry": scheme_data.get("ministry"),
+            "theme": "general",
+            "text": scheme_data.get("text", "")
+        }]
+    
     def chunk_scheme(self, scheme_data: Dict) -> List[Dict]:
         """Chunk a single scheme using LLM"""
         try:
             chain = self.chunking_prompt | self.llm
-            result = chain.invoke({
-                "scheme_name": scheme_data.get("scheme_name", "Unknown"),
-                "official_url": scheme_data.get("official_url", ""),
-                "text": scheme_data.get("text", "")
-            })
-            
-            # Parse LLM response
-            chunks_json = self._extract_json(result.content)
-            chunks = json.loads(chunks_json)
-            
-            # Add metadata to each chunk
-            enriched_chunks = []
-            for chunk in chunks:
-                enriched_chunks.append({
-                    "scheme_name": scheme_data.get("scheme_name"),
-                    "official_url": scheme_data.get("official_url"),
-                    "ministry": scheme_data.get("ministry"),
-                    "theme": chunk.get("theme", "general"),
-                    "text": chunk.get("text", "")
-                })
-            
-            return enriched_chunks
-        
+            result = chain.invoke(self._prompt_inputs(scheme_data))
+            return self._parse_chunks(scheme_data, result.content)
         except Exception as e:
-            print(f"Error chunking scheme {scheme_data.get('scheme_name')}: {str(e)}")
-            # Fallback: create single chunk
-            return [{
-                "scheme_name": scheme_data.get("scheme_name"),
-                "official_url": scheme_data.get("official_url"),
-                "ministry": scheme_data.get("ministry"),
-                "theme": "general",
-                "text": scheme_data.get("text", "")
-            }]
+            return self._fallback_chunk(scheme_data, e)
     
-    def _extract_json(self, text: str) -> str:
-        """Extract JSON from LLM response"""
-        # Find JSON array in response
-        start = text.find("[")
-        end = text.rfind("]")
-        if start != -1 and end != -1:
-            return text[start:end+1]
-        return text
+    async def achunk_scheme(self, scheme_data: Dict) -> List[Dict]:
+        """Chunk a single scheme using LLM (async)"""
+        try:
+            chain = self.chunking_prompt | self.llm
+            result = await chain.ainvoke(self._prompt_inputs(scheme_data))
+            return self._parse_chunks(scheme_data, result.content)
+        except Exception as e:
+            return self._fallback_chunk(scheme_data, e)
     
-    def chunk_schemes_batch(self, schemes: List[Dict]) -> List[Dict]:
-        """Chunk multiple schemes"""
-        all_chunks = []
+    async def achunk_schemes_batch(self, schemes: List[Dict], concurrency: int = None) -> List[Dict]:
+        """Chunk multiple schemes concurrently
+        
+        Chunking is bound by the Ollama round-trip, so requests are fired
+        concurrently up to `concurrency` in flight. Output order matches input.
+        """
+        concurrency = concurrency or config.CHUNKING_CONCURRENCY
+        semaphore = asyncio.Semaphore(concurrency)
         total = len(schemes)
         
-        for idx, scheme in enumerate(schemes):
-            print(f"Chunking scheme {idx+1}/{total}: {scheme.get('scheme_name', 'Unknown')}")
-            chunks = self.chunk_scheme(scheme)
-            all_chunks.extend(chunks)
+        async def run(idx: int, scheme: Dict):
+            async with semaphore:
+                return idx, await self.achunk_scheme(scheme)
+        
+        tasks = [run(idx, scheme) for idx, scheme in enumerate(schemes)]
+        results: List[List[Dict]] = [[] for _ in schemes]
+        
+        for future in tqdm(asyncio.as_completed(tasks), total=total, desc="Chunking"):
+            idx, chunks = await future
+            results[idx] = chunks
+        
+        all_chunks = [chunk for chunks in results for chunk in chunks]
         
         print(f"\nTotal schemes: {total}")
         print(f"Total chunks created: {len(all_chunks)}")
         return all_chunks
+    
+    def chunk_schemes_batch(self, schemes: List[Dict], concurrency: int = None) -> List[Dict]:
+        """Chunk multiple schemes"""
+        return asyncio.run(self.achunk_schemes_batch(schemes, concurrency))
 
 
 if __name__ == "__main__":
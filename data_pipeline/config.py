@@ -16,10 +16,23 @@ __all__ = [
     'CHUNKING_MODEL',
     'TEMPERATURE',
     'EMBEDDING_MODEL',
+    'EMBEDDING_BATCH_SIZE',
+    'MODEL_CACHE_DIR',
     'QDRANT_URL',
     'QDRANT_API_KEY',
+    'QDRANT_POOL_SIZE',
+    'QDRANT_GRPC_OPTIONS',
     'COLLECTION_NAME',
+    'QUANTIZATION_TYPE',
+    'QUANTIZATION_QUANTILE',
+    'VECTORS_ON_DISK',
+    'PAYLOAD_INDEX_FIELDS',
+    'HNSW_M',
+    'HNSW_EF_CONSTRUCT',
+    'SPARSE_BM25_ENABLED',
+    'SPARSE_VECTOR_NAME',
     'THEME_CATEGORIES',
     'MAX_CHUNK_SIZE',
-    'MIN_CHUNK_SIZE'
+    'MIN_CHUNK_SIZE',
+    'CHUNKING_CONCURRENCY'
 ]
@@ -1,10 +1,41 @@
 """Index chunks into Qdrant vector database"""
+import hashlib
 import uuid
 from typing import List, Dict
+import numpy as np
+import torch
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import (
+    Distance, VectorParams, Datatype, HnswConfigDiff, OptimizersConfigDiff,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, SparseVectorParams, Modifier,
+    BinaryQuantization, BinaryQuantizationConfig, PayloadSchemaType
+)
 from sentence_transformers import SentenceTransformer
 import data_pipeline.config as config
+from src.sparse_vectors import MMH3_AVAILABLE, bm25_document_text, document_sparse_vector
+
+# Payload fields stored per chunk, with defaults for missing keys
+PAYLOAD_DEFAULTS = {
+    "scheme_name": "Unknown",
+    "official_url": "",
+    "ministry": "",
+    "theme": "general",
+    "text": ""
+}
+
+
+def chunk_point_id(chunk: Dict) -> str:
+    """Deterministic point ID from chunk content
+    
+    Re-ingesting the same chunk overwrites its point instead of duplicating it.
+    """
+    key = "\x1f".join((
+        chunk.get("scheme_name") or "Unknown",
+        chunk.get("theme") or "general",
+        chunk.get("text") or ""
+    ))
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return str(uuid.UUID(digest))
 
 
 class QdrantIndexer:
@@ -12,15 +43,45 @@ class QdrantIndexer:
     
     def __init__(self):
         print("Connecting to Qdrant...")
+        # gRPC avoids per-request HTTP/JSON overhead during bulk upload
         self.client = QdrantClient(
             url=config.QDRANT_URL,
-            api_key=config.QDRANT_API_KEY
+            api_key=config.QDRANT_API_KEY,
+            prefer_grpc=True,
+            grpc_options=config.QDRANT_GRPC_OPTIONS,
+            pool_size=config.QDRANT_POOL_SIZE
         )
         
         print(f"Loading embedding model: {config.EMBEDDING_MODEL}")
-        self.embedding_model = SentenceTransformer(config.EMBEDDING_MODEL)
+        self.embedding_model = SentenceTransformer(
+            config.EMBEDDING_MODEL,
+            cache_folder=config.MODEL_CACHE_DIR
+        )
+        if torch.cuda.is_available():
+            # FP16 roughly doubles encode throughput on tensor-core GPUs
+            self.embedding_model = self.embedding_model.to(torch.device("cuda")).half()
+            print("Embedding model running in FP16 on GPU")
         self.dimension = self.embedding_model.get_sentence_embedding_dimension()
         print(f"Embedding dimension: {self.dimension}")
+        
+        # Hashed BM25 sparse vectors next to the (unnamed) dense vector
+        self.sparse_enabled = config.SPARSE_BM25_ENABLED and MMH3_AVAILABLE
+        if config.SPARSE_BM25_ENABLED and not MMH3_AVAILABLE:
+            print("SPARSE_BM25_ENABLED is set but mmh3 is not installed; indexing dense vectors only")
+    
+    def _quantization_config(self):
+        """Quantized in-RAM copy of the vectors; Qdrant rescores with the originals"""
+        if config.QUANTIZATION_TYPE == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        if config.QUANTIZATION_TYPE != "int8":
+            print(f"Unknown QUANTIZATION_TYPE '{config.QUANTIZATION_TYPE}', using int8")
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8,
+                quantile=config.QUANTIZATION_QUANTILE,
+                always_ram=True
+            )
+        )
     
     def create_collection(self):
         """Create Qdrant collection"""
@@ -43,59 +104,112 @@ class QdrantIndexer:
                 collection_name=config.COLLECTION_NAME,
                 vectors_config=VectorParams(
                     size=self.dimension,
-                    distance=Distance.COSINE
+                    distance=Distance.COSINE,
+                    datatype=Datatype.FLOAT16,  # Half-precision storage for original vectors
+                    on_disk=config.VECTORS_ON_DISK  # Memmapped originals, used only for rescoring
+                ),
+                # Server-side BM25: documents store TF weights, Qdrant applies IDF at query time
+                sparse_vectors_config={
+                    config.SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)
+                } if self.sparse_enabled else None,
+                # int8 (4x) or binary (32x) quantization: less vector RAM, faster scoring;
+                # queries oversample + rescore with the original vectors (SEARCH_PARAMS)
+                quantization_config=self._quantization_config(),
+                hnsw_config=HnswConfigDiff(
+                    m=config.HNSW_M,
+                    ef_construct=config.HNSW_EF_CONSTRUCT,
+                    on_disk=False
+                ),
+                # Chunk text lives in the payload; keep it on disk, quantized vectors in RAM
+                on_disk_payload=True,
+                optimizers_config=OptimizersConfigDiff(
+                    default_segment_number=2,
+                    memmap_threshold=20000
+                )
+            )
+            
+            # Filtered search resolves scheme/theme conditions through these indexes
+            for field in config.PAYLOAD_INDEX_FIELDS:
+                self.client.create_payload_index(
+                    collection_name=config.COLLECTION_NAME,
+                    field_name=field,
+                    field_schema=PayloadSchemaType.KEYWORD
                 )
+            print(
+                f"Created collection: {config.COLLECTION_NAME} ({config.QUANTIZATION_TYPE} quantization"
+                f"{', sparse BM25' if self.sparse_enabled else ''})"
             )
-            print(f"Created collection: {config.COLLECTION_NAME}")
         
         except Exception as e:
             print(f"Error creating collection: {str(e)}")
             raise
     
-    def embed_chunks(self, chunks: List[Dict]) -> List[List[float]]:
-        """Generate embeddings for chunks"""
+    def embed_chunks(self, chunks: List[Dict], show_progress_bar: bool = True) -> np.ndarray:
+        """Generate embeddings for chunks
+        
+        Returns a (n_chunks, dimension) float32 array. Rows are converted to
+        lists only at upload time to avoid holding a duplicate Python copy.
+        """
         texts = [chunk["text"] for chunk in chunks]
-        print(f"Generating embeddings for {len(texts)} chunks...")
+        if show_progress_bar:
+            print(f"Generating embeddings for {len(texts)} chunks...")
         
         embeddings = self.embedding_model.encode(
             texts,
+            batch_size=config.EMBEDDING_BATCH_SIZE,
             normalize_embeddings=True,
-            show_progress_bar=True
+            convert_to_numpy=True,
+            show_progress_bar=show_progress_bar
+        )
+        return embeddings
+    
+    def upload_chunks(
+        self,
+        chunks: List[Dict],
+        embeddings: np.ndarray,
+        batch_size: int = 256,
+        parallel: int = 1
+    ):
+        """Upload pre-computed chunk embeddings with their payloads"""
+        ids = [chunk_point_id(chunk) for chunk in chunks]
+        defaults = PAYLOAD_DEFAULTS.items()
+        payloads = [
+            {key: chunk.get(key, default) for key, default in defaults}
+            for chunk in chunks
+        ]
+        
+        vectors = embeddings
+        if self.sparse_enabled:
+            # "" is the unnamed dense vector
+            vectors = [
+                {"": dense.tolist(), config.SPARSE_VECTOR_NAME: document_sparse_vector(bm25_document_text(payload))}
+                for dense, payload in zip(embeddings, payloads)
+            ]
+        
+        self.client.upload_collection(
+            collection_name=config.COLLECTION_NAME,
+            vectors=vectors,
+            payload=payloads,
+            ids=ids,
+            batch_size=batch_size,
+            parallel=parallel,
+            wait=False
         )
-        return embeddings.tolist()
     
-    def index_chunks(self, chunks: List[Dict], batch_size: int = 100):
-        """Index chunks into Qdrant"""
+    def index_chunks(self, chunks: List[Dict], batch_size: int = 256, parallel: int = 4):
+        """Index chunks into Qdrant
+        
+        Uses upload_collection so the client batches, parallelizes and retries
+        uploads itself instead of building one PointStruct per chunk.
+        """
         print(f"Indexing {len(chunks)} chunks...")
         
         # Generate embeddings
         embeddings = self.embed_chunks(chunks)
         
-        # Create points
-        points = []
-        for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            point = PointStruct(
-                id=str(uuid.uuid4()),
-                vector=embedding,
-                payload={
-                    "scheme_name": chunk.get("scheme_name", "Unknown"),
-                    "official_url": chunk.get("official_url", ""),
-                    "ministry": chunk.get("ministry", ""),
-                    "theme": chunk.get("theme", "general"),
-                    "text": chunk.get("text", "")
-                }
-            )
-            points.append(point)
-        
-        # Upload in batches
-        total = len(points)
-        for i in range(0, total, batch_size):
-            batch = points[i:i+batch_size]
-            self.client.upsert(
-                collection_name=config.COLLECTION_NAME,
-                points=batch
-            )
-            print(f"Uploaded batch {i//batch_size + 1}/{(total-1)//batch_size + 1}")
+        total = len(chunks)
+        print(f"Uploading {total} points (batch_size={batch_size}, parallel={parallel})...")
+        self.upload_chunks(chunks, embeddings, batch_size=batch_size, parallel=parallel)
         
         print(f"\n✓ Successfully indexed {total} chunks into Qdrant!")
     
@@ -1,16 +1,28 @@
 #!/usr/bin/env python3
-"""Complete data pipeline: Load -> Chunk -> Index"""
-import json
+"""Complete data pipeline: Load -> Chunk -> Index
+
+Chunking, embedding and upload run as overlapping stages connected by
+bounded queues, so wall time approaches the slowest stage rather than the
+sum of all three.
+"""
+import asyncio
+import orjson
 from pathlib import Path
+from tqdm import tqdm
 from chunking import LLMChunker
 from indexing import QdrantIndexer
+import data_pipeline.config as config
+
+# Bounded queues apply back-pressure when a downstream stage falls behind
+CHUNK_QUEUE_SIZE = 256
+UPLOAD_QUEUE_SIZE = 4
 
 
 def load_schemes_from_json(file_path: str):
     """Load schemes from JSON file"""
     print(f"Loading schemes from {file_path}...")
-    with open(file_path, 'r', encoding='utf-8') as f:
-        schemes = json.load(f)
+    with open(file_path, 'rb') as f:
+        schemes = orjson.loads(f.read())
     print(f"Loaded {len(schemes)} schemes")
     return schemes
 
@@ -18,11 +30,71 @@ def load_schemes_from_json(file_path: str):
 def save_chunks(chunks, output_path: str):
     """Save chunks to JSON file"""
     print(f"Saving chunks to {output_path}...")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(chunks, f, indent=2, ensure_ascii=False)
+    with open(output_path, 'wb') as f:
+        f.write(orjson.dumps(chunks, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     print(f"Saved {len(chunks)} chunks")
 
 
+async def chunk_embed_upload(schemes, chunker: LLMChunker, indexer: QdrantIndexer):
+    """Run chunking -> embedding -> upload as concurrent producer/consumer stages
+    
+    Returns:
+        List of all chunks created (order follows chunking completion)
+    """
+    loop = asyncio.get_running_loop()
+    chunk_queue = asyncio.Queue(maxsize=CHUNK_QUEUE_SIZE)
+    upload_queue = asyncio.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+    all_chunks = []
+    total = len(schemes)
+    
+    async def chunk_stage():
+        semaphore = asyncio.Semaphore(config.CHUNKING_CONCURRENCY)
+        progress = tqdm(total=total, desc="Chunking", unit="scheme")
+        
+        async def chunk_one(scheme):
+            async with semaphore:
+                chunks = await chunker.achunk_scheme(scheme)
+            for chunk in chunks:
+                await chunk_queue.put(chunk)
+            progress.update(1)
+        
+        try:
+            await asyncio.gather(*(chunk_one(scheme) for scheme in schemes))
+        finally:
+            progress.close()
+            await chunk_queue.put(None)
+    
+    async def embed_stage():
+        batch = []
+        while True:
+            chunk = await chunk_queue.get()
+            if chunk is not None:
+                batch.append(chunk)
+                all_chunks.append(chunk)
+            
+            if batch and (chunk is None or len(batch) >= config.EMBEDDING_BATCH_SIZE):
+                embeddings = await loop.run_in_executor(None, indexer.embed_chunks, batch, False)
+                await upload_queue.put((batch, embeddings))
+                batch = []
+            
+            if chunk is None:
+                break
+        await upload_queue.put(None)
+    
+    async def upload_stage():
+        with tqdm(desc="Uploading", unit="chunk") as progress:
+            while True:
+                item = await upload_queue.get()
+                if item is None:
+                    break
+                batch, embeddings = item
+                await loop.run_in_executor(None, indexer.upload_chunks, batch, embeddings)
+                progress.update(len(batch))
+    
+    await asyncio.gather(chunk_stage(), embed_stage(), upload_stage())
+    return all_chunks
+
+
 def run_pipeline(schemes_file: str, output_chunks_file: str = None):
     """Run complete pipeline"""
     print("="*60)
@@ -32,29 +104,22 @@ def run_pipeline(schemes_file: str, output_chunks_file: str = None):
     # Step 1: Load schemes
     schemes = load_schemes_from_json(schemes_file)
     
-    # Step 2: Chunk schemes using LLM
+    # Step 2: Prepare chunker and Qdrant collection
+    chunker = LLMChunker()
+    indexer = QdrantIndexer()
+    indexer.create_collection()
+    
+    # Step 3: Chunk, embed and index concurrently
     print("\n" + "="*60)
-    print("Step 1: LLM-Powered Chunking")
+    print("Chunking -> Embedding -> Indexing (pipelined)")
     print("="*60)
-    chunker = LLMChunker()
-    chunks = chunker.chunk_schemes_batch(schemes)
+    chunks = asyncio.run(chunk_embed_upload(schemes, chunker, indexer))
+    print(f"\n✓ Successfully indexed {len(chunks)} chunks into Qdrant!")
     
     # Save chunks if output path provided
     if output_chunks_file:
         save_chunks(chunks, output_chunks_file)
     
-    # Step 3: Index into Qdrant
-    print("\n" + "="*60)
-    print("Step 2: Qdrant Indexing")
-    print("="*60)
-    indexer = QdrantIndexer()
-    
-    # Create collection
-    indexer.create_collection()
-    
-    # Index chunks
-    indexer.index_chunks(chunks)
-    
     # Show stats
     indexer.get_collection_info()
     
@@ -63,7 +128,7 @@ def run_pipeline(schemes_file: str, output_chunks_file: str = None):
     print("="*60)
     print(f"Total schemes processed: {len(schemes)}")
     print(f"Total chunks created: {len(chunks)}")
-    print(f"Collection: {indexer.client.get_collection('myschemerag').collection_name}")
+    print(f"Collection: {config.COLLECTION_NAME}")
 
 
 if __name__ == "__main__":
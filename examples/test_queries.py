@@ -1,9 +1,9 @@
-from src.graph import app
+from src.graph import get_app
 
 
 def test_discovery():
     """Test scheme discovery intent"""
-    result = app.invoke({
+    result = get_app().invoke({
         "query": "what are the subsidy schemes for manufacturing?"
     })
     print(f"Intent: {result.get('intent')}")
@@ -13,7 +13,7 @@ def test_discovery():
 
 def test_eligibility():
     """Test eligibility check intent"""
-    result = app.invoke({
+    result = get_app().invoke({
         "query": "am I eligible for PMEGP if I'm 25 years old?"
     })
     print(f"Intent: {result.get('intent')}")
@@ -23,7 +23,7 @@ def test_eligibility():
 
 def test_benefits():
     """Test benefits query intent"""
-    result = app.invoke({
+    result = get_app().invoke({
         "query": "how much subsidy can I get from startup india?"
     })
     print(f"Intent: {result.get('intent')}")
@@ -1,13 +1,30 @@
 #!/usr/bin/env python3
-from src.graph import app
+from concurrent.futures import ThreadPoolExecutor
+from src.graph import get_app
+from src.embeddings import embedding_model
+import config
 
 
-def query_schemes(user_query: str):
+def query_schemes(user_query: str, query_embedding=None):
     """Query the RAG system"""
-    response = app.invoke({"query": user_query})
+    response = get_app().invoke({"query": user_query, "query_embedding": query_embedding})
     return response["answer"]
 
 
+def query_schemes_batch(user_queries: list, max_workers: int = None):
+    """Query the RAG system for several queries, embedding them in one batch
+    
+    Graph invocations are I/O-bound (Qdrant + LLM) and independent, so they
+    run concurrently on a thread pool. Answers are returned in input order.
+    """
+    if not user_queries:
+        return []
+    
+    embeddings = embedding_model.embed_queries(user_queries)
+    with ThreadPoolExecutor(max_workers=max_workers or len(user_queries)) as executor:
+        return list(executor.map(query_schemes, user_queries, embeddings))
+
+
 if __name__ == "__main__":
     # Example queries
     queries = [
@@ -22,8 +39,14 @@ if __name__ == "__main__":
     print("Government Schemes RAG System")
     print("=" * 60)
     
-    for query in queries:
+    if config.WARMUP_ENABLED:
+        from src.nodes import retriever
+        embedding_model.warmup()
+        retriever.warmup()
+    
+    answers = query_schemes_batch(queries)
+    
+    for query, answer in zip(queries, answers):
         print(f"\n\nQuery: {query}")
         print("-" * 60)
-        answer = query_schemes(query)
         print(answer)
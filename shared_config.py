@@ -1,5 +1,11 @@
-"""Shared configuration for all modules - Single source of truth"""
+"""Shared configuration for all modules - Single source of truth
+
+Settings are plain module constants read as config.X; lookup tables are
+read-only MappingProxyType views.
+"""
 import os
+from types import MappingProxyType
+from typing import Final, Mapping
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,17 +18,46 @@ QDRANT_URL = os.getenv("QDRANT_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 
+# development enables uvicorn auto-reload; use production behind gunicorn --preload
+ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+
 # ============================================
 # EMBEDDING CONFIGURATION
 # ============================================
 EMBEDDING_MODEL = "BAAI/bge-m3"
 EMBEDDING_DIMENSION = 1024  # BGE-M3 dimension
+# Model cache shared by all workers/runs (None -> HuggingFace default ~/.cache/huggingface)
+MODEL_CACHE_DIR = os.getenv("HF_HOME")
+# CPU inference backend: "torch", "onnx" (ONNX Runtime) or "openvino".
+# Non-torch backends need `pip install sentence-transformers[onnx]` / `[openvino]`
+# and are only used when no GPU is available.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+# Optional ONNX/OpenVINO file inside the model repo, e.g. an int8 export
+# "onnx/model_qint8_avx512_vnni.onnx"
+EMBEDDING_MODEL_FILE = os.getenv("EMBEDDING_MODEL_FILE")
+# Weight-only int8 compression when exporting to OpenVINO (needs optimum-intel + nncf)
+EMBEDDING_INT8 = os.getenv("EMBEDDING_INT8", "false").lower() == "true"
+EMBEDDING_BATCH_SIZE = 128  # Encode batch size for bulk indexing (default 32 underutilizes BGE-M3)
+
+# In-process LRU cache for query embeddings
+QUERY_EMBEDDING_CACHE_SIZE = 2000
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = 600
+QUERY_CACHE_STATS_INTERVAL = 500  # Log cache hit rate every N lookups
+BM25_CACHE_SIZE = 512  # Ranked BM25 hits per tokenized query
+BM25_CACHE_TTL_SECONDS = 3600  # Bounds staleness of server-side sparse hits after re-ingestion
+
+# Run one dummy encode + Qdrant call at startup so the first query doesn't pay
+# kernel initialization and connection setup (RAG_WARMUP=0 disables)
+WARMUP_ENABLED = os.getenv("RAG_WARMUP", "1") == "1"
 
 # ============================================
 # LLM MODELS - Hybrid Approach
 # ============================================
 # Ollama for adaptive/lightweight tasks (local, free)
 OLLAMA_MODEL = "phi3.5:3.8b"  # For intent, reflection, corrective queries
+# Keep the model (and the KV cache of the static system-prompt prefixes) resident
+# between requests; Ollama's default unloads it after 5 idle minutes
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
 CHUNKING_MODEL = "llama3.1:8b"   # For data pipeline chunking
 
 # Groq for heavy lifting (cloud, fast)
@@ -36,27 +71,60 @@ TEMPERATURE = 0.2
 # ============================================
 COLLECTION_NAME = "myscheme_rag"
 
+# Qdrant client connection pooling (REST keep-alive pool / gRPC channels)
+QDRANT_POOL_SIZE = 32
+QDRANT_GRPC_OPTIONS = {
+    "grpc.max_send_message_length": 100 * 1024 * 1024,
+    "grpc.max_receive_message_length": 100 * 1024 * 1024,
+    "grpc.keepalive_time_ms": 30000  # Keep the HTTP/2 channel warm between queries
+}
+# Vector quantization applied at collection creation: "int8" (scalar) or "binary"
+# (1 bit/dim, popcount distance; 32x smaller than float32 - suits 1024-dim BGE-M3)
+QUANTIZATION_TYPE = os.getenv("QUANTIZATION_TYPE", "int8").lower()
+QUANTIZATION_QUANTILE = 0.99  # int8 scalar quantization clipping quantile
+QUANTIZATION_OVERSAMPLING = 2.0  # Fetch 2x candidates from quantized index, rescore with originals
+VECTORS_ON_DISK = True  # Originals are only read to rescore the top candidates; quantized copies stay in RAM
+
+# Keyword payload indexes backing scheme/theme filters (created with the collection,
+# and verified at retriever startup)
+PAYLOAD_INDEX_FIELDS = ("scheme_name", "theme")
+
+# Whole-collection scrolls (BM25 index, scheme list): disjoint id ranges fetched concurrently
+SCROLL_SHARDS = 8
+SCROLL_PAGE_SIZE = 1000   # Points per scroll request (fewer round-trips per range)
+
+# Shared worker pool for BM25 scoring, scroll ranges and intent classification (src/thread_pool.py)
+THREAD_POOL_SIZE = int(os.getenv("RAG_POOL", "16"))
+# Separate pool for speculative answer drafts (sync graph): a full Groq generation that
+# cannot be interrupted must not occupy the shared pool meant for short leaf tasks
+DRAFT_POOL_SIZE = 4
+
+# HNSW index tuning
+HNSW_M = 32               # Graph degree (default 16)
+HNSW_EF_CONSTRUCT = 256   # Build-time beam width (default 100)
+HNSW_EF_SEARCH = 128      # Query-time beam width
+
 # Default top_k
 TOP_K = 5
 
-# Intent-specific top_k values (Production-Grade)
-INTENT_TOP_K = {
+# Intent-specific top_k values (Production-Grade, read-only)
+INTENT_TOP_K: Final[Mapping[str, int]] = MappingProxyType({
     "DISCOVERY": 10,      # Need more schemes for discovery
     "COMPARISON": 10,     # Need both entities well-represented
     "ELIGIBILITY": 5,     # Need focused, precise results
     "BENEFITS": 5,        # Need specific benefit information
     "PROCEDURE": 5,       # Need clear step-by-step info
     "GENERAL": 5          # Default moderate retrieval
-}
+})
 
 # Adaptive threshold configuration (replaces static MIN_SIMILARITY_SCORE)
 # See src/adaptive_threshold.py for implementation
-ADAPTIVE_THRESHOLD_CONFIG = {
+ADAPTIVE_THRESHOLD_CONFIG: Final[Mapping[str, float]] = MappingProxyType({
     "min_absolute_threshold": 0.3,     # Never go below this
     "std_dev_multiplier": 0.5,         # Threshold = mean - (std * this)
     "top_score_ratio": 0.7,            # Minimum ratio of top score
     "min_docs_required": 1             # Always return at least 1 doc if available
-}
+})
 
 # Legacy static threshold (deprecated, kept for backward compatibility)
 MIN_SIMILARITY_SCORE = 0.5  # Will be replaced by adaptive threshold
@@ -69,17 +137,104 @@ BM25_WEIGHT = 0.4           # Weight for keyword search
 SEMANTIC_WEIGHT = 0.6       # Weight for semantic search
 RRF_K = 60                  # Reciprocal Rank Fusion parameter
 
+# bm25s index persisted here and memory-mapped on restart (keyed by collection + point count)
+BM25_INDEX_DIR = os.getenv("BM25_INDEX_DIR", "logs/bm25_index")
+
+# Server-side keyword search: hashed BM25 sparse vectors stored next to the dense
+# vector (needs mmh3 and a collection re-indexed with the flag on). When the
+# collection has them, hybrid search sends both rankers in one Qdrant request
+# and no in-process BM25 index is built.
+SPARSE_BM25_ENABLED = os.getenv("SPARSE_BM25_ENABLED", "false").lower() == "true"
+SPARSE_VECTOR_NAME = "bm25"
+SPARSE_BM25_K1 = 1.2
+SPARSE_BM25_B = 0.75
+SPARSE_BM25_AVG_DOC_LEN = 256  # Fixed length normalizer; documents are encoded independently
+
+# Metadata-only fast path: scheme-filtered scroll + BM25, no query embedding
+METADATA_ONLY_INTENTS = frozenset({"ELIGIBILITY", "PROCEDURE"})
+METADATA_ONLY_MIN_CONFIDENCE = 0.9  # Decomposer confidence required to skip vector search
+METADATA_ONLY_SCROLL_LIMIT = 200    # Max scheme chunks scored with BM25
+
+# Stage 2 fallback: BM25 index over all docs of a scheme set, kept per scheme set
+SCHEME_BM25_CACHE_SIZE = 64
+SCHEME_BM25_CACHE_TTL_SECONDS = 3600  # Bounds staleness after re-ingestion
+# Build every single-scheme index during the metadata retriever's warmup so Stage 2 never builds on the request path
+SCHEME_BM25_PREBUILD = os.getenv("SCHEME_BM25_PREBUILD", "true").lower() == "true"
+
+# Formatted judge / answer prompt text per retrieved doc set
+FORMAT_CACHE_SIZE = 256
+FORMAT_CACHE_TTL_SECONDS = 600
+
+# ============================================
+# SEMANTIC CACHE
+# ============================================
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_COLLECTION = "query_cache"
+SEMANTIC_CACHE_THRESHOLD = 0.95            # Cosine similarity required for a hit
+SEMANTIC_CACHE_TTL_SECONDS = 7 * 24 * 3600  # Entries expire after 7 days
+
+# In-process judge caches: repeated intent / relevance / answer-quality verdicts skip the LLM
+JUDGE_CACHE_ENABLED = os.getenv("JUDGE_CACHE_ENABLED", "true").lower() == "true"
+JUDGE_CACHE_SIZE = 4096                    # Exact-input entries per judge (LRU)
+JUDGE_CACHE_TTL_SECONDS = 3600
+
 # ============================================
 # INTENT CLASSIFICATION
 # ============================================
-INTENT_LABELS = [
+INTENT_LABELS = (
     "DISCOVERY",      # find/search/show me schemes
     "ELIGIBILITY",    # am I eligible/who can apply/age limit
     "BENEFITS",       # how much/subsidy amount/loan/funding
     "COMPARISON",     # compare/difference between/vs
     "PROCEDURE",      # how to apply/steps/process/documents
     "GENERAL"         # fallback
-]
+)
+INTENT_LABEL_SET = frozenset(INTENT_LABELS)  # O(1) membership checks
+
+# Embedding-prototype classifier: a query whose nearest intent prototype beats the
+# runner-up by INTENT_CONFIDENCE_MARGIN (cosine) is labelled without the Ollama call.
+# Opt-in: check the margin against tests/test_intent_classifier.py (real embedding
+# model) after changing EMBEDDING_MODEL or INTENT_EXAMPLES, then enable.
+EMBEDDING_INTENT_ENABLED = os.getenv("EMBEDDING_INTENT_ENABLED", "false").lower() == "true"
+INTENT_CONFIDENCE_MARGIN = 0.08
+INTENT_EXAMPLES = {  # Prototype = normalized mean embedding of the label's examples
+    "DISCOVERY": (
+        "show me schemes for women entrepreneurs",
+        "which government schemes are available for farmers",
+        "find schemes for startups in manufacturing",
+        "list schemes for MSME loans",
+    ),
+    "ELIGIBILITY": (
+        "am I eligible for PMEGP",
+        "who can apply for Stand-Up India",
+        "what is the age limit for the Mudra loan scheme",
+        "eligibility criteria for PM Kisan",
+    ),
+    "BENEFITS": (
+        "how much subsidy do I get under PMEGP",
+        "what is the maximum loan amount under Mudra",
+        "what are the benefits of Stand-Up India",
+        "how much funding does the startup seed fund give",
+    ),
+    "COMPARISON": (
+        "compare PMEGP and Mudra loan",
+        "difference between Stand-Up India and Mudra",
+        "PM Kisan vs PM Fasal Bima Yojana",
+        "which is better for a small business, CGTMSE or Mudra",
+    ),
+    "PROCEDURE": (
+        "how to apply for PMEGP",
+        "what documents are required for a Mudra loan",
+        "steps to register for Stand-Up India",
+        "application process for PM Kisan",
+    ),
+    "GENERAL": (
+        "what is PMEGP",
+        "tell me about the Mudra scheme",
+        "who runs the Stand-Up India scheme",
+        "when was PM Kisan launched",
+    ),
+}
 
 # ============================================
 # DATA PIPELINE CONFIGURATION
@@ -97,12 +252,32 @@ THEME_CATEGORIES = [
 # Chunking Parameters
 MAX_CHUNK_SIZE = 500  # tokens
 MIN_CHUNK_SIZE = 50   # tokens
+CHUNKING_CONCURRENCY = 8  # Concurrent Ollama requests during chunking
 
 # ============================================
 # RAG WORKFLOW LIMITS
 # ============================================
 MAX_REFLECTION_ITERATIONS = 2  # Self-RAG query refinement limit
 MAX_CORRECTION_ITERATIONS = 2  # Corrective RAG limit
+PARALLEL_INTENT_RETRIEVAL = True  # Classify intent while the (intent-independent) vector search runs
+# Draft the answer concurrently with the relevance judge's LLM call (the draft is cancelled,
+# or logged as wasted, when the docs are judged irrelevant). /query/stream turns it off per
+# run so answer tokens come from the answer node.
+SPECULATIVE_ANSWER = os.getenv("SPECULATIVE_ANSWER", "false").lower() == "true"
+# Async graph only: coalesce concurrent relevance / answer-quality judge calls into one Groq
+# request per batch (throughput under load; adds up to JUDGE_BATCH_WAIT_MS to a lone request)
+BATCH_JUDGES = os.getenv("BATCH_JUDGES", "false").lower() == "true"
+JUDGE_BATCH_SIZE = 8        # Flush as soon as this many judge calls are pending
+JUDGE_BATCH_WAIT_MS = 20    # ...or this long after the first one arrived
+# Async graph: LLM calls in flight at once per event loop; extra calls wait for a slot
+MAX_INFLIGHT_LLM = int(os.getenv("MAX_INFLIGHT_LLM", "8"))
+# Deterministic judge shortcuts: clearly relevant cosine-scored retrieval skips the relevance
+# judge; a Yes/No-led answer to a yes/no question skips the answer-quality judge
+JUDGE_SHORTCUTS_ENABLED = os.getenv("JUDGE_SHORTCUTS_ENABLED", "true").lower() == "true"
+RELEVANCE_SKIP_TOP_SCORE = 0.6   # Best doc cosine score above this...
+RELEVANCE_SKIP_TOP3_MEAN = 0.5   # ...and mean of the top 3 above this -> relevant
+COSINE_SCORED_METHODS = frozenset({"semantic", "filtered_vector"})  # BM25/boosted scores are not cosines
+ANSWER_SKIP_MIN_CHARS = 50       # Yes/No-led answers shorter than this still go to the judge
 
 # ============================================
 # ANSWER GENERATION
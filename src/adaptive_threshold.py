@@ -4,7 +4,8 @@ Replaces arbitrary static thresholds with dynamic per-query analysis.
 Calculates thresholds based on score distribution and query characteristics.
 """
 import numpy as np
-from typing import List, Dict, Tuple
+from types import MappingProxyType
+from typing import List, Dict, Tuple, Union
 from src.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -13,6 +14,16 @@ logger = setup_logger(__name__)
 class AdaptiveThreshold:
     """Production-grade adaptive threshold calculator"""
     
+    # Intent -> (floor, std-dev coefficient) for the intent-specific threshold
+    _INTENT_PARAMS = MappingProxyType({
+        "ELIGIBILITY": (0.45, 0.3),   # Stricter - need precise info
+        "DISCOVERY": (0.35, 0.7),     # More permissive - want variety
+        "COMPARISON": (0.4, 0.5),     # Balanced
+        "BENEFITS": (0.45, 0.4),      # Stricter - need specific numbers
+        "PROCEDURE": (0.4, 0.5)       # Moderate - need clear steps
+    })
+    _DEFAULT_PARAMS = (0.4, 0.5)      # GENERAL or unknown
+    
     def __init__(
         self,
         min_absolute_threshold: float = 0.3,
@@ -34,31 +45,32 @@ class AdaptiveThreshold:
     
     def calculate_threshold(
         self, 
-        scores: List[float],
+        scores: Union[List[float], np.ndarray],
         intent: str = None
     ) -> Tuple[float, Dict[str, float]]:
         """
         Calculate adaptive threshold based on score distribution
         
         Args:
-            scores: List of similarity scores from retrieval
+            scores: Similarity scores from retrieval (list or float32 array)
             intent: Optional query intent for intent-specific tuning
         
         Returns:
             Tuple of (threshold, metadata_dict)
         """
-        if not scores:
+        if len(scores) == 0:
             return self.min_absolute_threshold, {
                 "method": "default_empty",
                 "threshold": self.min_absolute_threshold
             }
         
-        scores_array = np.array(scores)
+        # Single contiguous array reused for every reduction below
+        scores_array = np.asarray(scores, dtype=np.float32)
         
         # Calculate statistical measures
-        mean_score = np.mean(scores_array)
-        std_score = np.std(scores_array)
-        top_score = np.max(scores_array)
+        mean_score = float(scores_array.mean())
+        std_score = float(scores_array.std())
+        top_score = float(scores_array.max())
         
         # Method 1: Statistical threshold (mean - std_dev * multiplier)
         statistical_threshold = max(
@@ -85,11 +97,12 @@ class AdaptiveThreshold:
         )
         
         # Ensure we don't filter out everything
-        docs_above_threshold = sum(1 for s in scores if s >= threshold)
+        docs_above_threshold = int(np.count_nonzero(scores_array >= threshold))
         if docs_above_threshold < self.min_docs_required and len(scores) > 0:
-            # Adjust threshold to ensure minimum docs
-            sorted_scores = sorted(scores, reverse=True)
-            threshold = sorted_scores[self.min_docs_required - 1] * 0.99  # Slight buffer
+            # Adjust threshold to ensure minimum docs (k-th best score via O(N) partial selection)
+            k = min(self.min_docs_required, len(scores)) - 1
+            kth_score = float(-np.partition(-scores_array, k)[k])
+            threshold = kth_score * 0.99  # Slight buffer
             method_used = "min_docs_override"
         else:
             method_used = "adaptive"
@@ -97,9 +110,9 @@ class AdaptiveThreshold:
         metadata = {
             "method": method_used,
             "threshold": threshold,
-            "mean_score": float(mean_score),
-            "std_dev": float(std_score),
-            "top_score": float(top_score),
+            "mean_score": mean_score,
+            "std_dev": std_score,
+            "top_score": top_score,
             "statistical_threshold": statistical_threshold,
             "top_ratio_threshold": top_ratio_threshold,
             "intent_threshold": intent_threshold,
@@ -129,29 +142,8 @@ class AdaptiveThreshold:
         - DISCOVERY: Can be more permissive
         - COMPARISON: Need balanced retrieval
         """
-        if intent == "ELIGIBILITY":
-            # Stricter for eligibility - need precise info
-            return max(0.45, mean_score - std_score * 0.3)
-        
-        elif intent == "DISCOVERY":
-            # More permissive for discovery - want variety
-            return max(0.35, mean_score - std_score * 0.7)
-        
-        elif intent == "COMPARISON":
-            # Balanced for comparison
-            return max(0.4, mean_score - std_score * 0.5)
-        
-        elif intent == "BENEFITS":
-            # Stricter - need specific numbers
-            return max(0.45, mean_score - std_score * 0.4)
-        
-        elif intent == "PROCEDURE":
-            # Moderate - need clear steps
-            return max(0.4, mean_score - std_score * 0.5)
-        
-        else:  # GENERAL or unknown
-            # Default moderate threshold
-            return max(0.4, mean_score - std_score * 0.5)
+        floor, coef = self._INTENT_PARAMS.get(intent, self._DEFAULT_PARAMS)
+        return max(floor, mean_score - std_score * coef)
     
     def filter_documents(
         self,
@@ -171,13 +163,15 @@ class AdaptiveThreshold:
         if not documents:
             return [], {"method": "empty_input", "threshold": 0.0}
         
-        scores = [doc.get('score', 0.0) for doc in documents]
-        threshold, metadata = self.calculate_threshold(scores, intent)
+        # Scores boxed into one float32 array, shared by threshold calculation and filtering
+        scores_arr = np.fromiter(
+            (doc.get('score', 0.0) for doc in documents), dtype=np.float32, count=len(documents)
+        )
+        threshold, metadata = self.calculate_threshold(scores_arr, intent)
         
-        filtered_docs = [
-            doc for doc in documents 
-            if doc.get('score', 0.0) >= threshold
-        ]
+        # Reuse one boolean mask for filtering
+        mask = scores_arr >= threshold
+        filtered_docs = [doc for doc, keep in zip(documents, mask) if keep]
         
         filtered_count = len(documents) - len(filtered_docs)
         if filtered_count > 0:
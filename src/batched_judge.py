@@ -0,0 +1,149 @@
+"""Micro-batching of concurrent YES/NO judge calls into one LLM request
+
+Under concurrent load (many users, eval runs) the relevance and answer-quality
+judges issue one short Groq request each. BatchedJudge collects the calls that
+arrive within a few milliseconds of each other and sends them as one numbered
+list; the reply carries one verdict line per case. Cases whose line is missing
+or unparseable are re-judged singly, so a malformed batch reply never costs
+more than the unbatched path.
+"""
+import asyncio
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+from src.llm import ainvoke_limited
+from src.logger import setup_logger
+import config
+
+logger = setup_logger(__name__)
+
+# "3. NO | rewritten query" / "3) YES"
+_VERDICT_LINE = re.compile(r"^\s*(?:case\s*)?(\d+)\s*[.):]\s*(YES|NO)\b\s*(?:\|\s*(.*))?$", re.IGNORECASE)
+
+
+def parse_batch_verdicts(content: str, n: int) -> List[Optional[Tuple[str, Optional[str]]]]:
+    """Parse a numbered batch reply into per-case (verdict, rewrite)
+
+    Args:
+        content: LLM reply, one "<number>. YES|NO [| rewrite]" line per case
+        n: Number of cases in the batch
+
+    Returns:
+        List of n (verdict, rewrite or None) tuples, None where the case had no valid line
+    """
+    verdicts: List[Optional[Tuple[str, Optional[str]]]] = [None] * n
+    for line in content.splitlines():
+        match = _VERDICT_LINE.match(line)
+        if not match:
+            continue
+        index = int(match.group(1)) - 1
+        if 0 <= index < n and verdicts[index] is None:
+            rewrite = (match.group(3) or "").strip() or None
+            verdicts[index] = (match.group(2).upper(), rewrite)
+    return verdicts
+
+
+class BatchedJudge:
+    """Coalesces concurrent async judge calls into numbered-list LLM requests"""
+
+    def __init__(
+        self,
+        batch_chain,
+        single_chain,
+        render_case: Callable[[Dict], str],
+        parse_single: Callable[[str], Tuple[str, Optional[str]]],
+        batch_size: int = None,
+        wait_ms: float = None,
+        name: str = "judge"
+    ):
+        """
+        Args:
+            batch_chain: Prompt | LLM chain taking {"cases": numbered case text}
+            single_chain: Prompt | LLM chain for one case (fallback)
+            render_case: Formats one case's chain inputs as text
+            parse_single: Parses a single_chain reply into (verdict, rewrite)
+            batch_size: Flush as soon as this many calls are pending
+            wait_ms: Flush this long after the first pending call
+            name: Label used in log messages
+        """
+        self.batch_chain = batch_chain
+        self.single_chain = single_chain
+        self.render_case = render_case
+        self.parse_single = parse_single
+        self.batch_size = batch_size or config.JUDGE_BATCH_SIZE
+        self.wait_seconds = (wait_ms if wait_ms is not None else config.JUDGE_BATCH_WAIT_MS) / 1000
+        self.name = name
+
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()  # Strong refs to in-flight batches
+
+    async def submit(self, inputs: Dict) -> Tuple[str, Optional[str]]:
+        """Judge one case, batched with whatever else arrives within the wait window
+
+        Args:
+            inputs: Chain inputs of the case (same keys as single_chain expects)
+
+        Returns:
+            (verdict, rewrite or None)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((inputs, future))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.wait_seconds, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Send every pending case as one batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _judge_single(self, inputs: Dict, future: asyncio.Future):
+        """Unbatched fallback for one case"""
+        try:
+            result = await ainvoke_limited(self.single_chain, inputs)
+            judgment = self.parse_single(result.content)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(judgment)
+
+    async def _run(self, batch: List[Tuple[Dict, asyncio.Future]]):
+        """Judge a batch with one LLM call, re-judging unanswered cases singly"""
+        verdicts: List[Optional[Tuple[str, Optional[str]]]] = [None] * len(batch)
+
+        if len(batch) > 1:
+            cases = "\n\n".join(
+                f"Case {i}:\n{self.render_case(inputs)}" for i, (inputs, _) in enumerate(batch, 1)
+            )
+            try:
+                result = await ainvoke_limited(self.batch_chain, {"cases": cases})
+                verdicts = parse_batch_verdicts(result.content, len(batch))
+            except Exception as e:
+                logger.warning(f"{self.name}: batch of {len(batch)} failed ({e}); judging cases singly")
+
+            answered = sum(v is not None for v in verdicts)
+            logger.debug(f"{self.name}: batch of {len(batch)} answered {answered} cases in one call")
+
+        retries = []
+        for (inputs, future), verdict in zip(batch, verdicts):
+            if verdict is None:
+                retries.append(self._judge_single(inputs, future))
+            elif not future.done():
+                future.set_result(verdict)
+
+        if retries:
+            await asyncio.gather(*retries)
@@ -0,0 +1,77 @@
+"""NumPy BM25 over precomputed postings (fallback when bm25s is not installed)
+
+Okapi BM25 with rank_bm25's defaults and IDF flooring, but every
+idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl)) term is computed
+once at index time. Terms are interned to integer ids with postings stored in
+CSR arrays, so a query is a handful of vocabulary lookups and one vectorized
+scatter-add instead of a Python loop over every document.
+"""
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List
+import numpy as np
+
+
+class PostingsBM25:
+    """Okapi BM25 with interned-term CSR postings of precomputed weights"""
+
+    def __init__(self, corpus: List[List[str]], k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        """
+        Args:
+            corpus: Tokenized documents
+            k1: Term-frequency saturation
+            b: Length normalization strength
+            epsilon: Floor for negative IDFs, as a fraction of the average IDF
+        """
+        self.corpus_size = len(corpus)
+        doc_len = np.fromiter((len(doc) for doc in corpus), dtype=np.float32, count=self.corpus_size)
+        avgdl = float(doc_len.mean()) if self.corpus_size else 0.0
+        # Per-doc length normalizer k1 * (1 - b + b * dl / avgdl)
+        length_norm = k1 * (1 - b + b * doc_len / avgdl) if avgdl else np.full(self.corpus_size, k1, dtype=np.float32)
+
+        term_docs: Dict[str, List[int]] = defaultdict(list)
+        term_tfs: Dict[str, List[int]] = defaultdict(list)
+        for doc_idx, doc in enumerate(corpus):
+            for term, tf in Counter(doc).items():
+                term_docs[term].append(doc_idx)
+                term_tfs[term].append(tf)
+
+        idf = {
+            term: math.log((self.corpus_size - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in term_docs.items()
+        }
+        # Terms in more than half the docs get a small positive IDF instead of a negative one
+        idf_floor = epsilon * (sum(idf.values()) / len(idf)) if idf else 0.0
+
+        # CSR layout over interned term ids: postings of term t are
+        # doc_ids / weights[offsets[t]:offsets[t + 1]]
+        self._vocab: Dict[str, int] = {term: term_id for term_id, term in enumerate(term_docs)}
+        lengths = np.fromiter((len(docs) for docs in term_docs.values()), dtype=np.int64, count=len(term_docs))
+        self._offsets = np.zeros(len(term_docs) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self._offsets[1:])
+        self._doc_ids = np.fromiter(
+            (doc_idx for docs in term_docs.values() for doc_idx in docs), dtype=np.int32, count=int(self._offsets[-1])
+        )
+        tf = np.fromiter(
+            (tf for tfs in term_tfs.values() for tf in tfs), dtype=np.float32, count=int(self._offsets[-1])
+        )
+        term_idf = np.fromiter(
+            (value if value >= 0 else idf_floor for value in idf.values()), dtype=np.float32, count=len(idf)
+        )
+        # Precomputed idf * tf * (k1 + 1) / (tf + length_norm) per posting
+        self._weights = (
+            np.repeat(term_idf, lengths) * tf * np.float32(k1 + 1) / (tf + length_norm[self._doc_ids])
+        ).astype(np.float32, copy=False)
+
+    def get_scores(self, query: List[str]) -> np.ndarray:
+        """BM25 score of every document for the tokenized query (rank_bm25-compatible)"""
+        term_ids = [self._vocab[term] for term in query if term in self._vocab]
+        if not term_ids:
+            return np.zeros(self.corpus_size, dtype=np.float32)
+
+        offsets = self._offsets
+        postings = np.concatenate([np.arange(offsets[t], offsets[t + 1]) for t in term_ids])
+        # One scatter-add over all query postings (repeated query terms count twice, as in rank_bm25)
+        return np.bincount(
+            self._doc_ids[postings], weights=self._weights[postings], minlength=self.corpus_size
+        ).astype(np.float32, copy=False)
@@ -1,5 +1,7 @@
+import numpy as np
 from sentence_transformers import SentenceTransformer
 from src.exceptions import EmbeddingError
+from src.query_cache import QueryCache
 from src.logger import setup_logger
 import config
 
@@ -10,15 +12,64 @@ class EmbeddingModel:
     def __init__(self):
         try:
             logger.info(f"Loading embedding model: {config.EMBEDDING_MODEL}")
-            self.model = SentenceTransformer(
-                config.EMBEDDING_MODEL,
-                device="cuda" if self._has_cuda() else "cpu"
+            has_cuda = self._has_cuda()
+            self.model = self._load_model(has_cuda)
+            self._cache = QueryCache(
+                max_size=config.QUERY_EMBEDDING_CACHE_SIZE,
+                ttl_seconds=config.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+                name="query_embedding_cache"
             )
-            logger.info(f"Model loaded on {'GPU' if self._has_cuda() else 'CPU'}")
+            self._lookups = 0
+            logger.info(f"Model loaded on {'GPU' if has_cuda else 'CPU'}")
         except Exception as e:
             logger.error(f"Failed to load embedding model: {str(e)}")
             raise EmbeddingError(f"Could not initialize embedding model: {str(e)}")
     
+    def _load_model(self, has_cuda: bool) -> SentenceTransformer:
+        """Load the model, using ONNX Runtime / OpenVINO on CPU-only hosts if configured"""
+        if not has_cuda and config.EMBEDDING_BACKEND != "torch":
+            try:
+                model_kwargs = self._cpu_model_kwargs()
+                model = SentenceTransformer(
+                    config.EMBEDDING_MODEL,
+                    device="cpu",
+                    backend=config.EMBEDDING_BACKEND,
+                    model_kwargs=model_kwargs,
+                    cache_folder=config.MODEL_CACHE_DIR
+                )
+                logger.info(
+                    f"Using {config.EMBEDDING_BACKEND} backend for CPU inference "
+                    f"(model_kwargs={model_kwargs})"
+                )
+                return model
+            except Exception as e:
+                logger.warning(
+                    f"{config.EMBEDDING_BACKEND} backend unavailable, falling back to torch: {str(e)}"
+                )
+        
+        return SentenceTransformer(
+            config.EMBEDDING_MODEL,
+            device="cuda" if has_cuda else "cpu",
+            cache_folder=config.MODEL_CACHE_DIR
+        )
+    
+    def _cpu_model_kwargs(self) -> dict:
+        """Backend kwargs selecting a quantized (int8) model on CPU
+        
+        An explicit EMBEDDING_MODEL_FILE (e.g. a pre-quantized ONNX export) wins;
+        otherwise EMBEDDING_INT8 asks OpenVINO to compress weights to int8 at export.
+        """
+        if config.EMBEDDING_MODEL_FILE:
+            return {"file_name": config.EMBEDDING_MODEL_FILE}
+        if config.EMBEDDING_INT8:
+            if config.EMBEDDING_BACKEND == "openvino":
+                return {"load_in_8bit": True}
+            logger.warning(
+                "EMBEDDING_INT8 needs the openvino backend or an int8 EMBEDDING_MODEL_FILE; "
+                "loading full-precision weights"
+            )
+        return None
+    
     def _has_cuda(self):
         try:
             import torch
@@ -31,15 +82,74 @@ class EmbeddingModel:
         if not query or not query.strip():
             raise EmbeddingError("Cannot embed empty query")
         
+        return self.embed_queries([query])[0]
+    
+    def warmup(self):
+        """Run one throwaway encode so kernel init/JIT happens before the first query"""
         try:
-            embedding = self.model.encode(
-                query,
-                normalize_embeddings=True
-            )
-            return embedding
+            self.model.encode("warmup", normalize_embeddings=True, show_progress_bar=False)
+            logger.info("Embedding model warmed up")
         except Exception as e:
-            logger.error(f"Embedding generation failed: {str(e)}")
-            raise EmbeddingError(f"Failed to generate embedding: {str(e)}")
+            logger.warning(f"Embedding warmup failed: {str(e)}")
+    
+    def embed_context(self, ctx):
+        """Embed a QueryContext once, memoizing the vector on the context"""
+        if ctx.embedding is None:
+            ctx.embedding = self.embed_query(ctx.raw)
+        return ctx.embedding
+    
+    def _cache_key(self, query: str) -> tuple:
+        """Cache key: model name + whitespace/case-normalized query"""
+        return (config.EMBEDDING_MODEL, " ".join(query.lower().split()))
+    
+    def embed_queries(self, queries: list, batch_size: int = 32):
+        """Generate embeddings for several queries in one forward pass
+        
+        Cached queries are served from the LRU; only misses are encoded.
+        
+        Args:
+            queries: Query texts (must be non-empty)
+            batch_size: Encode batch size
+            
+        Returns:
+            (len(queries), dimension) float32 NumPy array, rows in input order
+        """
+        if any(not q or not q.strip() for q in queries):
+            raise EmbeddingError("Cannot embed empty query")
+        
+        keys = [self._cache_key(q) for q in queries]
+        cached = [self._cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        
+        if missing:
+            try:
+                encoded = self.model.encode(
+                    [queries[i] for i in missing],
+                    batch_size=batch_size,
+                    normalize_embeddings=True,
+                    convert_to_numpy=True,
+                    show_progress_bar=False
+                )
+            except Exception as e:
+                logger.error(f"Embedding generation failed: {str(e)}")
+                raise EmbeddingError(f"Failed to generate embedding: {str(e)}")
+            
+            for i, vector in zip(missing, encoded):
+                self._cache.put(keys[i], vector.copy())  # Detach from the batch buffer
+                cached[i] = vector
+        
+        self._lookups += len(queries)
+        if self._lookups >= config.QUERY_CACHE_STATS_INTERVAL:
+            self._lookups = 0
+            self._cache.log_stats()
+        
+        vectors = np.stack(cached).astype(np.float32, copy=False)
+        assert vectors.dtype == np.float32  # Downstream scoring assumes float32 end-to-end
+        return vectors
+    
+    def get_cache_stats(self) -> dict:
+        """Query embedding cache statistics"""
+        return self._cache.get_stats()
     
     @property
     def dimension(self):
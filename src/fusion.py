@@ -0,0 +1,151 @@
+"""Ranking helpers for hybrid retrieval: BM25 top-k selection and weighted RRF
+
+Pure functions over result dicts and NumPy arrays, kept apart from
+HybridRetriever so they import (and unit-test) without the embedding model
+or a Qdrant client.
+"""
+from functools import partial
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Source bitmask (bit 0 = BM25, bit 1 = semantic) -> retrieval_sources labels
+SOURCES_BY_MASK = ((), ('bm25',), ('semantic',), ('bm25', 'semantic'))
+
+
+def top_k_desc(scores: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+    """Indices of the k highest scores, best first
+
+    O(N) partial selection of the top-k, then sort just those; ties keep
+    index order.
+
+    Args:
+        scores: 1-D score array
+        k: Number of indices to return (None = all)
+
+    Returns:
+        Index array of length min(k, len(scores))
+    """
+    if k is not None and 0 < k < scores.size:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.size)[:k]
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def format_bm25_results(doc_corpus: Sequence[Dict], doc_indices, scores) -> List[Dict]:
+    """Fresh BM25 result dicts for ranked corpus indices (fusion mutates them)
+
+    Args:
+        doc_corpus: Indexed docs ({'id', 'payload'}) in corpus order
+        doc_indices: Ranked corpus indices
+        scores: BM25 scores aligned with doc_indices
+
+    Returns:
+        Result dicts for the non-zero scores, in rank order
+    """
+    return [
+        {
+            'id': doc_corpus[idx]['id'],
+            'score': float(score),
+            'payload': doc_corpus[idx]['payload'],
+            'source': 'bm25'
+        }
+        for idx, score in zip(doc_indices, scores)
+        if score > 0  # Only include non-zero scores
+    ]
+
+
+def make_fuser(bm25_weight: float, semantic_weight: float, rrf_k: int = 60):
+    """RRF fuser specialized for one weight pair
+
+    rrf(d) = sum over rankings of weight / (k + rank(d)); the final score
+    is 0.7 * rrf / max_rrf + 0.3 * semantic, where
+    max_rrf = (bm25_weight + semantic_weight) / (k + 1) is the score of a doc
+    ranked first in both lists. Folding 0.7 / max_rrf into each weight leaves
+    two precomputed coefficients per fuser.
+
+    Returns:
+        Callable (bm25_results, semantic_results, top_k=None) -> fused results
+    """
+    max_rrf_score = (bm25_weight + semantic_weight) / (rrf_k + 1)
+    return partial(
+        fuse_rankings,
+        bm25_coef=np.float32(0.7 * bm25_weight / max_rrf_score),
+        semantic_coef=np.float32(0.7 * semantic_weight / max_rrf_score),
+        rrf_k=np.float32(rrf_k)
+    )
+
+
+def fuse_rankings(
+    bm25_results: List[Dict],
+    semantic_results: List[Dict],
+    top_k: int = None,
+    *,
+    bm25_coef: np.float32,
+    semantic_coef: np.float32,
+    rrf_k: np.float32
+) -> List[Dict]:
+    """Weighted RRF over aligned rank arrays; only the top_k are sorted"""
+    # Candidate set: union of both rankings (BM25 payload wins if in both)
+    index_of = {}
+    docs = []
+    for doc in bm25_results + semantic_results:
+        if doc['id'] not in index_of:
+            index_of[doc['id']] = len(docs)
+            docs.append(doc)
+
+    if not docs:
+        return []
+
+    num_docs = len(docs)
+    bm25_rank = np.full(num_docs, np.inf, dtype=np.float32)
+    semantic_rank = np.full(num_docs, np.inf, dtype=np.float32)
+    semantic_scores = np.zeros(num_docs, dtype=np.float32)
+
+    bm25_idx = np.fromiter((index_of[d['id']] for d in bm25_results), dtype=np.intp, count=len(bm25_results))
+    semantic_idx = np.fromiter((index_of[d['id']] for d in semantic_results), dtype=np.intp, count=len(semantic_results))
+    bm25_rank[bm25_idx] = np.arange(1, len(bm25_idx) + 1)
+    semantic_rank[semantic_idx] = np.arange(1, len(semantic_idx) + 1)
+    semantic_scores[semantic_idx] = [d.get('score', 0) for d in semantic_results]
+
+    # Blend: 70% normalized RRF (for ranking) + 30% semantic (for absolute quality)
+    # Missing from a ranking -> rank inf -> contributes 0
+    final_scores = (
+        bm25_coef / (rrf_k + bm25_rank)
+        + semantic_coef / (rrf_k + semantic_rank)
+        + np.float32(0.3) * semantic_scores
+    )
+
+    order = top_k_desc(final_scores, top_k)
+    source_mask = np.isfinite(bm25_rank).astype(np.uint8) | (np.isfinite(semantic_rank).astype(np.uint8) << 1)
+
+    # Fresh result dicts: the input rankings (and cached payloads) are never mutated
+    results = [
+        {
+            'id': docs[idx]['id'],
+            'score': float(final_scores[idx]),  # Use normalized blended score
+            'payload': docs[idx]['payload'],
+            'retrieval_method': 'hybrid',
+            'retrieval_sources': list(SOURCES_BY_MASK[source_mask[idx]])
+        }
+        for idx in order
+    ]
+
+    top_score = results[0]['score'] if results else 0
+    logger.debug(f"RRF fused {num_docs} candidates, top_score={top_score:.3f}")
+
+    return results
+
+
+def fuse(bm25_results: List[Dict], semantic_results: List[Dict], fuser, top_k: int) -> List[Dict]:
+    """RRF-fuse one query's rankings, or semantic-only if BM25 returned nothing"""
+    # If BM25 failed, fall back to semantic only
+    if not bm25_results:
+        logger.warning("BM25 returned no results, using semantic-only")
+        return semantic_results[:top_k]
+
+    # Combine using RRF with normalization
+    return fuser(bm25_results, semantic_results, top_k)
@@ -1,66 +1,91 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
-from src.nodes import (
-    RAGState,
-    intent_node,
-    retrieval_node,
-    selfrag_judge_node,
-    reflection_node,
-    answer_node,
-    corrective_rag_node
-)
+import config
 
+if TYPE_CHECKING:
+    from src.nodes import RAGState
 
-def route_after_selfrag(state: RAGState):
-    """Route after self-RAG judgment"""
-    return "reflection" if state.get("needs_reflection") else "answer"
 
+# Conditional-edge routers: pure state reads, keep them free of I/O and LLM calls
+# (they run on every graph step). Branch targets live in the bool-keyed path maps.
+SELFRAG_ROUTES = {True: "reflection", False: "answer"}
+ANSWER_ROUTES = {True: "corrective", False: END}
 
-def route_after_answer(state: RAGState):
-    """Route after answer generation"""
-    return "corrective" if state.get("needs_correction") else END
+
+def route_after_selfrag(state: "RAGState") -> bool:
+    """Route after self-RAG judgment (True -> reflection)"""
+    return bool(state.get("needs_reflection"))
+
+
+def route_after_answer(state: "RAGState") -> bool:
+    """Route after answer generation (True -> corrective)"""
+    return bool(state.get("needs_correction"))
 
 
 def build_graph():
     """Build and compile the RAG graph"""
+    # Imported here: loading src.nodes connects to Qdrant and loads the models
+    from src.nodes import (
+        RAGState,
+        intent_node,
+        retrieval_node,
+        aretrieval_node,
+        intent_retrieval_node,
+        aintent_retrieval_node,
+        selfrag_judge_node,
+        aselfrag_judge_node,
+        reflection_node,
+        areflection_node,
+        answer_node,
+        aanswer_node,
+        corrective_rag_node,
+        acorrective_rag_node
+    )
+    
     graph = StateGraph(RAGState)
     
-    # Add nodes
-    graph.add_node("intent", intent_node)
-    graph.add_node("retrieve", retrieval_node)
-    graph.add_node("selfrag", selfrag_judge_node)
-    graph.add_node("reflection", reflection_node)
-    graph.add_node("answer", answer_node)
-    graph.add_node("corrective", corrective_rag_node)
+    # Add nodes (sync variants for invoke(), async Qdrant client for ainvoke()/astream())
+    if config.PARALLEL_INTENT_RETRIEVAL:
+        # Intent classification overlaps the vector search
+        graph.add_node("retrieve", RunnableLambda(intent_retrieval_node, afunc=aintent_retrieval_node))
+    else:
+        graph.add_node("intent", intent_node)
+        graph.add_node("retrieve", RunnableLambda(retrieval_node, afunc=aretrieval_node))
+    # LLM nodes await ainvoke() under ainvoke()/astream() instead of blocking a worker thread
+    graph.add_node("selfrag", RunnableLambda(selfrag_judge_node, afunc=aselfrag_judge_node))
+    graph.add_node("reflection", RunnableLambda(reflection_node, afunc=areflection_node))
+    graph.add_node("answer", RunnableLambda(answer_node, afunc=aanswer_node))
+    graph.add_node("corrective", RunnableLambda(corrective_rag_node, afunc=acorrective_rag_node))
     
     # Add edges
-    graph.set_entry_point("intent")
-    graph.add_edge("intent", "retrieve")
+    if config.PARALLEL_INTENT_RETRIEVAL:
+        graph.set_entry_point("retrieve")
+    else:
+        graph.set_entry_point("intent")
+        graph.add_edge("intent", "retrieve")
     graph.add_edge("retrieve", "selfrag")
     
-    graph.add_conditional_edges(
-        "selfrag",
-        route_after_selfrag,
-        {
-            "reflection": "reflection",
-            "answer": "answer"
-        }
-    )
+    graph.add_conditional_edges("selfrag", route_after_selfrag, SELFRAG_ROUTES)
     
     graph.add_edge("reflection", "selfrag")
     
-    graph.add_conditional_edges(
-        "answer",
-        route_after_answer,
-        {
-            "corrective": "corrective",
-            END: END
-        }
-    )
+    graph.add_conditional_edges("answer", route_after_answer, ANSWER_ROUTES)
     
     graph.add_edge("corrective", "answer")
     
     return graph.compile()
 
 
-# Global compiled graph
-app = build_graph()
+@lru_cache(maxsize=1)
+def get_app():
+    """Get the compiled RAG graph, building it on first use (once per process)"""
+    return build_graph()
+
+
+def __getattr__(name):
+    """Lazily materialize the legacy module attribute `app` (from src.graph import app)"""
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,24 +1,62 @@
 """Hybrid retrieval combining BM25 (keyword) and semantic search
 
 Implements industry-standard hybrid search with:
-- BM25 for lexical/keyword matching
+- BM25 for lexical/keyword matching (in-process index, or Qdrant sparse
+  vectors when the collection has them)
 - Semantic search via embeddings
 - Reciprocal Rank Fusion (RRF) for combining results
 - Intent-specific weighting
 - Score normalization for adaptive threshold compatibility
 """
-import numpy as np
-from typing import List, Dict, Tuple
+import os
+import shutil
+import threading
+from pathlib import Path
+from types import MappingProxyType
+import orjson
+from typing import List, Dict, Optional, Tuple
 from collections import defaultdict
-from rank_bm25 import BM25Okapi
+from src.bm25_postings import PostingsBM25
+from qdrant_client.models import QueryRequest
+from src.embeddings import embedding_model
+from src.fusion import format_bm25_results, fuse, make_fuser, top_k_desc
+from src.retrieval import SEARCH_PARAMS
+from src.sparse_vectors import bm25_document_text, query_sparse_vector, server_sparse_available
 from src.logger import setup_logger
+from src.query_cache import QueryCache
+from src.query_context import QueryContext, tokenize
+from src.qdrant_utils import parallel_scroll
+from src.thread_pool import get_thread_pool
+import config
+
+try:
+    import bm25s
+    BM25S_AVAILABLE = True
+except ImportError:
+    BM25S_AVAILABLE = False
 
 logger = setup_logger(__name__)
 
+if not BM25S_AVAILABLE:
+    logger.warning("bm25s not installed. Using NumPy postings BM25 for keyword search. Install: pip install bm25s")
+
 
 class HybridRetriever:
     """Hybrid retriever combining keyword and semantic search"""
     
+    # Stored with the persisted index; bump when _tokenize changes
+    _TOKENIZER_ID = "word-regex-stopwords"
+    
+    # Intent -> (BM25 weight, semantic weight), built once at class load
+    _INTENT_WEIGHTS = MappingProxyType({
+        'ELIGIBILITY': (0.5, 0.5),   # Balanced - need exact criteria
+        'DISCOVERY': (0.3, 0.7),     # More semantic - broad search
+        'BENEFITS': (0.5, 0.5),      # Balanced - need specific amounts
+        'COMPARISON': (0.4, 0.6),    # Slightly more semantic
+        'PROCEDURE': (0.45, 0.55),   # Balanced with slight semantic
+        'GENERAL': (0.4, 0.6)        # Default: favor semantic
+    })
+    
     def __init__(
         self,
         semantic_retriever,
@@ -38,8 +76,35 @@ class HybridRetriever:
         self.semantic_weight = semantic_weight
         self.rrf_k = rrf_k
         
-        # Build BM25 index
-        self._build_bm25_index()
+        # One fuser per intent with weights, k and the normalizer folded in at init
+        self._fusers = MappingProxyType({
+            intent: make_fuser(*weights, rrf_k) for intent, weights in self._INTENT_WEIGHTS.items()
+        })
+        self._default_fuser = make_fuser(bm25_weight, semantic_weight, rrf_k)
+        
+        # BM25 scoring runs on the shared pool while the calling thread waits on Qdrant
+        self._bm25_executor = get_thread_pool()
+        
+        # Ranked BM25 hits per tokenized query; cleared whenever the index is (re)built
+        self._bm25_cache = QueryCache(
+            max_size=config.BM25_CACHE_SIZE,
+            ttl_seconds=config.BM25_CACHE_TTL_SECONDS,
+            name="bm25_cache"
+        )
+        self._bm25_lookups = 0
+        self._bm25_lookups_lock = threading.Lock()
+        
+        # Keyword search runs in Qdrant when the collection has BM25 sparse vectors;
+        # otherwise build the in-process index
+        self.server_sparse = server_sparse_available(
+            self.semantic_retriever.client, self.semantic_retriever.collection_name
+        )
+        if self.server_sparse:
+            self.bm25 = None
+            self.doc_corpus = []
+            logger.info(f"Using Qdrant sparse vectors '{config.SPARSE_VECTOR_NAME}' for BM25")
+        else:
+            self._build_bm25_index()
         
         logger.info(
             f"Hybrid retriever initialized with BM25:{bm25_weight}, "
@@ -48,55 +113,41 @@ class HybridRetriever:
     
     def _build_bm25_index(self):
         """Build BM25 index from Qdrant collection"""
+        # Cached doc indices refer to the previous corpus
+        self._bm25_cache.clear()
         try:
-            logger.info("Building BM25 index from Qdrant collection...")
+            index_key = self._bm25_index_key() if BM25S_AVAILABLE else None
+            if index_key and self._load_bm25_index(index_key):
+                return
             
-            # Scroll through all documents in collection
-            all_docs = []
-            offset = None
+            logger.info("Building BM25 index from Qdrant collection...")
             
-            while True:
-                results = self.semantic_retriever.client.scroll(
-                    collection_name=self.semantic_retriever.collection_name,
-                    limit=100,
-                    offset=offset,
-                    with_payload=True,
-                    with_vectors=False
-                )
-                
-                points, offset = results
-                
-                if not points:
-                    break
-                
-                for point in points:
-                    payload = point.payload
-                    # Combine scheme name and text for better keyword matching
-                    scheme_name = payload.get('scheme_name', '')
-                    text = payload.get('text', '')
-                    theme = payload.get('theme', '')
-                    
-                    # Create searchable text
-                    searchable_text = f"{scheme_name} {theme} {text}"
-                    
-                    all_docs.append({
-                        'id': point.id,
-                        'text': searchable_text,
-                        'payload': payload
-                    })
-                
-                if offset is None:
-                    break
+            # Scroll all documents (id ranges fetched concurrently), tokenizing each
+            # page as it arrives; the searchable text is never kept
+            entries = parallel_scroll(
+                self.semantic_retriever.client,
+                self.semantic_retriever.collection_name,
+                transform=self._tokenize_page
+            )
+            all_docs = [doc for doc, _ in entries]
+            tokenized_corpus = [tokens for _, tokens in entries]
+            del entries
             
-            # Tokenize documents for BM25
             self.doc_corpus = all_docs
-            tokenized_corpus = [
-                doc['text'].lower().split() 
-                for doc in all_docs
-            ]
             
-            self.bm25 = BM25Okapi(tokenized_corpus)
-            logger.info(f"BM25 index built with {len(all_docs)} documents")
+            if BM25S_AVAILABLE:
+                # Sparse doc-term score matrix precomputed once (idf + length norm cached)
+                self.bm25 = bm25s.BM25()
+                self.bm25.index(tokenized_corpus, show_progress=False)
+                self._activate_numba_scorer()
+                if index_key:
+                    self._save_bm25_index(index_key)
+            else:
+                self.bm25 = PostingsBM25(tokenized_corpus)
+            logger.info(
+                f"BM25 index built with {len(all_docs)} documents "
+                f"({'bm25s' if BM25S_AVAILABLE else 'numpy postings'})"
+            )
             
         except Exception as e:
             logger.error(f"BM25 index building failed: {e}")
@@ -104,29 +155,120 @@ class HybridRetriever:
             self.bm25 = None
             self.doc_corpus = []
     
-    def _bm25_search(self, query: str, top_k: int) -> List[Dict]:
-        """Perform BM25 keyword search"""
+    def _tokenize_page(self, points: list) -> List[Tuple[Dict, List[str]]]:
+        """(doc, tokens) per scrolled point; scheme name + theme + text are tokenized together"""
+        return [
+            ({'id': point.id, 'payload': point.payload}, self._tokenize(bm25_document_text(point.payload)))
+            for point in points
+        ]
+    
+    def _activate_numba_scorer(self):
+        """JIT-compiled scoring + top-k selection (needs numba)"""
+        try:
+            self.bm25.activate_numba_scorer()
+        except Exception as e:
+            logger.info(f"numba scorer unavailable, using NumPy BM25 backend: {e}")
+    
+    def _bm25_index_key(self) -> Optional[Dict]:
+        """Identity of the current corpus; a persisted index is reused only if it matches"""
+        try:
+            points_count = self.semantic_retriever.client.count(
+                collection_name=self.semantic_retriever.collection_name,
+                exact=True
+            ).count
+        except Exception as e:
+            logger.warning(f"Could not count collection points, not persisting BM25 index: {e}")
+            return None
+        
+        return {
+            "collection": self.semantic_retriever.collection_name,
+            "points_count": points_count,
+            "tokenizer": self._TOKENIZER_ID
+        }
+    
+    def _load_bm25_index(self, index_key: Dict) -> bool:
+        """Memory-map a persisted bm25s index if it was built from the same corpus
+        
+        Args:
+            index_key: Current corpus identity from _bm25_index_key()
+            
+        Returns:
+            True if the index and doc corpus were loaded (scroll + tokenize skipped)
+        """
+        index_dir = Path(config.BM25_INDEX_DIR)
+        meta_path = index_dir / "meta.json"
+        if not meta_path.exists():
+            return False
+        
+        try:
+            if orjson.loads(meta_path.read_bytes()) != index_key:
+                logger.info("Persisted BM25 index is stale, rebuilding")
+                return False
+            
+            bm25 = bm25s.BM25.load(str(index_dir), mmap=True)
+            doc_corpus = orjson.loads((index_dir / "doc_corpus.json").read_bytes())
+        except Exception as e:
+            logger.warning(f"Could not load persisted BM25 index, rebuilding: {e}")
+            return False
+        
+        self.bm25 = bm25
+        self.doc_corpus = doc_corpus
+        self._activate_numba_scorer()
+        logger.info(f"BM25 index loaded from {index_dir} ({len(doc_corpus)} documents, memory-mapped)")
+        return True
+    
+    def _save_bm25_index(self, index_key: Dict):
+        """Persist the bm25s index + doc ids/payloads for the next process start
+        
+        Written to a temporary directory and swapped in, with meta.json last,
+        so a concurrently starting worker never loads a half-written index.
+        """
+        index_dir = Path(config.BM25_INDEX_DIR)
+        tmp_dir = index_dir.with_name(f"{index_dir.name}.tmp{os.getpid()}")
+        
+        try:
+            self.bm25.save(str(tmp_dir))
+            (tmp_dir / "doc_corpus.json").write_bytes(orjson.dumps([
+                {'id': doc['id'], 'payload': doc['payload']} for doc in self.doc_corpus
+            ]))
+            (tmp_dir / "meta.json").write_bytes(orjson.dumps(index_key))
+            
+            if index_dir.exists():
+                shutil.rmtree(index_dir)
+            os.replace(tmp_dir, index_dir)
+            logger.info(f"BM25 index persisted to {index_dir}")
+        except Exception as e:
+            logger.warning(f"Could not persist BM25 index: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        """Same tokenizer as QueryContext.tokens, so corpus and query terms match"""
+        return tokenize(text)
+    
+    def _bm25_search(self, query, top_k: int) -> List[Dict]:
+        """Perform BM25 keyword search (query: str or QueryContext)"""
+        if self.server_sparse or BM25S_AVAILABLE:
+            # Native top-k selection, results already sorted by score
+            return self.batch_bm25_search([query], top_k)[0]
+        
         if not self.bm25 or not self.doc_corpus:
             logger.warning("BM25 index not available, skipping keyword search")
             return []
         
         try:
-            tokenized_query = query.lower().split()
-            scores = self.bm25.get_scores(tokenized_query)
-            
-            # Get top-k results
-            top_indices = np.argsort(scores)[::-1][:top_k * 2]  # Get more for fusion
-            
-            results = []
-            for idx in top_indices:
-                if scores[idx] > 0:  # Only include non-zero scores
-                    results.append({
-                        'id': self.doc_corpus[idx]['id'],
-                        'score': float(scores[idx]),
-                        'payload': self.doc_corpus[idx]['payload'],
-                        'source': 'bm25'
-                    })
+            tokens = QueryContext.from_query(query).tokens
+            key = (tuple(tokens), top_k)
+            ranked = self._bm25_cache.get(key)
+            if ranked is None:
+                scores = self.bm25.get_scores(tokens)
+                
+                top_indices = top_k_desc(scores, top_k * 2)  # Get more for fusion
+                ranked = (top_indices, scores[top_indices])
+                self._bm25_cache.put(key, ranked)
+            self._count_bm25_lookups(1)
             
+            results = format_bm25_results(self.doc_corpus, *ranked)
             logger.debug(f"BM25 search returned {len(results)} results")
             return results
             
@@ -134,147 +276,186 @@ class HybridRetriever:
             logger.error(f"BM25 search failed: {e}")
             return []
     
-    def _get_intent_weights(self, intent: str) -> Tuple[float, float]:
-        """
-        Get intent-specific weights for BM25 vs semantic
-        
-        Different intents benefit from different balances:
-        - ELIGIBILITY: More keyword (contains specific terms)
-        - DISCOVERY: More semantic (conceptual matching)
-        """
-        intent_weights = {
-            'ELIGIBILITY': (0.5, 0.5),   # Balanced - need exact criteria
-            'DISCOVERY': (0.3, 0.7),     # More semantic - broad search
-            'BENEFITS': (0.5, 0.5),      # Balanced - need specific amounts
-            'COMPARISON': (0.4, 0.6),    # Slightly more semantic
-            'PROCEDURE': (0.45, 0.55),   # Balanced with slight semantic
-            'GENERAL': (0.4, 0.6)        # Default: favor semantic
-        }
-        
-        return intent_weights.get(intent, (self.bm25_weight, self.semantic_weight))
+    def _count_bm25_lookups(self, n: int):
+        """Periodically log BM25 cache hit/miss counters (called from pool threads)"""
+        with self._bm25_lookups_lock:
+            self._bm25_lookups += n
+            if self._bm25_lookups < config.QUERY_CACHE_STATS_INTERVAL:
+                return
+            self._bm25_lookups = 0
+        self._bm25_cache.log_stats()
     
-    def _reciprocal_rank_fusion(
-        self, 
-        bm25_results: List[Dict], 
-        semantic_results: List[Dict],
-        bm25_weight: float,
-        semantic_weight: float
-    ) -> List[Dict]:
-        """
-        Combine results using Reciprocal Rank Fusion (RRF) with score normalization
+    def get_cache_stats(self) -> dict:
+        """BM25 result cache statistics"""
+        return self._bm25_cache.get_stats()
+    
+    def batch_bm25_search(self, queries: list, top_k: int) -> List[List[Dict]]:
+        """BM25 keyword search for several queries at once
         
-        RRF formula: score(d) = sum over all rankings of 1/(k + rank(d))
-        where k is a constant (typically 60)
+        With bm25s the scoring is one sparse (queries x vocab) @ (vocab x docs)
+        product over the precomputed index instead of a Python loop per query.
         
-        Normalized to 0.0-1.0 range for adaptive threshold compatibility
+        Args:
+            queries: Search queries (str or QueryContext)
+            top_k: Results per query (before fusion)
+            
+        Returns:
+            One list of BM25 results per query, in input order
         """
-        # Build rank maps with original semantic scores for reference
-        doc_scores = defaultdict(lambda: {
-            'rrf_score': 0, 
-            'sources': set(), 
-            'data': None,
-            'semantic_score': 0
-        })
-        
-        # Add BM25 rankings
-        for rank, doc in enumerate(bm25_results):
-            doc_id = doc['id']
-            rrf_score = bm25_weight / (self.rrf_k + rank + 1)
-            doc_scores[doc_id]['rrf_score'] += rrf_score
-            doc_scores[doc_id]['sources'].add('bm25')
-            doc_scores[doc_id]['data'] = doc
-        
-        # Add semantic rankings and preserve original scores
-        for rank, doc in enumerate(semantic_results):
-            doc_id = doc['id']
-            rrf_score = semantic_weight / (self.rrf_k + rank + 1)
-            doc_scores[doc_id]['rrf_score'] += rrf_score
-            doc_scores[doc_id]['sources'].add('semantic')
-            doc_scores[doc_id]['semantic_score'] = doc.get('score', 0)
-            if doc_scores[doc_id]['data'] is None:
-                doc_scores[doc_id]['data'] = doc
-        
-        # Calculate max possible RRF score (doc appears first in both)
-        max_rrf_score = (bm25_weight + semantic_weight) / (self.rrf_k + 1)
+        if not queries:
+            return []
+        if self.server_sparse:
+            return self._server_bm25_search(queries, top_k)
+        if not self.bm25 or not self.doc_corpus:
+            logger.warning("BM25 index not available, skipping keyword search")
+            return [[] for _ in queries]
+        if not BM25S_AVAILABLE:
+            return [self._bm25_search(query, top_k) for query in queries]
         
-        # Normalize RRF scores and blend with semantic scores
-        for doc_id in doc_scores:
-            raw_rrf = doc_scores[doc_id]['rrf_score']
-            normalized_rrf = raw_rrf / max_rrf_score  # Now in 0.0-1.0 range
-            semantic_score = doc_scores[doc_id]['semantic_score']
+        try:
+            keys = [(tuple(QueryContext.from_query(query).tokens), top_k) for query in queries]
+            ranked = [self._bm25_cache.get(key) for key in keys]
+            missing = [i for i, entry in enumerate(ranked) if entry is None]
             
-            # Blend: 70% normalized RRF (for ranking) + 30% semantic (for absolute quality)
-            # This preserves RRF ranking benefits while maintaining score scale
-            final_score = (0.7 * normalized_rrf) + (0.3 * semantic_score)
-            doc_scores[doc_id]['rrf_score'] = final_score
-        
-        # Sort by blended score
-        ranked_docs = sorted(
-            doc_scores.items(),
-            key=lambda x: x[1]['rrf_score'],
-            reverse=True
+            if missing:
+                k = min(top_k * 2, len(self.doc_corpus))  # Get more for fusion
+                doc_indices, scores = self.bm25.retrieve(
+                    [list(keys[i][0]) for i in missing],
+                    k=k,
+                    backend_selection="auto",  # numba when activated, else NumPy
+                    show_progress=False
+                )
+                for i, row_indices, row_scores in zip(missing, doc_indices, scores):
+                    ranked[i] = (row_indices.copy(), row_scores.copy())  # Detach from the batch arrays
+                    self._bm25_cache.put(keys[i], ranked[i])
+            self._count_bm25_lookups(len(queries))
+            
+            batch_results = [format_bm25_results(self.doc_corpus, *entry) for entry in ranked]
+            
+            logger.debug(f"Batch BM25 search returned {[len(r) for r in batch_results]} results")
+            return batch_results
+            
+        except Exception as e:
+            logger.error(f"Batch BM25 search failed: {e}")
+            return [[] for _ in queries]
+    
+    def _sparse_request(self, query, top_k: int) -> QueryRequest:
+        """Qdrant request ranking by the BM25 sparse vector (query: str or QueryContext)"""
+        return QueryRequest(
+            query=query_sparse_vector(QueryContext.from_query(query).tokens),
+            using=config.SPARSE_VECTOR_NAME,
+            limit=top_k * 2,  # Get more for fusion
+            with_payload=True
         )
+    
+    @staticmethod
+    def _format_sparse_points(points) -> List[Dict]:
+        """Convert sparse-vector hits into BM25 result dicts"""
+        return [
+            {
+                'id': point.id,
+                'score': point.score,
+                'payload': point.payload,
+                'source': 'bm25'
+            }
+            for point in points
+        ]
+    
+    def _server_bm25_search(self, queries: list, top_k: int) -> List[List[Dict]]:
+        """BM25 via Qdrant sparse vectors, all queries in one round trip"""
+        try:
+            responses = self.semantic_retriever.client.query_batch_points(
+                collection_name=self.semantic_retriever.collection_name,
+                requests=[self._sparse_request(query, top_k) for query in queries]
+            )
+            return [self._format_sparse_points(response.points) for response in responses]
+        except Exception as e:
+            logger.error(f"Sparse BM25 search failed: {e}")
+            return [[] for _ in queries]
+    
+    def _server_hybrid_search(self, ctx: QueryContext, top_k: int) -> Tuple[List[Dict], List[Dict]]:
+        """Dense and sparse rankings from a single Qdrant batch request
         
-        # Format results
-        results = []
-        for doc_id, info in ranked_docs:
-            doc_data = info['data']
-            doc_data['score'] = info['rrf_score']  # Use normalized blended score
-            doc_data['retrieval_sources'] = list(info['sources'])
-            results.append(doc_data)
+        Fusion stays client-side so intent weights and the 0-1 score scale
+        expected by the adaptive threshold are unchanged.
         
-        # Fixed f-string syntax
-        top_score = results[0]['score'] if results else 0
-        logger.debug(
-            f"RRF normalization: max_rrf={max_rrf_score:.4f}, "
-            f"top_score={top_score:.3f}"
-        )
+        Returns:
+            (bm25_results, semantic_results)
+        """
+        query_vector = embedding_model.embed_context(ctx)
+        try:
+            dense_response, sparse_response = self.semantic_retriever.client.query_batch_points(
+                collection_name=self.semantic_retriever.collection_name,
+                requests=[
+                    QueryRequest(
+                        query=list(map(float, query_vector)),
+                        limit=top_k * 2,
+                        params=SEARCH_PARAMS,
+                        with_payload=True
+                    ),
+                    self._sparse_request(ctx, top_k)
+                ]
+            )
+        except Exception as e:
+            logger.error(f"Sparse + dense batch search failed: {e}")
+            return [], self.semantic_retriever._semantic_retrieve(ctx, top_k * 2)
         
-        return results
+        return (
+            self._format_sparse_points(sparse_response.points),
+            self.semantic_retriever._format_points(dense_response.points, "semantic")
+        )
+    
+    def _get_fuser(self, intent: str = None):
+        """Prebuilt fuser for the intent (constructor weights for unknown intents)"""
+        return self._fusers.get(intent, self._default_fuser)
     
     def hybrid_retrieve(
         self, 
         query: str, 
         top_k: int = 5,
-        intent: str = None
+        intent: str = None,
+        query_vector=None,
+        semantic_results: Optional[List[Dict]] = None
     ) -> List[Dict]:
         """
         Perform hybrid retrieval combining BM25 and semantic search
         
         Args:
-            query: Search query
+            query: Search query (str or QueryContext)
             top_k: Number of results to return
             intent: Optional query intent for weighting adjustment
+            query_vector: Optional precomputed embedding of `query`
+            semantic_results: Optional precomputed semantic ranking (top_k * 2
+                hits, e.g. fetched alongside another search); skips the
+                semantic round trip
         
         Returns:
             List of retrieved documents with normalized scores (0.0-1.0)
         """
-        logger.info(f"Hybrid retrieval for query: '{query[:50]}...' (intent={intent})")
-        
-        # Get intent-specific weights
-        bm25_w, semantic_w = self._get_intent_weights(intent)
-        logger.debug(f"Using weights - BM25: {bm25_w}, Semantic: {semantic_w}")
-        
-        # Perform both searches
-        bm25_results = self._bm25_search(query, top_k)
-        # Call internal _semantic_retrieve() to avoid recursion
-        semantic_results = self.semantic_retriever._semantic_retrieve(query, top_k * 2)
+        # Normalize once; BM25 tokens and the memoized embedding are shared
+        ctx = QueryContext.from_query(query, query_vector)
+        logger.info(f"Hybrid retrieval for query: '{ctx.raw[:50]}...' (intent={intent})")
         
-        # If BM25 failed, fall back to semantic only
-        if not bm25_results:
-            logger.warning("BM25 returned no results, using semantic-only")
-            return semantic_results[:top_k]
+        # Intent-specific fuser (weights baked in)
+        fuser = self._get_fuser(intent)
         
-        # Combine using RRF with normalization
-        combined_results = self._reciprocal_rank_fusion(
-            bm25_results,
-            semantic_results,
-            bm25_w,
-            semantic_w
-        )
+        if semantic_results is not None:
+            # Semantic side already fetched by the caller; only BM25 is left
+            if self.server_sparse:
+                bm25_results = self._server_bm25_search([ctx], top_k)[0]
+            else:
+                bm25_results = self._bm25_search(ctx, top_k)
+        elif self.server_sparse:
+            # Both rankers in one Qdrant round trip
+            bm25_results, semantic_results = self._server_hybrid_search(ctx, top_k)
+        else:
+            # Perform both searches concurrently: local BM25 overlaps the Qdrant round trip
+            bm25_future = self._bm25_executor.submit(self._bm25_search, ctx, top_k)
+            # Call internal _semantic_retrieve() to avoid recursion
+            semantic_results = self.semantic_retriever._semantic_retrieve(ctx, top_k * 2)
+            bm25_results = bm25_future.result()
         
-        # Return top-k
-        final_results = combined_results[:top_k]
+        final_results = fuse(bm25_results, semantic_results, fuser, top_k)
         
         # Log retrieval sources and score range
         sources_count = defaultdict(int)
@@ -282,7 +463,6 @@ class HybridRetriever:
             for source in doc.get('retrieval_sources', []):
                 sources_count[source] += 1
         
-        # Fixed f-string syntax  
         if final_results:
             score_range = f"{final_results[0]['score']:.3f}-{final_results[-1]['score']:.3f}"
         else:
@@ -0,0 +1,75 @@
+"""Embedding-prototype intent classifier
+
+Intent is a closed-set choice among config.INTENT_LABELS, and the query is
+embedded for retrieval anyway. Each label gets a prototype, the normalized mean
+embedding of its example queries (config.INTENT_EXAMPLES), and a query takes
+the nearest prototype's label. When the two best prototypes are closer than
+INTENT_CONFIDENCE_MARGIN the classifier abstains and the Ollama classifier decides.
+"""
+from functools import lru_cache
+from typing import Dict, Optional, Sequence
+import numpy as np
+from src.logger import setup_logger
+import config
+
+logger = setup_logger(__name__)
+
+
+class EmbeddingIntentClassifier:
+    """Nearest-prototype intent classifier over normalized query embeddings"""
+
+    def __init__(
+        self,
+        examples: Dict[str, Sequence[str]] = None,
+        margin: float = None,
+        example_vectors: np.ndarray = None
+    ):
+        """
+        Args:
+            examples: Label -> example queries (defaults to config.INTENT_EXAMPLES)
+            margin: Minimum cosine lead of the best prototype over the runner-up
+            example_vectors: Precomputed example embeddings, one row per example
+                in label order; skips the embedding model
+        """
+        examples = examples or config.INTENT_EXAMPLES
+        self.labels = tuple(examples)
+        self.margin = config.INTENT_CONFIDENCE_MARGIN if margin is None else margin
+
+        # One batched encode for every example; prototypes are (labels, dimension) float32
+        if example_vectors is None:
+            from src.embeddings import embedding_model  # Loads the model on first import
+            example_vectors = embedding_model.embed_queries([q for label in self.labels for q in examples[label]])
+        vectors = np.asarray(example_vectors, dtype=np.float32)
+        sizes = np.array([len(examples[label]) for label in self.labels])
+        sums = np.add.reduceat(vectors, np.concatenate(([0], np.cumsum(sizes)[:-1])), axis=0)
+        self._prototypes = (sums / np.linalg.norm(sums, axis=1, keepdims=True)).astype(np.float32)
+
+        logger.info(f"Intent prototypes built for {len(self.labels)} labels from {len(vectors)} examples")
+
+    def classify(self, query_vector) -> Optional[str]:
+        """Label of the nearest prototype, or None when it is not a clear winner
+
+        Args:
+            query_vector: Normalized query embedding
+
+        Returns:
+            Intent label, or None to defer to the LLM classifier
+        """
+        scores = self._prototypes @ np.asarray(query_vector, dtype=np.float32)
+        runner_up, best = np.argsort(scores)[-2:]
+        lead = float(scores[best] - scores[runner_up])
+
+        if lead < self.margin:
+            logger.debug(
+                f"Embedding intent undecided ({self.labels[best]} vs {self.labels[runner_up]}, lead={lead:.3f})"
+            )
+            return None
+
+        logger.info(f"Classified intent from embedding: {self.labels[best]} (lead={lead:.3f})")
+        return self.labels[best]
+
+
+@lru_cache(maxsize=1)
+def get_intent_classifier() -> EmbeddingIntentClassifier:
+    """Shared classifier (prototypes are embedded on first use)"""
+    return EmbeddingIntentClassifier()
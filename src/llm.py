@@ -1,14 +1,20 @@
+import asyncio
+import weakref
 from langchain_groq import ChatGroq
 from langchain_community.chat_models import ChatOllama
 import config
 
+# One semaphore per event loop (asyncio primitives are bound to the loop they first run on)
+_llm_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
 
 def get_ollama_llm():
     """Initialize Ollama LLM for adaptive tasks (intent, reflection)"""
     return ChatOllama(
         model=config.OLLAMA_MODEL,
         temperature=config.TEMPERATURE,
-        base_url=config.OLLAMA_BASE_URL
+        base_url=config.OLLAMA_BASE_URL,
+        keep_alive=config.OLLAMA_KEEP_ALIVE
     )
 
 
@@ -27,3 +33,22 @@ def get_chunking_llm():
         temperature=config.TEMPERATURE,
         base_url=config.OLLAMA_BASE_URL
     )
+
+
+def _llm_semaphore() -> asyncio.Semaphore:
+    """Running loop's cap on in-flight LLM calls"""
+    loop = asyncio.get_running_loop()
+    semaphore = _llm_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _llm_semaphores[loop] = asyncio.Semaphore(config.MAX_INFLIGHT_LLM)
+    return semaphore
+
+
+async def ainvoke_limited(chain, inputs: dict):
+    """chain.ainvoke() with at most MAX_INFLIGHT_LLM calls in flight per event loop
+    
+    Bursts of concurrent judge / correction calls queue here instead of
+    oversubscribing the Groq rate limit or Ollama's parallel slots.
+    """
+    async with _llm_semaphore():
+        return await chain.ainvoke(inputs)
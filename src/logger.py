@@ -1,33 +1,58 @@
 """Logging configuration for RAG system"""
+import atexit
 import logging
+import queue
 import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 import config
 
+# One console + one file handler for the whole process, fed through a queue so
+# retrieval threads never block on log I/O
+_QUEUE_HANDLER = None
+_HANDLER_LOCK = threading.Lock()
+
+
+def _get_queue_handler() -> QueueHandler:
+    """Create the shared handlers and background listener on first use"""
+    global _QUEUE_HANDLER
+
+    with _HANDLER_LOCK:
+        if _QUEUE_HANDLER is None:
+            formatter = logging.Formatter(config.LOG_FORMAT)
+
+            # Console handler
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setLevel(config.LOG_LEVEL)
+            console_handler.setFormatter(formatter)
+
+            # File handler
+            log_dir = Path("logs")
+            log_dir.mkdir(exist_ok=True)
+            file_handler = logging.FileHandler(log_dir / "rag_system.log")
+            file_handler.setLevel(config.LOG_LEVEL)
+            file_handler.setFormatter(formatter)
+
+            log_queue = queue.SimpleQueue()
+            listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+            listener.start()
+            atexit.register(listener.stop)  # Flush queued records on shutdown
+
+            _QUEUE_HANDLER = QueueHandler(log_queue)
+
+    return _QUEUE_HANDLER
+
 
 def setup_logger(name: str) -> logging.Logger:
-    """Setup logger with file and console handlers"""
+    """Setup logger writing to the shared console and file handlers"""
     logger = logging.getLogger(name)
     logger.setLevel(config.LOG_LEVEL)
-    
+
     # Avoid duplicate handlers
     if logger.handlers:
         return logger
-    
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(config.LOG_LEVEL)
-    console_formatter = logging.Formatter(config.LOG_FORMAT)
-    console_handler.setFormatter(console_formatter)
-    
-    # File handler
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    file_handler = logging.FileHandler(log_dir / "rag_system.log")
-    file_handler.setLevel(config.LOG_LEVEL)
-    file_handler.setFormatter(console_formatter)
-    
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    
+
+    logger.addHandler(_get_queue_handler())
+
     return logger
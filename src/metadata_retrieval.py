@@ -5,23 +5,90 @@ Guarantees that results are from the requested scheme(s).
 
 Two-Stage Fallback mechanism (Industry Standard):
 1. Try filtered vector search
-2. If 0 results: Fetch ALL scheme docs + BM25 re-rank
+2. If 0 results: BM25 over the schemes (Qdrant sparse vectors when indexed,
+   otherwise fetch ALL scheme docs + in-process BM25)
 3. If still insufficient: Blend with hybrid search
 4. Apply adaptive threshold as final quality gate
 
 Based on AWS ML Blog and production RAG best practices.
 """
-from typing import List, Dict, Optional
-from qdrant_client.models import Filter, FieldCondition, MatchValue, MatchAny
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, List, Dict, NamedTuple, Optional, Tuple
+from qdrant_client.models import Filter, FieldCondition, MatchValue, MatchAny, QueryRequest, PayloadSchemaType
 from src.logger import setup_logger
 from src.embeddings import embedding_model
+from src.retrieval import SEARCH_PARAMS
+from src.query_context import QueryContext, tokenize
+from src.qdrant_utils import parallel_scroll
+from src.query_cache import QueryCache
+from src.sparse_vectors import bm25_document_text, query_sparse_vector, server_sparse_available
 from src.exceptions import RetrievalError
-from rank_bm25 import BM25Okapi
+from src.bm25_postings import PostingsBM25
+import numpy as np
 import config
 
+try:
+    import bm25s
+    BM25S_AVAILABLE = True
+except ImportError:
+    BM25S_AVAILABLE = False
+
 logger = setup_logger(__name__)
 
 
+# Filters are rebuilt for the same few schemes/themes on every query; the
+# pydantic models are built (and validated) once and shared. Callers must not
+# mutate them.
+@lru_cache(maxsize=256)
+def _scheme_filter(scheme_names: Tuple[str, ...]) -> Filter:
+    """Filter on scheme_name (exact match for one scheme, match-any for several)"""
+    if len(scheme_names) == 1:
+        # Single scheme filter
+        match = MatchValue(value=scheme_names[0])
+    else:
+        # Multiple schemes - match any
+        match = MatchAny(any=list(scheme_names))
+    return Filter(must=[FieldCondition(key="scheme_name", match=match)])
+
+
+@lru_cache(maxsize=32)
+def _theme_filter(theme: str) -> Filter:
+    """Filter on theme"""
+    return Filter(must=[FieldCondition(key="theme", match=MatchValue(value=theme))])
+
+
+@lru_cache(maxsize=256)
+def _scheme_theme_filter(scheme_names: Tuple[str, ...], theme: str) -> Filter:
+    """Scheme AND theme filter"""
+    return Filter(must=_scheme_filter(scheme_names).must + _theme_filter(theme).must)
+
+
+class _SchemeCorpus(NamedTuple):
+    """Stage 2 BM25 index in struct-of-arrays layout: doc i is (ids[i], payloads[i])"""
+    bm25: Any
+    ids: list
+    payloads: List[Dict]
+
+
+def _point_columns(points) -> List[tuple]:
+    """Scrolled records -> (id, payload) pairs (parallel_scroll page transform)"""
+    return [(point.id, point.payload) for point in points]
+
+
+def _unranked_docs(corpus: _SchemeCorpus, top_k: int, retrieval_method: str = "metadata_only") -> List[Dict]:
+    """First top_k corpus docs as unscored result dicts (fallback when BM25 scoring fails)"""
+    return [
+        {
+            "id": corpus.ids[i],
+            "score": 0.0,  # No semantic score yet
+            "payload": corpus.payloads[i],
+            "retrieval_method": retrieval_method
+        }
+        for i in range(min(top_k, len(corpus.ids)))
+    ]
+
+
 class MetadataRetriever:
     """Metadata-aware retrieval with two-stage fallback"""
     
@@ -33,74 +100,63 @@ class MetadataRetriever:
         """
         self.client = qdrant_client
         self.collection_name = collection_name
+        # Single-scheme indexes from prebuild_scheme_indexes(): no TTL, no eviction
+        self._prebuilt_corpora: Dict[tuple, _SchemeCorpus] = {}
+        # Stage 2 BM25 index + docs per ad-hoc scheme set, built on demand
+        self._scheme_bm25_cache = QueryCache(
+            max_size=config.SCHEME_BM25_CACHE_SIZE,
+            ttl_seconds=config.SCHEME_BM25_CACHE_TTL_SECONDS,
+            name="scheme_bm25_cache"
+        )
+        # Fast-path BM25 index over the first METADATA_ONLY_SCROLL_LIMIT docs of a scheme set
+        self._metadata_only_cache = QueryCache(
+            max_size=config.SCHEME_BM25_CACHE_SIZE,
+            ttl_seconds=config.SCHEME_BM25_CACHE_TTL_SECONDS,
+            name="metadata_only_bm25_cache"
+        )
+        self._ensure_payload_indexes()
+        # Stage 2 ranks by the collection's sparse BM25 vector instead of scrolling the schemes
+        self.server_sparse = server_sparse_available(qdrant_client, collection_name)
         logger.info("MetadataRetriever initialized with two-stage fallback")
     
-    def _build_scheme_filter(self, scheme_names: List[str]) -> Filter:
-        """Build Qdrant filter for scheme names
+    def _ensure_payload_indexes(self):
+        """Create missing keyword indexes on the filtered fields (idempotent)
         
-        Args:
-            scheme_names: List of scheme names to filter by
-            
-        Returns:
-            Qdrant Filter object
+        Without them Qdrant evaluates scheme/theme filters by scanning payloads.
         """
-        if len(scheme_names) == 1:
-            # Single scheme filter
-            return Filter(
-                must=[
-                    FieldCondition(
-                        key="scheme_name",
-                        match=MatchValue(value=scheme_names[0])
-                    )
-                ]
-            )
-        else:
-            # Multiple schemes - match any
-            return Filter(
-                must=[
-                    FieldCondition(
-                        key="scheme_name",
-                        match=MatchAny(any=scheme_names)
-                    )
-                ]
-            )
+        try:
+            indexed = self.client.get_collection(self.collection_name).payload_schema or {}
+            for field in config.PAYLOAD_INDEX_FIELDS:
+                if field in indexed:
+                    continue
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field,
+                    field_schema=PayloadSchemaType.KEYWORD,
+                    wait=False
+                )
+                logger.info(f"Created keyword payload index on '{field}'")
+        except Exception as e:
+            logger.warning(f"Could not verify payload indexes: {e}")
     
-    def _build_theme_filter(self, theme: str) -> Filter:
-        """Build Qdrant filter for theme
+    def _build_scheme_filter(self, scheme_names: List[str]) -> Filter:
+        """Build Qdrant filter for scheme names (shared, memoized instance)
         
         Args:
-            theme: Theme to filter by (e.g., 'eligibility', 'benefits')
+            scheme_names: List of scheme names to filter by
             
         Returns:
             Qdrant Filter object
         """
-        return Filter(
-            must=[
-                FieldCondition(
-                    key="theme",
-                    match=MatchValue(value=theme)
-                )
-            ]
-        )
+        return _scheme_filter(tuple(scheme_names))
     
-    def _combine_filters(self, scheme_filter: Filter, theme_filter: Optional[Filter] = None) -> Filter:
-        """Combine multiple filters
-        
-        Args:
-            scheme_filter: Scheme name filter
-            theme_filter: Optional theme filter
-            
-        Returns:
-            Combined Filter object
-        """
-        if theme_filter is None:
-            return scheme_filter
-        
-        # Combine both filters (AND operation)
-        combined_conditions = scheme_filter.must + theme_filter.must
-        return Filter(must=combined_conditions)
+    def _build_filter(self, scheme_names: List[str], theme: Optional[str] = None) -> Filter:
+        """Scheme filter, AND-ed with the theme filter when given (shared, memoized instance)"""
+        if not theme:
+            return _scheme_filter(tuple(scheme_names))
+        return _scheme_theme_filter(tuple(scheme_names), theme)
     
-    def _fetch_all_scheme_docs(self, scheme_names: List[str]) -> List[Dict]:
+    def _fetch_scheme_columns(self, scheme_names: List[str]) -> Tuple[list, List[Dict]]:
         """Fetch ALL documents from specified schemes (no vector search)
         
         Used in Stage 2 when filtered vector search returns 0 results.
@@ -109,103 +165,263 @@ class MetadataRetriever:
             scheme_names: List of scheme names
             
         Returns:
-            List of all documents from those schemes
+            (ids, payloads) of all documents from those schemes, as parallel lists
         """
         logger.info(f"Fetching ALL documents from schemes: {scheme_names}")
         
         try:
             scheme_filter = self._build_scheme_filter(scheme_names)
             
-            # Scroll through all matching documents
-            all_docs = []
-            offset = None
-            
-            while True:
-                results = self.client.scroll(
-                    collection_name=self.collection_name,
-                    scroll_filter=scheme_filter,
-                    limit=100,
-                    offset=offset,
-                    with_payload=True,
-                    with_vectors=False
-                )
-                
-                points, offset = results
-                
-                if not points:
-                    break
-                
-                for point in points:
-                    all_docs.append({
-                        "id": point.id,
-                        "score": 0.0,  # No semantic score yet
-                        "payload": point.payload,
-                        "retrieval_method": "metadata_only"
-                    })
-                
-                if offset is None:
-                    break
+            # Scroll all matching documents (large schemes fetched over concurrent id ranges),
+            # reducing each page to (id, payload) as it arrives
+            pairs = parallel_scroll(
+                self.client,
+                self.collection_name,
+                scroll_filter=scheme_filter,
+                transform=_point_columns
+            )
             
-            logger.info(f"Fetched {len(all_docs)} total documents from schemes")
-            return all_docs
+            logger.info(f"Fetched {len(pairs)} total documents from schemes")
+            return [point_id for point_id, _ in pairs], [payload for _, payload in pairs]
             
         except Exception as e:
             logger.error(f"Failed to fetch all scheme docs: {e}")
-            return []
+            return [], []
     
-    def _rerank_with_bm25(self, query: str, docs: List[Dict], top_k: int = 5) -> List[Dict]:
-        """Re-rank documents using BM25 keyword matching
+    def _server_scheme_bm25(self, query_tokens: List[str], scheme_names: List[str], top_k: int) -> List[Dict]:
+        """Stage 2 in Qdrant: sparse BM25 query restricted to the schemes
+        
+        Returns only top_k points, so no scheme docs are scrolled and no
+        index is built in-process.
         
         Args:
-            query: Search query
-            docs: Documents to re-rank
+            query_tokens: Tokenized query (QueryContext.tokens)
+            scheme_names: Schemes whose docs are ranked
             top_k: Number of top results to return
             
         Returns:
-            Re-ranked documents with BM25 scores
+            BM25-ranked documents (empty if no scheme doc shares a token with the query)
         """
-        if not docs:
-            return []
+        response = self.client.query_points(
+            collection_name=self.collection_name,
+            query=query_sparse_vector(query_tokens),
+            using=config.SPARSE_VECTOR_NAME,
+            query_filter=self._build_scheme_filter(scheme_names),
+            limit=top_k,
+            with_payload=True
+        )
+        return [
+            {
+                "id": point.id,
+                "score": point.score,
+                "payload": point.payload,
+                "retrieval_method": "bm25_reranked"
+            }
+            for point in response.points
+        ]
+    
+    def _build_corpus(self, ids: list, payloads: List[Dict]) -> _SchemeCorpus:
+        """BM25 index over scheme name + theme + text of each doc
+        
+        bm25s precomputes a sparse doc-term score matrix (numba-JIT scoring when
+        available); NumPy postings are the fallback.
+        """
+        tokenized_corpus = [tokenize(bm25_document_text(payload)) for payload in payloads]
         
-        logger.info(f"Re-ranking {len(docs)} documents with BM25")
+        if not BM25S_AVAILABLE:
+            return _SchemeCorpus(PostingsBM25(tokenized_corpus), ids, payloads)
         
+        bm25 = bm25s.BM25()
+        bm25.index(tokenized_corpus, show_progress=False)
         try:
-            # Extract text from documents
-            texts = []
-            for doc in docs:
-                # Combine relevant fields for BM25
-                text = doc['payload'].get('text', '')
-                scheme_name = doc['payload'].get('scheme_name', '')
-                theme = doc['payload'].get('theme', '')
-                texts.append(f"{scheme_name} {theme} {text}")
-            
-            # Tokenize for BM25
-            tokenized_corpus = [text.lower().split() for text in texts]
-            bm25 = BM25Okapi(tokenized_corpus)
-            
-            # Get BM25 scores
-            tokenized_query = query.lower().split()
-            bm25_scores = bm25.get_scores(tokenized_query)
-            
-            # Assign scores to documents
-            for doc, score in zip(docs, bm25_scores):
-                doc['score'] = float(score)
-                doc['retrieval_method'] = 'bm25_reranked'
+            bm25.activate_numba_scorer()
+        except Exception as e:
+            logger.debug(f"numba scorer unavailable, using NumPy BM25 backend: {e}")
+        return _SchemeCorpus(bm25, ids, payloads)
+    
+    def _bm25_top_k(
+        self,
+        corpus: _SchemeCorpus,
+        query_tokens: List[str],
+        top_k: int,
+        retrieval_method: str = "bm25_reranked"
+    ) -> List[Dict]:
+        """Top-k docs by BM25 score; result dicts are built for the top-k only"""
+        k = min(top_k, len(corpus.ids))
+        
+        if BM25S_AVAILABLE:
+            indices, scores = corpus.bm25.retrieve([query_tokens], k=k, backend_selection="auto", show_progress=False)
+            indices, scores = indices[0], scores[0]
+        else:
+            all_scores = corpus.bm25.get_scores(query_tokens)
+            candidates = np.argpartition(-all_scores, k - 1)[:k]
+            indices = candidates[np.argsort(-all_scores[candidates], kind="stable")]
+            scores = all_scores[indices]
+        
+        return [
+            {
+                "id": corpus.ids[idx],
+                "score": score,
+                "payload": corpus.payloads[idx],
+                "retrieval_method": retrieval_method
+            }
+            for idx, score in zip(indices.tolist(), scores.tolist())
+        ]
+    
+    def prebuild_scheme_indexes(self):
+        """Build the Stage 2 BM25 index of every scheme from one collection scroll
+        
+        Part of the warmup of whatever uses this retriever (see
+        VectorRetriever.metadata_retriever). The per-scheme indexes are pinned
+        (they never expire into an on-request rebuild); run this again after
+        re-ingestion to refresh them.
+        """
+        if not config.SCHEME_BM25_PREBUILD or self.server_sparse:
+            return
+        
+        try:
+            pairs = parallel_scroll(self.client, self.collection_name, transform=_point_columns)
+            
+            columns_by_scheme = defaultdict(lambda: ([], []))
+            for point_id, payload in pairs:
+                ids, payloads = columns_by_scheme[payload.get("scheme_name")]
+                ids.append(point_id)
+                payloads.append(payload)
+            columns_by_scheme.pop(None, None)
+            
+            # Swapped in whole, so concurrent readers see either the old or the new set
+            self._prebuilt_corpora = {
+                (scheme_name,): self._build_corpus(ids, payloads)
+                for scheme_name, (ids, payloads) in columns_by_scheme.items()
+            }
+            
+            logger.info(f"Prebuilt Stage 2 BM25 indexes for {len(columns_by_scheme)} schemes ({len(pairs)} docs)")
+        except Exception as e:
+            logger.warning(f"Scheme BM25 prebuild failed, indexes will be built on demand: {e}")
+    
+    def _cached_corpus(self, key: tuple) -> Optional[_SchemeCorpus]:
+        """Full BM25 corpus of a sorted scheme-name tuple: prebuilt, else built on demand earlier"""
+        corpus = self._prebuilt_corpora.get(key)
+        if corpus is None:
+            corpus = self._scheme_bm25_cache.get(key)
+        return corpus
+    
+    def _rerank_scheme_docs(
+        self,
+        query: str,
+        scheme_names: List[str],
+        top_k: int = 5,
+        query_tokens: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """Stage 2: BM25 over ALL docs of the schemes, index cached per scheme set
+        
+        With server-side sparse vectors this is a single filtered Qdrant query.
+        Otherwise the first query for a scheme set fetches its docs and builds
+        the index; later queries only score.
+        
+        Args:
+            query: Search query
+            scheme_names: Schemes whose docs are ranked
+            top_k: Number of top results to return
+            query_tokens: Optional pre-tokenized query (QueryContext.tokens)
             
-            # Sort by BM25 score
-            docs.sort(key=lambda x: x['score'], reverse=True)
+        Returns:
+            BM25-ranked documents (empty if the schemes have no documents)
+        """
+        tokenized_query = query_tokens if query_tokens is not None else tokenize(query)
+        
+        if self.server_sparse:
+            try:
+                ranked_docs = self._server_scheme_bm25(tokenized_query, scheme_names, top_k)
+                if ranked_docs:
+                    return ranked_docs
+            except Exception as e:
+                logger.error(f"Sparse Stage 2 query failed, using in-process BM25: {e}")
+        
+        key = tuple(sorted(scheme_names))
+        corpus = self._cached_corpus(key)
+        
+        if corpus is None:
+            ids, payloads = self._fetch_scheme_columns(scheme_names)
+            if not ids:
+                return []
+            try:
+                corpus = self._build_corpus(ids, payloads)
+            except Exception as e:
+                logger.error(f"BM25 index build failed for {scheme_names}: {e}")
+                return _unranked_docs(_SchemeCorpus(None, ids, payloads), top_k)
+            self._scheme_bm25_cache.put(key, corpus)
+        
+        try:
+            return self._bm25_top_k(corpus, tokenized_query, top_k)
+        except Exception as e:
+            logger.error(f"BM25 re-ranking failed: {e}")
+            return _unranked_docs(corpus, top_k)
+    
+    def retrieve_metadata_only(
+        self,
+        query,
+        scheme_names: List[str],
+        top_k: int = 5,
+        limit: int = None
+    ) -> List[Dict]:
+        """Fast path: scheme-filtered scroll + in-memory BM25 (no embedding call)
+        
+        For high-confidence single-scheme queries the filtered subset is small,
+        so keyword scoring over it replaces the embedding forward pass and ANN search.
+        
+        Args:
+            query: Search query (str or QueryContext)
+            scheme_names: List of scheme names to filter by
+            top_k: Number of results to return
+            limit: Max documents fetched from the schemes
             
-            logger.info(
-                f"BM25 re-ranking complete. Top scores: "
-                f"{[round(d['score'], 3) for d in docs[:5]]}"
+        Returns:
+            BM25-ranked documents (empty if the schemes have no documents)
+        """
+        ctx = QueryContext.from_query(query)
+        key = tuple(sorted(scheme_names))
+        limit = limit or config.METADATA_ONLY_SCROLL_LIMIT
+        
+        # Prebuilt / Stage 2 scheme index, else the capped index an earlier fast-path call
+        # built: no scroll, no document tokenization, only the query's tokens are scored
+        corpus = self._cached_corpus(key) or self._metadata_only_cache.get((key, limit))
+        if corpus is not None:
+            try:
+                ranked_docs = self._bm25_top_k(corpus, ctx.tokens, top_k, retrieval_method='metadata_only_bm25')
+            except Exception as e:
+                logger.error(f"Metadata-only BM25 scoring failed: {e}")
+                return []
+            logger.info(f"Metadata-only fast path returned {len(ranked_docs)} documents for {scheme_names} (cached index)")
+            return ranked_docs
+        
+        try:
+            points, _ = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=self._build_scheme_filter(scheme_names),
+                limit=limit,
+                with_payload=True,
+                with_vectors=False
             )
-            
-            return docs[:top_k]
-            
+        except Exception as e:
+            logger.error(f"Metadata-only scroll failed: {e}")
+            return []
+        
+        if not points:
+            return []
+        
+        # Documents are tokenized once here; repeat queries on these schemes hit the cache above
+        corpus = _SchemeCorpus(None, [point.id for point in points], [point.payload for point in points])
+        try:
+            corpus = self._build_corpus(corpus.ids, corpus.payloads)
+            self._metadata_only_cache.put((key, limit), corpus)
+            ranked_docs = self._bm25_top_k(corpus, ctx.tokens, top_k, retrieval_method='metadata_only_bm25')
         except Exception as e:
             logger.error(f"BM25 re-ranking failed: {e}")
-            # Fallback: return original docs
-            return docs[:top_k]
+            ranked_docs = _unranked_docs(corpus, top_k, retrieval_method='metadata_only_bm25')
+        
+        logger.info(f"Metadata-only fast path returned {len(ranked_docs)} documents for {scheme_names}")
+        return ranked_docs
     
     def retrieve_with_filter(
         self,
@@ -230,6 +446,27 @@ class MetadataRetriever:
         Returns:
             List of retrieved documents with metadata
         """
+        retrieved_docs, _, _ = self._two_stage_retrieve(query, scheme_names, top_k, theme, min_results)
+        return retrieved_docs
+    
+    def _two_stage_retrieve(
+        self,
+        query: str,
+        scheme_names: List[str],
+        top_k: int,
+        theme: Optional[str],
+        min_results: int,
+        global_limit: int = 0
+    ) -> Tuple[List[Dict], Optional[list], bool]:
+        """Two-stage filtered retrieval, optionally prefetching an unfiltered ranking
+        
+        With global_limit > 0 an unfiltered vector search rides along with the
+        Stage 1 query in the same batch request, so a later hybrid fallback
+        needs no semantic round trip of its own.
+        
+        Returns:
+            (retrieved documents, unfiltered points or None, whether Stage 2 BM25 produced them)
+        """
         logger.info(
             f"Two-stage filtered retrieval: schemes={scheme_names}, "
             f"theme={theme}, top_k={top_k}"
@@ -240,26 +477,45 @@ class MetadataRetriever:
             query_vector = embedding_model.embed_query(query)
             
             # Build filter
-            scheme_filter = self._build_scheme_filter(scheme_names)
+            combined_filter = self._build_filter(scheme_names, theme)
             
-            if theme:
-                theme_filter = self._build_theme_filter(theme)
-                combined_filter = self._combine_filters(scheme_filter, theme_filter)
+            global_points = None
+            if global_limit:
+                # Filtered + unfiltered searches in one round trip
+                filtered_response, global_response = self.client.query_batch_points(
+                    collection_name=self.collection_name,
+                    requests=[
+                        QueryRequest(
+                            query=query_vector,
+                            filter=combined_filter,
+                            limit=top_k,
+                            params=SEARCH_PARAMS,
+                            with_payload=True
+                        ),
+                        QueryRequest(
+                            query=query_vector,
+                            limit=global_limit,
+                            params=SEARCH_PARAMS,
+                            with_payload=True
+                        )
+                    ]
+                )
+                points = filtered_response.points
+                global_points = global_response.points
             else:
-                combined_filter = scheme_filter
-            
-            # Query with filter
-            response = self.client.query_points(
-                collection_name=self.collection_name,
-                query=query_vector,
-                query_filter=combined_filter,
-                limit=top_k,
-                with_payload=True
-            )
+                # Query with filter
+                points = self.client.query_points(
+                    collection_name=self.collection_name,
+                    query=query_vector,
+                    query_filter=combined_filter,
+                    limit=top_k,
+                    search_params=SEARCH_PARAMS,
+                    with_payload=True
+                ).points
             
             # Format results
             retrieved_docs = []
-            for point in response.points:
+            for point in points:
                 retrieved_docs.append({
                     "id": point.id,
                     "score": point.score,
@@ -274,7 +530,7 @@ class MetadataRetriever:
             
             # Check if we have enough results
             if len(retrieved_docs) >= min_results:
-                return retrieved_docs
+                return retrieved_docs, global_points, False
             
             # STAGE 2: Fetch ALL scheme docs + BM25 re-rank
             logger.warning(
@@ -282,26 +538,32 @@ class MetadataRetriever:
                 f"Activating Stage 2: BM25 re-ranking"
             )
             
-            all_scheme_docs = self._fetch_all_scheme_docs(scheme_names)
+            # Re-rank ALL scheme docs with BM25 (index cached per scheme set)
+            reranked_docs = self._rerank_scheme_docs(query, scheme_names, top_k)
             
-            if not all_scheme_docs:
+            if not reranked_docs:
                 logger.error(f"No documents found for schemes: {scheme_names}")
-                return retrieved_docs  # Return whatever Stage 1 found
-            
-            # Re-rank with BM25
-            reranked_docs = self._rerank_with_bm25(query, all_scheme_docs, top_k)
+                return retrieved_docs, global_points, False  # Return whatever Stage 1 found
             
             logger.info(
                 f"Stage 2 (BM25 re-rank) returned {len(reranked_docs)} documents. "
                 f"Scores: {[round(d['score'], 3) for d in reranked_docs[:5]]}"
             )
             
-            return reranked_docs
+            return reranked_docs, global_points, True
             
         except Exception as e:
             logger.error(f"Two-stage retrieval failed: {e}")
             raise RetrievalError(f"Filtered retrieval error: {e}")
     
+    def _likely_short(self, scheme_names: List[str], min_results: int) -> bool:
+        """True if the scheme set's cached corpus can't yield min_results docs
+        
+        Unknown (not yet indexed) scheme sets count as not short.
+        """
+        corpus = self._cached_corpus(tuple(sorted(scheme_names)))
+        return corpus is not None and len(corpus.ids) < min_results
+    
     def retrieve_with_fallback(
         self,
         query: str,
@@ -329,16 +591,22 @@ class MetadataRetriever:
         Returns:
             Tuple of (retrieved_docs, metadata_info)
         """
-        # Try two-stage filtered retrieval first
-        filtered_docs = self.retrieve_with_filter(
-            query, scheme_names, top_k, theme, min_results=1
+        # Try two-stage filtered retrieval first. When the scheme set is known to
+        # hold fewer docs than min_filtered_results the fallback is certain, so the
+        # unfiltered ranking it needs rides along in the Stage 1 request
+        # (hybrid_retrieve(top_k * 2) ranks top_k * 4 semantic hits); otherwise
+        # the fallback, if any, issues its own search
+        prefetch = hybrid_retriever is not None and self._likely_short(scheme_names, min_filtered_results)
+        filtered_docs, global_points, used_bm25 = self._two_stage_retrieve(
+            query, scheme_names, top_k, theme, min_results=1,
+            global_limit=top_k * 4 if prefetch else 0
         )
         
         metadata_info = {
             'filtered_count': len(filtered_docs),
             'hybrid_count': 0,
             'used_fallback': False,
-            'used_bm25': any('bm25' in d.get('retrieval_method', '') for d in filtered_docs)
+            'used_bm25': used_bm25
         }
         
         # If we have enough filtered results, return them
@@ -361,7 +629,9 @@ class MetadataRetriever:
         # Get hybrid results (excluding already retrieved doc IDs)
         filtered_ids = {doc['id'] for doc in filtered_docs}
         hybrid_docs = hybrid_retriever.hybrid_retrieve(
-            query, top_k * 2, intent=None  # Get more for blending
+            query, top_k * 2, intent=None,  # Get more for blending
+            semantic_results=hybrid_retriever.semantic_retriever._format_points(global_points, "semantic")
+            if global_points is not None else None
         )
         
         # Filter out duplicates
@@ -371,17 +641,23 @@ class MetadataRetriever:
         ]
         
         # Blend: Prioritize filtered (boosted scores) + top hybrid
-        # Boost filtered scores by 0.2 to ensure they rank higher
-        for doc in filtered_docs:
-            doc['score'] = min(doc['score'] + 0.2, 1.0)
+        combined_docs = filtered_docs + additional_docs[:top_k]
+        scores = np.fromiter((doc['score'] for doc in combined_docs), dtype=np.float32, count=len(combined_docs))
+        
+        # Boost filtered scores by 0.2 (capped at 1.0) to ensure they rank higher
+        n_filtered = len(filtered_docs)
+        scores[:n_filtered] = np.minimum(scores[:n_filtered] + 0.2, 1.0)
+        for doc, score in zip(filtered_docs, scores[:n_filtered].tolist()):
+            doc['score'] = score
             doc['retrieval_method'] = doc['retrieval_method'] + '_boosted'
         
-        # Combine and re-sort
-        combined_docs = filtered_docs + additional_docs[:top_k]
-        combined_docs.sort(key=lambda x: x['score'], reverse=True)
-        final_docs = combined_docs[:top_k]
+        # Keep the top_k by score (partial sort; ties keep filtered docs first)
+        k = min(top_k, len(combined_docs))
+        top = np.argpartition(-scores, k - 1)[:k] if k else np.empty(0, dtype=np.intp)
+        top = top[np.lexsort((top, -scores[top]))]
+        final_docs = [combined_docs[i] for i in top]
         
-        metadata_info['hybrid_count'] = len([d for d in final_docs if 'hybrid' in d.get('retrieval_method', '')])
+        metadata_info['hybrid_count'] = int(np.count_nonzero(top >= n_filtered))  # Positions past the filtered docs
         metadata_info['used_fallback'] = True
         
         logger.info(
@@ -400,7 +676,8 @@ class MetadataRetriever:
         """Retrieve documents for comparing multiple schemes
         
         Ensures balanced representation of both/all schemes.
-        Uses two-stage retrieval per scheme.
+        Embeds the query once and issues all per-scheme filtered searches in a
+        single batch request; schemes with no hits fall back to BM25 (Stage 2).
         
         Args:
             query: Comparison query
@@ -412,21 +689,54 @@ class MetadataRetriever:
         """
         logger.info(f"Multi-scheme comparison retrieval: {scheme_names}")
         
-        results_by_scheme = {}
+        results_by_scheme = {scheme_name: [] for scheme_name in scheme_names}
+        if not scheme_names:
+            return results_by_scheme
+        
+        try:
+            # STAGE 1: One embedding, one round-trip for all schemes
+            query_vector = embedding_model.embed_query(query)
+            requests = [
+                QueryRequest(
+                    query=query_vector,
+                    filter=self._build_scheme_filter([scheme_name]),
+                    limit=docs_per_scheme,
+                    params=SEARCH_PARAMS,
+                    with_payload=True
+                )
+                for scheme_name in scheme_names
+            ]
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=requests
+            )
+            
+            for scheme_name, response in zip(scheme_names, responses):
+                results_by_scheme[scheme_name] = [
+                    {
+                        "id": point.id,
+                        "score": point.score,
+                        "payload": point.payload,
+                        "retrieval_method": "filtered_vector"
+                    }
+                    for point in response.points
+                ]
+        except Exception as e:
+            logger.error(f"Batched comparison search failed: {e}")
         
         for scheme_name in scheme_names:
+            if results_by_scheme[scheme_name]:
+                logger.info(f"Retrieved {len(results_by_scheme[scheme_name])} docs for {scheme_name}")
+                continue
+            
+            # STAGE 2: Fetch ALL scheme docs + BM25 re-rank
             try:
-                # Use two-stage retrieval for each scheme
-                docs = self.retrieve_with_filter(
-                    query=query,
-                    scheme_names=[scheme_name],
-                    top_k=docs_per_scheme,
-                    min_results=1
+                results_by_scheme[scheme_name] = self._rerank_scheme_docs(
+                    query, [scheme_name], docs_per_scheme
+                )
+                logger.info(
+                    f"Retrieved {len(results_by_scheme[scheme_name])} docs for {scheme_name} (BM25 fallback)"
                 )
-                
-                results_by_scheme[scheme_name] = docs
-                logger.info(f"Retrieved {len(docs)} docs for {scheme_name}")
-                
             except Exception as e:
                 logger.error(f"Failed to retrieve for {scheme_name}: {e}")
                 results_by_scheme[scheme_name] = []
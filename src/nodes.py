@@ -1,12 +1,22 @@
-from typing import TypedDict, List, Optional
-from src.llm import get_ollama_llm, get_groq_llm
+import asyncio
+import itertools
+import re
+from typing import TypedDict, Dict, List, Optional, Tuple
+from src.llm import get_ollama_llm, get_groq_llm, ainvoke_limited
 from src.prompts import (
     intent_prompt, relevance_prompt, reflection_prompt,
-    answer_quality_prompt, corrective_prompt, answer_prompt
+    answer_quality_prompt, corrective_prompt, answer_prompt,
+    batch_relevance_prompt, batch_answer_quality_prompt
 )
 from src.retrieval import VectorRetriever
+from src.embeddings import embedding_model
+from src.query_context import QueryContext
+from src.query_cache import QueryCache
+from src.batched_judge import BatchedJudge
+from src.intent_classifier import get_intent_classifier
 from src.exceptions import EmptyQueryError, InvalidIntentError, LLMError
 from src.logger import setup_logger
+from src.thread_pool import get_thread_pool, get_draft_pool
 import config
 
 logger = setup_logger(__name__)
@@ -18,11 +28,16 @@ MAX_CORRECTION_ITERATIONS = config.MAX_CORRECTION_ITERATIONS
 
 class RAGState(TypedDict):
     query: str
+    query_embedding: Optional[list]  # Precomputed embedding of the original query
     retrieved_docs: Optional[List[dict]]
     answer: Optional[str]
     needs_reflection: Optional[bool]
     needs_correction: Optional[bool]
-    intent: Optional[str]
+    intent: Optional[str]  # Preset by the caller (e.g. the API's cache lookup) to skip classification
+    refined_query: Optional[str]  # Rewrite returned by the relevance judge along with NO
+    draft_answer: Optional[str]  # Answer drafted alongside the relevance judge (SPECULATIVE_ANSWER)
+    speculative_answer: Optional[bool]  # Per-run override of SPECULATIVE_ANSWER (off for token streaming)
+    retrievals: Optional[Dict[str, List[dict]]]  # Normalized query -> docs retrieved earlier in this run
     reflection_count: Optional[int]
     correction_count: Optional[int]
 
@@ -32,218 +47,821 @@ ollama_llm = get_ollama_llm()  # For adaptive tasks (intent, reflection)
 groq_llm = get_groq_llm()      # For heavy tasks (answer, judges)
 retriever = VectorRetriever()
 
+# Prompt | LLM chains, composed once instead of on every node call
+INTENT_CHAIN = intent_prompt | ollama_llm
+RELEVANCE_CHAIN = relevance_prompt | groq_llm
+REFLECTION_CHAIN = reflection_prompt | ollama_llm
+ANSWER_CHAIN = answer_prompt | groq_llm
+ANSWER_QUALITY_CHAIN = answer_quality_prompt | groq_llm
+CORRECTIVE_CHAIN = corrective_prompt | ollama_llm
+BATCH_RELEVANCE_CHAIN = batch_relevance_prompt | groq_llm
+BATCH_ANSWER_QUALITY_CHAIN = batch_answer_quality_prompt | groq_llm
 
-def classify_intent(query: str) -> str:
-    """Classify user query intent using Ollama (deepseek-r1:8b)"""
+# Judge verdict caches (JUDGE_CACHE_ENABLED), keyed on exact (normalized) inputs only:
+# near-identical embeddings can still need different intents ("eligibility for
+# PMEGP" vs "benefits of PMEGP")
+_intent_cache = QueryCache(config.JUDGE_CACHE_SIZE, config.JUDGE_CACHE_TTL_SECONDS, name="intent_cache")
+_relevance_cache = QueryCache(config.JUDGE_CACHE_SIZE, config.JUDGE_CACHE_TTL_SECONDS, name="relevance_judge_cache")
+_answer_quality_cache = QueryCache(config.JUDGE_CACHE_SIZE, config.JUDGE_CACHE_TTL_SECONDS, name="answer_quality_judge_cache")
+
+
+def _memo_key(query: str) -> str:
+    """Key for RAGState.retrievals: whitespace/case-normalized query"""
+    return QueryContext.from_query(query).normalized
+
+
+def _memoized_docs(state: RAGState, query: str) -> Tuple[Optional[List[dict]], Dict[str, List[dict]], str]:
+    """(docs this run already retrieved for the query or None, retrievals memo, memo key)"""
+    retrievals = state.get("retrievals") or {}
+    key = _memo_key(query)
+    docs = retrievals.get(key)
+    if docs is not None:
+        logger.info("Rewritten query already retrieved in this run, reusing its documents")
+    return docs, retrievals, key
+
+
+def _retrieve_once(state: RAGState, query: str, intent: str) -> Tuple[List[dict], Dict[str, List[dict]]]:
+    """Retrieve for a rewritten query unless this run already retrieved the same query
+    
+    Rewrites often come back identical (or identical up to case/whitespace) to
+    the current or an earlier query; those reuse the earlier documents
+    instead of repeating the vector search.
+    
+    Returns:
+        (documents, updated retrievals memo for the state)
+    """
+    docs, retrievals, key = _memoized_docs(state, query)
+    if docs is None:
+        docs = retriever.retrieve(query, intent=intent)
+        retrievals = {**retrievals, key: docs}
+    return docs, retrievals
+
+
+async def _aretrieve_once(state: RAGState, query: str, intent: str) -> Tuple[List[dict], Dict[str, List[dict]]]:
+    """Async variant of _retrieve_once() (async Qdrant client)"""
+    docs, retrievals, key = _memoized_docs(state, query)
+    if docs is None:
+        docs = await retriever.aretrieve(query, intent=intent)
+        retrievals = {**retrievals, key: docs}
+    return docs, retrievals
+
+
+def _parse_verdict(content: str) -> Tuple[str, Optional[str]]:
+    """Split a judge reply into its YES/NO verdict and the optional rewritten query after it"""
+    verdict, _, rewrite = content.strip().partition("\n")
+    return verdict.strip().upper(), rewrite.strip() or None
+
+
+# Yes/no questions open with an auxiliary or modal verb; a direct answer opens with Yes/No
+_YES_NO_QUESTION = re.compile(
+    r"^\s*(can|could|is|are|am|was|were|do|does|did|will|would|shall|should|has|have|may)\b", re.IGNORECASE
+)
+_YES_NO_ANSWER = re.compile(r"^\W*(yes|no)\b", re.IGNORECASE)
+
+
+def _clearly_relevant(retrieved_docs: list) -> bool:
+    """Relevance judge shortcut: strong cosine scores on the top documents
+    
+    Only semantic / filtered-vector scores are cosines; BM25 and boosted
+    scores are on other scales, so their results always go to the judge.
+    """
+    if not config.JUDGE_SHORTCUTS_ENABLED or not retrieved_docs:
+        return False
+    if any(doc.get("retrieval_method") not in config.COSINE_SCORED_METHODS for doc in retrieved_docs):
+        return False
+    
+    top_scores = sorted((doc.get("score", 0.0) for doc in retrieved_docs), reverse=True)[:3]
+    return (
+        top_scores[0] > config.RELEVANCE_SKIP_TOP_SCORE
+        and sum(top_scores) / len(top_scores) > config.RELEVANCE_SKIP_TOP3_MEAN
+    )
+
+
+def _clearly_adequate(query: str, answer: str) -> bool:
+    """Answer quality judge shortcut: a substantive Yes/No-led answer to a yes/no question"""
+    return (
+        config.JUDGE_SHORTCUTS_ENABLED
+        and bool(answer)
+        and len(answer.strip()) > config.ANSWER_SKIP_MIN_CHARS
+        and bool(_YES_NO_QUESTION.match(query))
+        and bool(_YES_NO_ANSWER.match(answer))
+    )
+
+
+def _relevance_case(inputs: dict) -> str:
+    """One relevance judge case in a batched prompt"""
+    return f"Query: {inputs['query']}\n\nRetrieved Schemes:\n{inputs['schemes']}"
+
+
+def _answer_quality_case(inputs: dict) -> str:
+    """One answer quality judge case in a batched prompt"""
+    return f"Query: {inputs['query']}\n\nAnswer: {inputs['answer']}"
+
+
+# Async judges under BATCH_JUDGES: concurrent calls share one Groq request
+_relevance_batcher = BatchedJudge(
+    BATCH_RELEVANCE_CHAIN, RELEVANCE_CHAIN, _relevance_case, _parse_verdict, name="relevance_batcher"
+)
+_answer_quality_batcher = BatchedJudge(
+    BATCH_ANSWER_QUALITY_CHAIN, ANSWER_QUALITY_CHAIN, _answer_quality_case, _parse_verdict,
+    name="answer_quality_batcher"
+)
+
+
+def _relevance_key(query: str, retrieved_docs: list) -> tuple:
+    """Relevance cache key: normalized query + the judged documents' point ids"""
+    return _memo_key(query), tuple(doc["id"] for doc in retrieved_docs or ())
+
+
+def _judge_cache_get(cache: QueryCache, key) -> Optional[Tuple[bool, Optional[str]]]:
+    """Cached (verdict, rewrite) for a judge, or None (miss or JUDGE_CACHE_ENABLED off)"""
+    if not config.JUDGE_CACHE_ENABLED:
+        return None
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info(f"Judge verdict served from {cache.name}")
+    return cached
+
+
+def _judge_cache_put(cache: QueryCache, key, judgment: Tuple[bool, Optional[str]]) -> Tuple[bool, Optional[str]]:
+    """Record a judge's (verdict, rewrite) and return it"""
+    if config.JUDGE_CACHE_ENABLED:
+        cache.put(key, judgment)
+    return judgment
+
+
+def _cached_intent(query: str) -> Optional[str]:
+    """Intent cached for the exact normalized query"""
+    if not config.JUDGE_CACHE_ENABLED:
+        return None
+    
+    intent = _intent_cache.get(_memo_key(query))
+    if intent is not None:
+        logger.info(f"Intent served from cache: {intent}")
+    return intent
+
+
+def _embedding_intent(query_vector) -> Optional[str]:
+    """Intent from the embedding-prototype classifier, or None when it abstains"""
+    if query_vector is None or not config.EMBEDDING_INTENT_ENABLED:
+        return None
+    try:
+        return get_intent_classifier().classify(query_vector)
+    except Exception as e:
+        logger.warning(f"Embedding intent classifier failed, using the LLM: {str(e)}")
+        return None
+
+
+def _cache_intent(query: str, intent: str):
+    """Record a classified intent in the judge cache"""
+    if config.JUDGE_CACHE_ENABLED:
+        _intent_cache.put(_memo_key(query), intent)
+
+
+def _intent_shortcut(query: str, query_vector) -> Optional[str]:
+    """Intent that needs no LLM call (cached, or a confident embedding match), or None"""
     if not query or not query.strip():
         raise EmptyQueryError("Query cannot be empty")
+    return _cached_intent(query) or _embedding_intent(query_vector)
+
+
+def _intent_inputs(query: str) -> dict:
+    """Intent chain inputs"""
+    logger.info(f"Classifying intent for query: {query[:50]}...")
+    return {"query": query}
+
+
+def _intent_error(e: Exception) -> InvalidIntentError:
+    """Log a failed intent LLM call and wrap it for the caller"""
+    logger.error(f"Intent classification failed: {str(e)}")
+    return InvalidIntentError(f"Failed to classify intent: {str(e)}")
+
+
+def _classified_intent(query: str, content: str) -> str:
+    """Parse and cache the intent classifier's reply"""
+    intent = _parse_intent(content)
+    _cache_intent(query, intent)
+    return intent
+
+
+def classify_intent(query: str, query_vector=None) -> str:
+    """Classify user query intent using Ollama (deepseek-r1:8b)
+    
+    Args:
+        query: User query
+        query_vector: Optional query embedding; enables the embedding-prototype
+            classifier, which skips the LLM when confident
+    """
+    intent = _intent_shortcut(query, query_vector)
+    if intent is not None:
+        return intent
     
     try:
-        logger.info(f"Classifying intent for query: {query[:50]}...")
-        chain = intent_prompt | ollama_llm  # Using Ollama
-        result = chain.invoke({"query": query})
-        intent = result.content.strip().upper()
-        
-        if intent not in config.INTENT_LABELS:
-            logger.warning(f"Unknown intent '{intent}', defaulting to GENERAL")
-            intent = "GENERAL"
-        
-        logger.info(f"Classified intent: {intent}")
+        result = INTENT_CHAIN.invoke(_intent_inputs(query))
+    except Exception as e:
+        raise _intent_error(e)
+    return _classified_intent(query, result.content)
+
+
+async def aclassify_intent(query: str, query_vector=None) -> str:
+    """Async variant of classify_intent() (non-blocking Ollama call)"""
+    intent = _intent_shortcut(query, query_vector)
+    if intent is not None:
         return intent
+    
+    try:
+        result = await ainvoke_limited(INTENT_CHAIN, _intent_inputs(query))
     except Exception as e:
-        logger.error(f"Intent classification failed: {str(e)}")
-        raise InvalidIntentError(f"Failed to classify intent: {str(e)}")
+        raise _intent_error(e)
+    return _classified_intent(query, result.content)
+
+
+def _parse_intent(content: str) -> str:
+    """Map the classifier reply onto a known intent label (GENERAL if unknown)"""
+    intent = content.strip().upper()
+    
+    if intent not in config.INTENT_LABEL_SET:
+        logger.warning(f"Unknown intent '{intent}', defaulting to GENERAL")
+        intent = "GENERAL"
+    
+    logger.info(f"Classified intent: {intent}")
+    return intent
+
+
+def _query_vector(state: RAGState):
+    """Embedding of the state's query (precomputed, or from the embedding cache)"""
+    query_vector = state.get("query_embedding")
+    if query_vector is None:
+        query_vector = embedding_model.embed_query(state["query"])
+    return query_vector
 
 
 def intent_node(state: RAGState):
     """Intent classification node - Uses Ollama"""
-    intent = classify_intent(state["query"])
+    # Embedded here for the intent classifier; retrieval_node reuses it from the state
+    query_vector = _query_vector(state)
+    intent = state.get("intent") or classify_intent(state["query"], query_vector)
     return {
         "intent": intent,
+        "query_embedding": query_vector,
         "reflection_count": 0,
         "correction_count": 0
     }
 
 
-def retrieval_node(state: RAGState):
-    """Document retrieval node with intent-specific parameters"""
+def _retrieval_intent(state: RAGState) -> str:
+    """Intent the state's query is retrieved for (logged with the query)"""
     intent = state.get("intent", "GENERAL")
     logger.info(f"Retrieving documents for query: {state['query'][:50]}... (intent={intent})")
+    return intent
+
+
+def _retrieval_update(state: RAGState, docs: List[dict]) -> dict:
+    """State update for the first retrieval of the run"""
+    logger.info(f"Retrieved {len(docs)} documents")
+    return {"retrieved_docs": docs, "retrievals": {_memo_key(state["query"]): docs}}
+
+
+def retrieval_node(state: RAGState):
+    """Document retrieval node with intent-specific parameters"""
+    intent = _retrieval_intent(state)
     
     # Pass intent to retriever for adaptive behavior
-    docs = retriever.retrieve(state["query"], intent=intent)
+    docs = retriever.retrieve(
+        state["query"], intent=intent, query_vector=state.get("query_embedding")
+    )
+    return _retrieval_update(state, docs)
+
+
+async def aretrieval_node(state: RAGState):
+    """Async document retrieval node (used by graph.ainvoke / astream)"""
+    intent = _retrieval_intent(state)
+    docs = await retriever.aretrieve(
+        state["query"], intent=intent, query_vector=state.get("query_embedding")
+    )
+    return _retrieval_update(state, docs)
+
+
+def _intent_retrieval_update(state: RAGState, intent: str, candidates) -> dict:
+    """State update once both the intent and the intent-agnostic candidates are in"""
+    logger.info(f"Retrieving documents for query: {state['query'][:50]}... (intent={intent})")
+    docs = retriever.select_for_intent(candidates, intent)
     
-    logger.info(f"Retrieved {len(docs)} documents")
-    return {"retrieved_docs": docs}
+    return {
+        "intent": intent,
+        "retrieved_docs": docs,
+        "retrievals": {_memo_key(state["query"]): docs},
+        "reflection_count": 0,
+        "correction_count": 0
+    }
 
 
-def judge_relevance(query: str, retrieved_docs: list, reflection_count: int) -> bool:
-    """Simple YES/NO relevance judge using Groq (llama-3.3-70b)
+def intent_retrieval_node(state: RAGState):
+    """Intent classification and retrieval in one node, overlapped
     
-    Returns True if docs are NOT relevant (needs reflection)
+    The vector search does not depend on the intent: candidates are fetched at
+    the largest intent top_k while Ollama classifies, then trimmed and
+    threshold-filtered for the classified intent.
     """
+    # The search embeds the query anyway; embedding first lets the intent classifier use it
+    query_vector = _query_vector(state)
+    intent = state.get("intent")
+    if intent is not None:
+        candidates = retriever.retrieve_candidates(state["query"], query_vector=query_vector)
+    else:
+        intent_future = get_thread_pool().submit(classify_intent, state["query"], query_vector)
+        try:
+            candidates = retriever.retrieve_candidates(state["query"], query_vector=query_vector)
+        except BaseException:
+            # Surface the retrieval error right away; a classification still running is abandoned
+            intent_future.cancel()
+            raise
+        intent = intent_future.result()
+    
+    return _intent_retrieval_update(state, intent, candidates)
+
+
+async def aintent_retrieval_node(state: RAGState):
+    """Async intent_retrieval_node (used by graph.ainvoke / astream)"""
+    query_vector = state.get("query_embedding")
+    if query_vector is None:
+        query_vector = await asyncio.to_thread(embedding_model.embed_query, state["query"])
+    
+    intent = state.get("intent")
+    if intent is not None:
+        candidates = await retriever.aretrieve_candidates(state["query"], query_vector=query_vector)
+    else:
+        intent, candidates = await asyncio.gather(
+            aclassify_intent(state["query"], query_vector),
+            retriever.aretrieve_candidates(state["query"], query_vector=query_vector)
+        )
+    
+    return _intent_retrieval_update(state, intent, candidates)
+
+
+def _relevance_shortcut(query: str, retrieved_docs: list, reflection_count: int) -> Optional[Tuple[bool, Optional[str]]]:
+    """Relevance judgment that needs no LLM call (iteration cap, clear scores, cached verdict), or None"""
     # Stop reflection if max iterations reached
     if reflection_count >= MAX_REFLECTION_ITERATIONS:
         logger.warning(f"Max reflection iterations ({MAX_REFLECTION_ITERATIONS}) reached. Proceeding with current docs.")
-        return False
+        return False, None
     
+    if _clearly_relevant(retrieved_docs):
+        logger.info("Relevance judgment skipped: top document scores are clearly relevant")
+        return False, None
+    
+    return _judge_cache_get(_relevance_cache, _relevance_key(query, retrieved_docs))
+
+
+def _relevance_inputs(query: str, retrieved_docs: list) -> dict:
+    """Relevance judge chain inputs"""
+    logger.debug(f"Relevance judge input - Query: {query[:50]}...")
+    return {"query": query, "schemes": retriever.format_for_judge(retrieved_docs)}
+
+
+def _relevance_judgment(query: str, retrieved_docs: list, verdict: str, refined_query: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """Cache and return (needs_reflection, refined query) for a judge verdict"""
+    needs_reflection = verdict == "NO"
+    logger.info(f"Relevance judgment: {verdict} => {'NEEDS_REFLECTION' if needs_reflection else 'RELEVANT'}")
+    return _judge_cache_put(
+        _relevance_cache,
+        _relevance_key(query, retrieved_docs),
+        (needs_reflection, refined_query if needs_reflection else None)
+    )
+
+
+def _call_relevance_judge(query: str, retrieved_docs: list) -> Tuple[bool, Optional[str]]:
+    """Relevance judge LLM call (no shortcuts)"""
     try:
-        schemes_text = retriever.format_for_judge(retrieved_docs)
-        
-        logger.debug(f"Relevance judge input - Query: {query[:50]}...")
-        
-        chain = relevance_prompt | groq_llm
-        result = chain.invoke({"query": query, "schemes": schemes_text})
-        
-        verdict = result.content.strip().upper()
-        needs_reflection = verdict == "NO"
-        
-        logger.info(f"Relevance judgment: {verdict} => {'NEEDS_REFLECTION' if needs_reflection else 'RELEVANT'}")
-        return needs_reflection
+        result = RELEVANCE_CHAIN.invoke(_relevance_inputs(query, retrieved_docs))
+        return _relevance_judgment(query, retrieved_docs, *_parse_verdict(result.content))
     except Exception as e:
         logger.error(f"Relevance judgment failed: {str(e)}")
         # Assume docs are relevant on error to avoid infinite loops
-        return False
+        return False, None
+
+
+async def _acall_relevance_judge(query: str, retrieved_docs: list) -> Tuple[bool, Optional[str]]:
+    """Async relevance judge LLM call (batched under BATCH_JUDGES)"""
+    try:
+        inputs = _relevance_inputs(query, retrieved_docs)
+        if config.BATCH_JUDGES:
+            verdict, refined_query = await _relevance_batcher.submit(inputs)
+        else:
+            result = await ainvoke_limited(RELEVANCE_CHAIN, inputs)
+            verdict, refined_query = _parse_verdict(result.content)
+        return _relevance_judgment(query, retrieved_docs, verdict, refined_query)
+    except Exception as e:
+        logger.error(f"Relevance judgment failed: {str(e)}")
+        return False, None
+
+
+def judge_relevance(query: str, retrieved_docs: list, reflection_count: int) -> Tuple[bool, Optional[str]]:
+    """Simple YES/NO relevance judge using Groq (llama-3.3-70b)
+    
+    A NO verdict carries the rewritten query in the same reply, saving the
+    separate refinement call. Verdicts are cached per (normalized query, doc ids).
+    
+    Returns:
+        (True if docs are NOT relevant (needs reflection), refined query or None)
+    """
+    judgment = _relevance_shortcut(query, retrieved_docs, reflection_count)
+    if judgment is None:
+        judgment = _call_relevance_judge(query, retrieved_docs)
+    return judgment
+
+
+async def ajudge_relevance(query: str, retrieved_docs: list, reflection_count: int) -> Tuple[bool, Optional[str]]:
+    """Async variant of judge_relevance() (non-blocking Groq call)"""
+    judgment = _relevance_shortcut(query, retrieved_docs, reflection_count)
+    if judgment is None:
+        judgment = await _acall_relevance_judge(query, retrieved_docs)
+    return judgment
+
+
+def _speculative(state: RAGState) -> bool:
+    """Whether this run drafts the answer alongside the relevance judge"""
+    speculative = state.get("speculative_answer")
+    return config.SPECULATIVE_ANSWER if speculative is None else speculative
+
+
+# Drafts generated for docs that were then judged irrelevant (sync graph)
+_wasted_drafts = itertools.count(1)
 
 
 def selfrag_judge_node(state: RAGState):
-    """Self-RAG relevance judgment node - Uses Groq"""
-    reflection_count = state.get("reflection_count", 0)
-    needs_reflection = judge_relevance(
-        state["query"], 
-        state["retrieved_docs"],
-        reflection_count
-    )
-    return {"needs_reflection": needs_reflection}
+    """Self-RAG relevance judgment node - Uses Groq
+    
+    With SPECULATIVE_ANSWER the answer is drafted on the dedicated draft pool
+    while the judge's LLM call runs and handed to answer_node when the docs
+    are judged relevant, so the common path costs max(judge, answer) instead
+    of judge + answer. No draft is started when the verdict needs no LLM call.
+    """
+    judgment = _relevance_shortcut(state["query"], state["retrieved_docs"], state.get("reflection_count", 0))
+    if judgment is not None or not _speculative(state):
+        if judgment is None:
+            judgment = _call_relevance_judge(state["query"], state["retrieved_docs"])
+        needs_reflection, refined_query = judgment
+        return {"needs_reflection": needs_reflection, "refined_query": refined_query}
+    
+    draft_future = get_draft_pool().submit(_draft_answer, state)
+    needs_reflection, refined_query = _call_relevance_judge(state["query"], state["retrieved_docs"])
+    
+    if needs_reflection:
+        if not draft_future.cancel():
+            # Already running: a Groq generation cannot be interrupted, so it completes unused
+            logger.info(f"Speculative answer draft wasted: docs judged irrelevant ({next(_wasted_drafts)} so far)")
+        return {"needs_reflection": True, "refined_query": refined_query, "draft_answer": None}
+    return {"needs_reflection": False, "refined_query": None, "draft_answer": draft_future.result()}
+
+
+async def aselfrag_judge_node(state: RAGState):
+    """Async self-RAG judgment node
+    
+    With SPECULATIVE_ANSWER the answer draft runs as a task alongside the
+    judge's LLM call; it is awaited when the docs are judged relevant and
+    cancelled as soon as they are not, so the reflection path never waits for it.
+    """
+    judgment = _relevance_shortcut(state["query"], state["retrieved_docs"], state.get("reflection_count", 0))
+    if judgment is not None or not _speculative(state):
+        if judgment is None:
+            judgment = await _acall_relevance_judge(state["query"], state["retrieved_docs"])
+        needs_reflection, refined_query = judgment
+        return {"needs_reflection": needs_reflection, "refined_query": refined_query}
+    
+    draft_task = asyncio.create_task(_adraft_answer(state))
+    try:
+        needs_reflection, refined_query = await _acall_relevance_judge(state["query"], state["retrieved_docs"])
+    except BaseException:
+        draft_task.cancel()
+        raise
+    
+    if needs_reflection:
+        draft_task.cancel()
+        logger.info("Speculative answer draft cancelled: docs judged irrelevant")
+        return {"needs_reflection": True, "refined_query": refined_query, "draft_answer": None}
+    return {"needs_reflection": False, "refined_query": None, "draft_answer": await draft_task}
+
+
+def _rewrite_failed(step: str, query: str, e: Exception) -> str:
+    """Log a failed rewrite call; the original query is kept"""
+    logger.error(f"{step} failed: {str(e)}")
+    return query
+
+
+def _refinement_inputs(query: str) -> dict:
+    """Reflection chain inputs"""
+    logger.info(f"Refining query: {query[:50]}...")
+    return {"query": query}
+
+
+def _refined_query(content: str) -> str:
+    """Refined query from the reflection chain's reply"""
+    refined = content.strip()
+    logger.info(f"Refined query: {refined[:100]}...")
+    return refined
 
 
 def refine_query(query: str) -> str:
     """Refine query for better retrieval using Ollama (deepseek-r1:8b)"""
     try:
-        logger.info(f"Refining query: {query[:50]}...")
-        chain = reflection_prompt | ollama_llm
-        result = chain.invoke({"query": query})
-        refined = result.content.strip()
-        logger.info(f"Refined query: {refined[:100]}...")
-        return refined
+        return _refined_query(REFLECTION_CHAIN.invoke(_refinement_inputs(query)).content)
     except Exception as e:
-        logger.error(f"Query refinement failed: {str(e)}")
         # Return original query on failure
-        return query
+        return _rewrite_failed("Query refinement", query, e)
 
 
-def reflection_node(state: RAGState):
-    """Query refinement and re-retrieval node - Uses Ollama"""
+async def arefine_query(query: str) -> str:
+    """Async variant of refine_query() (non-blocking Ollama call)"""
+    try:
+        return _refined_query((await ainvoke_limited(REFLECTION_CHAIN, _refinement_inputs(query))).content)
+    except Exception as e:
+        return _rewrite_failed("Query refinement", query, e)
+
+
+def _next_reflection(state: RAGState) -> int:
+    """Number of the reflection iteration about to run (logged)"""
     reflection_count = state.get("reflection_count", 0) + 1
-    intent = state.get("intent", "GENERAL")
-    
     logger.info(f"Reflection iteration {reflection_count}/{MAX_REFLECTION_ITERATIONS}")
-    
-    refined_query = refine_query(state["query"])
-    
-    # Re-retrieve with same intent context
-    refined_docs = retriever.retrieve(refined_query, intent=intent)
-    
+    return reflection_count
+
+
+def _reflection_update(refined_query: str, refined_docs: List[dict], retrievals: dict, reflection_count: int) -> dict:
+    """State update after re-retrieving for the refined query"""
     logger.info(f"Re-retrieved {len(refined_docs)} documents after refinement")
     
     return {
         "query": refined_query,
+        "query_embedding": None,  # Stale once the query is rewritten
+        "refined_query": None,
         "retrieved_docs": refined_docs,
+        "retrievals": retrievals,
         "needs_reflection": False,
         "needs_correction": False,
         "reflection_count": reflection_count
     }
 
 
-def answer_node(state: RAGState):
-    """Answer generation node - Uses Groq (llama-3.3-70b)"""
-    try:
-        logger.info("Generating answer...")
-        schemes_text = retriever.format_for_answer(state["retrieved_docs"])
-        
-        logger.debug(f"Answer generation using {len(state['retrieved_docs'])} documents")
-        
-        chain = answer_prompt | groq_llm
-        result = chain.invoke({
-            "query": state["query"],
-            "schemes": schemes_text
-        })
-        logger.info("Answer generated successfully")
-        return {"answer": result.content}
+def reflection_node(state: RAGState):
+    """Query refinement and re-retrieval node - Uses Ollama"""
+    reflection_count = _next_reflection(state)
+    
+    # Rewrite from the relevance judge's reply; separate Ollama call only if it had none
+    refined_query = state.get("refined_query") or refine_query(state["query"])
+    
+    # Re-retrieve with same intent context
+    refined_docs, retrievals = _retrieve_once(state, refined_query, state.get("intent", "GENERAL"))
+    return _reflection_update(refined_query, refined_docs, retrievals, reflection_count)
+
+
+async def areflection_node(state: RAGState):
+    """Async query refinement and re-retrieval node"""
+    reflection_count = _next_reflection(state)
+    refined_query = state.get("refined_query") or await arefine_query(state["query"])
+    refined_docs, retrievals = await _aretrieve_once(state, refined_query, state.get("intent", "GENERAL"))
+    return _reflection_update(refined_query, refined_docs, retrievals, reflection_count)
+
+
+def _answer_inputs(state: RAGState) -> dict:
+    """Answer chain inputs for the state's query and docs"""
+    logger.info("Generating answer...")
+    logger.debug(f"Answer generation using {len(state['retrieved_docs'])} documents")
+    return {
+        "query": state["query"],
+        "schemes": retriever.format_for_answer(state["retrieved_docs"])
+    }
+
+
+def _answer_error(e: Exception) -> LLMError:
+    """Log a failed answer LLM call and wrap it for the caller"""
+    logger.error(f"Answer generation failed: {str(e)}")
+    return LLMError(f"Failed to generate answer: {str(e)}")
+
+
+def _generate_answer(state: RAGState) -> str:
+    """Generate the answer for the state's query and docs using Groq (llama-3.3-70b)"""
+    try:
+        result = ANSWER_CHAIN.invoke(_answer_inputs(state))
     except Exception as e:
-        logger.error(f"Answer generation failed: {str(e)}")
-        raise LLMError(f"Failed to generate answer: {str(e)}")
+        raise _answer_error(e)
+    logger.info("Answer generated successfully")
+    return result.content
 
 
-def is_answer_inadequate(query: str, answer: str, correction_count: int) -> bool:
-    """Simple YES/NO answer quality judge using Groq (llama-3.3-70b)
-    
-    Returns True if answer is inadequate (needs correction)
-    """
+async def _agenerate_answer(state: RAGState) -> str:
+    """Generate the answer for the state's query and docs (non-blocking Groq call)"""
+    try:
+        result = await ainvoke_limited(ANSWER_CHAIN, _answer_inputs(state))
+    except Exception as e:
+        raise _answer_error(e)
+    logger.info("Answer generated successfully")
+    return result.content
+
+
+def _draft_answer(state: RAGState) -> Optional[str]:
+    """Speculative answer draft; None on failure (answer_node then generates it again)"""
+    try:
+        return _generate_answer(state)
+    except LLMError:
+        return None
+
+
+async def _adraft_answer(state: RAGState) -> Optional[str]:
+    """Async variant of _draft_answer()"""
+    try:
+        return await _agenerate_answer(state)
+    except LLMError:
+        return None
+
+
+def _drafted_answer_update(state: RAGState) -> Optional[dict]:
+    """State update reusing the speculative draft, or None when there is none"""
+    draft = state.get("draft_answer")
+    if draft is None:
+        return None
+    logger.info("Using answer drafted alongside the relevance judgment")
+    return {"answer": draft, "draft_answer": None}
+
+
+def answer_node(state: RAGState):
+    """Answer generation node - Uses Groq (reuses the speculative draft when there is one)"""
+    return _drafted_answer_update(state) or {"answer": _generate_answer(state)}
+
+
+async def aanswer_node(state: RAGState):
+    """Async answer generation node (reuses the speculative draft when there is one)"""
+    return _drafted_answer_update(state) or {"answer": await _agenerate_answer(state)}
+
+
+def _answer_quality_key(query: str, answer: str) -> tuple:
+    """Answer quality cache key: normalized query + the exact answer"""
+    return _memo_key(query), answer
+
+
+def _answer_quality_shortcut(query: str, answer: str, correction_count: int) -> Optional[Tuple[bool, Optional[str]]]:
+    """Answer quality judgment that needs no LLM call (iteration cap, clear answer, cached verdict), or None"""
     # Stop correction if max iterations reached
     if correction_count >= MAX_CORRECTION_ITERATIONS:
         logger.warning(f"Max correction iterations ({MAX_CORRECTION_ITERATIONS}) reached. Accepting current answer.")
-        return False
+        return False, None
     
+    if _clearly_adequate(query, answer):
+        logger.info("Answer quality check skipped: direct Yes/No answer to a yes/no question")
+        return False, None
+    
+    return _judge_cache_get(_answer_quality_cache, _answer_quality_key(query, answer))
+
+
+def _answer_quality_inputs(query: str, answer: str) -> dict:
+    """Answer quality judge chain inputs"""
+    logger.debug(f"Quality judge input - Query: {query[:50]}...")
+    return {"query": query, "answer": answer}
+
+
+def _answer_quality_judgment(query: str, answer: str, verdict: str, corrected_query: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """Cache and return (needs_correction, corrected query) for a judge verdict"""
+    is_bad = verdict == "YES"
+    logger.info(f"Answer quality check: {verdict} => {'INADEQUATE (needs correction)' if is_bad else 'GOOD (accepted)'}")
+    return _judge_cache_put(
+        _answer_quality_cache,
+        _answer_quality_key(query, answer),
+        (is_bad, corrected_query if is_bad else None)
+    )
+
+
+def _call_answer_quality_judge(query: str, answer: str) -> Tuple[bool, Optional[str]]:
+    """Answer quality judge LLM call (no shortcuts)"""
     try:
-        logger.debug(f"Quality judge input - Query: {query[:50]}...")
-        
-        chain = answer_quality_prompt | groq_llm
-        result = chain.invoke({"query": query, "answer": answer})
-        
-        verdict = result.content.strip().upper()
-        is_bad = verdict == "YES"
-        
-        logger.info(f"Answer quality check: {verdict} => {'INADEQUATE (needs correction)' if is_bad else 'GOOD (accepted)'}")
-        return is_bad
+        result = ANSWER_QUALITY_CHAIN.invoke(_answer_quality_inputs(query, answer))
+        return _answer_quality_judgment(query, answer, *_parse_verdict(result.content))
     except Exception as e:
         logger.error(f"Answer quality check failed: {str(e)}")
         # Assume answer is good on error to avoid infinite loops
-        return False
+        return False, None
+
+
+async def _acall_answer_quality_judge(query: str, answer: str) -> Tuple[bool, Optional[str]]:
+    """Async answer quality judge LLM call (batched under BATCH_JUDGES)"""
+    try:
+        inputs = _answer_quality_inputs(query, answer)
+        if config.BATCH_JUDGES:
+            verdict, corrected_query = await _answer_quality_batcher.submit(inputs)
+        else:
+            result = await ainvoke_limited(ANSWER_QUALITY_CHAIN, inputs)
+            verdict, corrected_query = _parse_verdict(result.content)
+        return _answer_quality_judgment(query, answer, verdict, corrected_query)
+    except Exception as e:
+        logger.error(f"Answer quality check failed: {str(e)}")
+        return False, None
+
+
+def is_answer_inadequate(query: str, answer: str, correction_count: int) -> Tuple[bool, Optional[str]]:
+    """Simple YES/NO answer quality judge using Groq (llama-3.3-70b)
+    
+    A YES verdict carries the improved query in the same reply, saving the
+    separate corrective-query call. Verdicts are cached per (normalized query, answer).
+    
+    Returns:
+        (True if answer is inadequate (needs correction), corrected query or None)
+    """
+    judgment = _answer_quality_shortcut(query, answer, correction_count)
+    if judgment is None:
+        judgment = _call_answer_quality_judge(query, answer)
+    return judgment
+
+
+async def ais_answer_inadequate(query: str, answer: str, correction_count: int) -> Tuple[bool, Optional[str]]:
+    """Async variant of is_answer_inadequate() (non-blocking Groq call)"""
+    judgment = _answer_quality_shortcut(query, answer, correction_count)
+    if judgment is None:
+        judgment = await _acall_answer_quality_judge(query, answer)
+    return judgment
+
+
+def _correction_inputs(query: str) -> dict:
+    """Corrective chain inputs"""
+    logger.info("Generating corrective query...")
+    return {"query": query}
+
+
+def _corrected_query(content: str) -> str:
+    """Corrective query from the corrective chain's reply"""
+    corrected = content.strip()
+    logger.info(f"Corrective query: {corrected[:100]}...")
+    return corrected
 
 
 def corrective_query(query: str) -> str:
     """Generate corrective query using Ollama (deepseek-r1:8b)"""
     try:
-        logger.info("Generating corrective query...")
-        chain = corrective_prompt | ollama_llm
-        result = chain.invoke({"query": query})
-        corrected = result.content.strip()
-        logger.info(f"Corrective query: {corrected[:100]}...")
-        return corrected
+        return _corrected_query(CORRECTIVE_CHAIN.invoke(_correction_inputs(query)).content)
+    except Exception as e:
+        return _rewrite_failed("Corrective query generation", query, e)
+
+
+async def acorrective_query(query: str) -> str:
+    """Async variant of corrective_query() (non-blocking Ollama call)"""
+    try:
+        return _corrected_query((await ainvoke_limited(CORRECTIVE_CHAIN, _correction_inputs(query))).content)
     except Exception as e:
-        logger.error(f"Corrective query generation failed: {str(e)}")
-        return query
+        return _rewrite_failed("Corrective query generation", query, e)
+
+
+def _next_correction(state: RAGState) -> int:
+    """Number of the correction iteration about to run (logged)"""
+    correction_count = state.get("correction_count", 0) + 1
+    logger.info(f"Correction iteration {correction_count}/{MAX_CORRECTION_ITERATIONS}")
+    return correction_count
+
+
+def _correction_update(new_query: str, new_docs: List[dict], retrievals: dict, correction_count: int) -> dict:
+    """State update after the corrective retrieval"""
+    logger.info(f"Corrective retrieval returned {len(new_docs)} documents")
+    
+    return {
+        "query": new_query,
+        "query_embedding": None,
+        "retrieved_docs": new_docs,
+        "retrievals": retrievals,
+        "needs_correction": False,
+        "needs_reflection": False,
+        "correction_count": correction_count
+    }
 
 
 def corrective_rag_node(state: RAGState):
     """Corrective RAG node for answer improvement - Uses Ollama"""
-    correction_count = state.get("correction_count", 0)
-    intent = state.get("intent", "GENERAL")
-    
-    needs_correction = is_answer_inadequate(
+    needs_correction, corrected_query = is_answer_inadequate(
         state["query"], 
         state["answer"],
-        correction_count
+        state.get("correction_count", 0)
     )
     
     if not needs_correction:
         return {"needs_correction": False}
     
-    correction_count += 1
-    logger.info(f"Correction iteration {correction_count}/{MAX_CORRECTION_ITERATIONS}")
+    correction_count = _next_correction(state)
     
-    new_query = corrective_query(state["query"])
+    # Rewrite from the quality judge's reply; separate Ollama call only if it had none
+    new_query = corrected_query or corrective_query(state["query"])
     
     # Corrective retrieval with same intent
-    new_docs = retriever.retrieve(new_query, intent=intent)
+    new_docs, retrievals = _retrieve_once(state, new_query, state.get("intent", "GENERAL"))
+    return _correction_update(new_query, new_docs, retrievals, correction_count)
+
+
+async def acorrective_rag_node(state: RAGState):
+    """Async corrective RAG node"""
+    needs_correction, corrected_query = await ais_answer_inadequate(
+        state["query"],
+        state["answer"],
+        state.get("correction_count", 0)
+    )
     
-    logger.info(f"Corrective retrieval returned {len(new_docs)} documents")
+    if not needs_correction:
+        return {"needs_correction": False}
     
-    return {
-        "query": new_query,
-        "retrieved_docs": new_docs,
-        "needs_correction": False,
-        "needs_reflection": False,
-        "correction_count": correction_count
-    }
+    correction_count = _next_correction(state)
+    new_query = corrected_query or await acorrective_query(state["query"])
+    new_docs, retrievals = await _aretrieve_once(state, new_query, state.get("intent", "GENERAL"))
+    return _correction_update(new_query, new_docs, retrievals, correction_count)
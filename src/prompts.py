@@ -1,3 +1,10 @@
+"""Prompt templates for the RAG graph
+
+Every system message is fixed at import and every variable ({query},
+{schemes}, {answer}) sits in the trailing human message, so each prompt
+starts with a byte-identical prefix that Ollama and Groq can serve from
+their prompt (KV) cache. Keep per-request values out of the system messages.
+"""
 from langchain_core.prompts import ChatPromptTemplate
 import config
 
@@ -5,7 +12,7 @@ import config
 intent_prompt = ChatPromptTemplate.from_messages([
     ("system", 
      f"You are an intent classifier for government scheme queries. "
-     f"Classify the user query into ONE of the following labels only: {config.INTENT_LABELS}\n"
+     f"Classify the user query into ONE of the following labels only: {list(config.INTENT_LABELS)}\n"
      f"Return ONLY the label, nothing else."),
     ("human", "{query}")
 ])
@@ -17,10 +24,29 @@ relevance_prompt = ChatPromptTemplate.from_messages([
      "Return YES if the schemes can help answer the query.\n"
      "Return NO if the schemes are off-topic or unhelpful.\n\n"
      "Be reasonable - docs don't need to be perfect, just useful.\n\n"
-     "Respond ONLY with YES or NO."),
+     "If you answer NO, also rewrite the query to be more specific and retrieval-friendly "
+     "(add specific keywords like eligibility, benefits, procedure, subsidy; expand abbreviations; "
+     "add context like manufacturing, women, youth, startup, MSME).\n\n"
+     "Respond ONLY with YES, or with NO followed by the rewritten query on the next line."),
     ("human", "Query: {query}\n\nRetrieved Schemes:\n{schemes}")
 ])
 
+batch_relevance_prompt = ChatPromptTemplate.from_messages([
+    ("system",
+     "You are a relevance judge for government scheme retrieval.\n"
+     "You are given several numbered cases, each a user query with its retrieved schemes. "
+     "Judge every case independently.\n\n"
+     "Answer YES if the schemes can help answer the query.\n"
+     "Answer NO if the schemes are off-topic or unhelpful.\n\n"
+     "Be reasonable - docs don't need to be perfect, just useful.\n\n"
+     "For a NO, also rewrite that case's query to be more specific and retrieval-friendly "
+     "(add specific keywords like eligibility, benefits, procedure, subsidy; expand abbreviations; "
+     "add context like manufacturing, women, youth, startup, MSME).\n\n"
+     "Respond with exactly one line per case, in case order, either \"<number>. YES\" "
+     "or \"<number>. NO | <rewritten query>\". Nothing else."),
+    ("human", "{cases}")
+])
+
 reflection_prompt = ChatPromptTemplate.from_messages([
     ("system",
      "You are a query refinement agent. The original query did not retrieve relevant schemes.\n"
@@ -40,10 +66,29 @@ answer_quality_prompt = ChatPromptTemplate.from_messages([
      "Return YES if the answer is INADEQUATE (completely off-topic, wrong, or unhelpful).\n"
      "Return NO if the answer is ADEQUATE (on-topic, helpful, and addresses the question).\n\n"
      "Don't demand perfection - good enough is acceptable.\n\n"
-     "Respond ONLY with YES or NO."),
+     "If you answer YES, also rewrite the query to retrieve better documents "
+     "(add missing keywords from the question, be more specific about the information needed, "
+     "include synonyms or related terms).\n\n"
+     "Respond ONLY with NO, or with YES followed by the improved query on the next line."),
     ("human", "Query: {query}\n\nAnswer: {answer}")
 ])
 
+batch_answer_quality_prompt = ChatPromptTemplate.from_messages([
+    ("system",
+     "You are an answer quality judge.\n"
+     "You are given several numbered cases, each a user query with its answer. "
+     "Judge every case independently.\n\n"
+     "Answer YES if the answer is INADEQUATE (completely off-topic, wrong, or unhelpful).\n"
+     "Answer NO if the answer is ADEQUATE (on-topic, helpful, and addresses the question).\n\n"
+     "Don't demand perfection - good enough is acceptable.\n\n"
+     "For a YES, also rewrite that case's query to retrieve better documents "
+     "(add missing keywords from the question, be more specific about the information needed, "
+     "include synonyms or related terms).\n\n"
+     "Respond with exactly one line per case, in case order, either \"<number>. NO\" "
+     "or \"<number>. YES | <improved query>\". Nothing else."),
+    ("human", "{cases}")
+])
+
 corrective_prompt = ChatPromptTemplate.from_messages([
     ("system",
      "The answer was inadequate. Rewrite the query to retrieve better documents.\n\n"
@@ -0,0 +1,107 @@
+"""Qdrant helpers shared by retrievers that load whole collections into memory"""
+import uuid
+from typing import Callable, List, Optional
+from qdrant_client.models import Filter
+from src.logger import setup_logger
+from src.thread_pool import get_thread_pool
+import config
+
+logger = setup_logger(__name__)
+
+_UUID_SPACE = 1 << 128
+
+
+def _point_key(point_id) -> int:
+    """Sort key matching Qdrant's id order (integer ids before UUIDs)"""
+    if isinstance(point_id, int):
+        return -1
+    return uuid.UUID(str(point_id)).int
+
+
+def _scroll_range(
+    client,
+    collection_name: str,
+    start,
+    end_key: Optional[int],
+    transform: Optional[Callable[[list], list]] = None,
+    **scroll_kwargs
+) -> list:
+    """Scroll [start, end) in id order, page by page (optionally transforming each page)"""
+    points = []
+    offset = start
+
+    while True:
+        page, offset = client.scroll(
+            collection_name=collection_name,
+            offset=offset,
+            **scroll_kwargs
+        )
+        if end_key is not None:
+            page = [p for p in page if _point_key(p.id) < end_key]
+        points.extend(transform(page) if transform else page)
+        if offset is None or (end_key is not None and _point_key(offset) >= end_key):
+            return points
+
+
+def parallel_scroll(
+    client,
+    collection_name: str,
+    scroll_filter: Optional[Filter] = None,
+    with_payload=True,
+    shards: int = None,
+    page_size: int = None,
+    transform: Optional[Callable[[list], list]] = None
+) -> list:
+    """Fetch all (matching) points by scrolling disjoint id ranges concurrently
+
+    Point ids are UUIDs (see data_pipeline.indexing.chunk_point_id), so the
+    UUID space is split into equal ranges, each scrolled by its own worker
+    starting from the range's lower bound. Wall time is ~one range's RTTs
+    instead of the sum over the whole collection.
+
+    Args:
+        client: Qdrant client
+        collection_name: Collection to scroll
+        scroll_filter: Optional filter applied to every page
+        with_payload: Payload selector passed through to scroll
+        shards: Number of concurrent id ranges
+        page_size: Points per scroll request
+        transform: Optional page -> items function applied inside the scroll
+            workers, so raw records are dropped page by page instead of being
+            held for the whole collection
+
+    Returns:
+        List of records (without vectors), or transformed items, in id order
+    """
+    shards = shards or config.SCROLL_SHARDS
+    page_size = page_size or config.SCROLL_PAGE_SIZE
+    scroll_kwargs = {
+        "scroll_filter": scroll_filter,
+        "limit": page_size,
+        "with_payload": with_payload,
+        "with_vectors": False
+    }
+
+    total = client.count(collection_name=collection_name, count_filter=scroll_filter, exact=False).count
+    if total <= page_size * 2 or shards <= 1:
+        return _scroll_range(client, collection_name, None, None, transform, **scroll_kwargs)
+
+    # First range starts at None so integer ids (if any) are included
+    bounds = [i * _UUID_SPACE // shards for i in range(shards)] + [None]
+    starts = [None] + [str(uuid.UUID(int=b)) for b in bounds[1:-1]]
+
+    try:
+        pool = get_thread_pool()
+        futures = [
+            pool.submit(_scroll_range, client, collection_name, start, end, transform, **scroll_kwargs)
+            for start, end in zip(starts, bounds[1:])
+        ]
+        ranges: List[list] = [f.result() for f in futures]
+    except Exception as e:
+        # A failed range would leave a hole in the result; re-scroll everything serially
+        logger.warning(f"Parallel scroll of {collection_name} failed ({e}); falling back to serial scroll")
+        return _scroll_range(client, collection_name, None, None, transform, **scroll_kwargs)
+
+    points = [p for chunk in ranges for p in chunk]
+    logger.debug(f"Parallel scroll fetched {len(points)} items from {collection_name} over {shards} ranges")
+    return points
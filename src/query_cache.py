@@ -0,0 +1,88 @@
+"""Thread-safe LRU + TTL cache for per-query artifacts (e.g. query embeddings)
+
+Production traffic is long-tailed: a small set of queries repeats often.
+Caching their embeddings skips the tokenizer + transformer forward pass.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class QueryCache:
+    """Bounded LRU cache with per-entry TTL and hit/miss/eviction counters"""
+
+    def __init__(self, max_size: int = 2000, ttl_seconds: float = 600, name: str = "query_cache"):
+        """
+        Args:
+            max_size: Maximum number of entries before LRU eviction
+            ttl_seconds: Entry lifetime
+            name: Label used in log messages
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return cached value or None if missing/expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Insert or refresh a value, evicting least-recently-used entries"""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._data.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return cache size, counters and hit rate"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def log_stats(self):
+        """Log current statistics"""
+        stats = self.get_stats()
+        logger.info(
+            f"{self.name}: size={stats['size']}, hits={stats['hits']}, "
+            f"misses={stats['misses']}, evictions={stats['evictions']}, "
+            f"hit_rate={stats['hit_rate']:.1%}"
+        )
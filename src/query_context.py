@@ -0,0 +1,61 @@
+"""Per-query context shared by decomposition, keyword scoring and embedding
+
+The query is lowercased and tokenized once; downstream stages read these
+fields instead of re-normalizing the same string. The query embedding is
+memoized on the context once computed.
+
+tokenize() is also the document tokenizer for every BM25 index, so query and
+corpus terms always match.
+"""
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Union
+import numpy as np
+
+# Compiled once: word runs (punctuation is a separator, never part of a term)
+_TOKEN_RE = re.compile(r"\w+")
+
+# Function words carry no keyword signal but inflate every posting list
+_STOPWORDS = frozenset({
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "by", "at",
+    "from", "as", "is", "are", "was", "were", "be", "been", "it", "its", "this", "that",
+    "these", "those", "what", "which", "who", "how", "do", "does", "i", "me", "my", "we",
+    "our", "you", "your", "there", "their", "they", "them", "if", "so", "such", "into"
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords (shared by queries and BM25 corpora)"""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+
+@dataclass(slots=True)
+class QueryContext:
+    """Normalized views of one user query"""
+    raw: str
+    lower: str
+    tokens: List[str]
+    embedding: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_query(cls, query: Union[str, "QueryContext"], embedding=None) -> "QueryContext":
+        """Build a context from a query string (an existing context is returned as-is)
+
+        Args:
+            query: Query text or an already-built context
+            embedding: Optional precomputed embedding of the query
+
+        Returns:
+            QueryContext for the query
+        """
+        if isinstance(query, QueryContext):
+            if query.embedding is None and embedding is not None:
+                query.embedding = embedding
+            return query
+
+        return cls(raw=query, lower=query.lower(), tokens=tokenize(query), embedding=embedding)
+
+    @property
+    def normalized(self) -> str:
+        """Lowercased, whitespace-collapsed query"""
+        return " ".join(self.lower.split())
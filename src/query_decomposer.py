@@ -10,6 +10,8 @@ from typing import List, Dict, Optional, Set
 from langchain_ollama import ChatOllama
 from langchain_core.prompts import PromptTemplate
 from src.logger import setup_logger
+from src.query_context import QueryContext
+from src.qdrant_utils import parallel_scroll
 import config
 
 try:
@@ -20,9 +22,29 @@ except ImportError:
     logger = setup_logger(__name__)
     logger.warning("rapidfuzz not installed. Fuzzy matching disabled. Install: pip install rapidfuzz")
 
+try:
+    import ahocorasick
+    AHO_CORASICK_AVAILABLE = True
+except ImportError:
+    AHO_CORASICK_AVAILABLE = False
+    logger = setup_logger(__name__)
+    logger.warning("pyahocorasick not installed. Using per-variant regex matching. Install: pip install pyahocorasick")
+
 logger = setup_logger(__name__)
 
 
+def _is_word_char(ch: str) -> bool:
+    """Regex \\w equivalent for a single character"""
+    return ch.isalnum() or ch == '_'
+
+
+def _at_word_boundary(text: str, pos: int) -> bool:
+    """Regex \\b equivalent: word/non-word transition at position pos"""
+    before = pos > 0 and _is_word_char(text[pos - 1])
+    after = pos < len(text) and _is_word_char(text[pos])
+    return before != after
+
+
 class QueryDecomposer:
     """Extract scheme names from queries using dynamic loading + fuzzy matching"""
     
@@ -45,6 +67,7 @@ class QueryDecomposer:
         # Dynamic scheme list (loaded from Qdrant)
         self.all_schemes: Set[str] = set()
         self.scheme_variations: Dict[str, str] = {}  # variant -> canonical
+        self._automaton = None  # Aho-Corasick automaton over all variants
         
         # Load schemes from Qdrant if client provided
         if qdrant_client:
@@ -59,32 +82,18 @@ class QueryDecomposer:
         try:
             logger.info(f"Loading scheme names from Qdrant collection: {self.collection_name}")
             
-            # Scroll through all documents to get unique scheme names
-            offset = None
-            scheme_set = set()
+            # Scroll all documents (id ranges fetched concurrently) to get unique scheme names
+            points = parallel_scroll(
+                self.qdrant_client,
+                self.collection_name,
+                with_payload=['scheme_name']
+            )
             
-            while True:
-                results = self.qdrant_client.scroll(
-                    collection_name=self.collection_name,
-                    limit=100,
-                    offset=offset,
-                    with_payload=['scheme_name'],
-                    with_vectors=False
-                )
-                
-                points, offset = results
-                
-                if not points:
-                    break
-                
-                # Extract scheme names
-                for point in points:
-                    scheme_name = point.payload.get('scheme_name')
-                    if scheme_name and scheme_name != 'Unknown':
-                        scheme_set.add(scheme_name)
-                
-                if offset is None:
-                    break
+            scheme_set = set()
+            for point in points:
+                scheme_name = point.payload.get('scheme_name')
+                if scheme_name and scheme_name != 'Unknown':
+                    scheme_set.add(scheme_name)
             
             self.all_schemes = scheme_set
             
@@ -117,11 +126,33 @@ class QueryDecomposer:
                     self.scheme_variations[acronym.lower()] = scheme
         
         logger.debug(f"Built {len(self.scheme_variations)} scheme variations")
+        
+        if AHO_CORASICK_AVAILABLE:
+            self._automaton = self._build_automaton()
     
-    def _extract_with_exact_match(self, query: str) -> List[str]:
+    def _build_automaton(self):
+        """Build an Aho-Corasick automaton so all variants match in one pass"""
+        automaton = ahocorasick.Automaton()
+        for variant, canonical in self.scheme_variations.items():
+            if variant:
+                automaton.add_word(variant, (variant, canonical))
+        automaton.make_automaton()
+        return automaton
+    
+    def _extract_with_exact_match(self, query: str, query_lower: str = None) -> List[str]:
         """Fast exact matching against scheme names (case-insensitive)"""
         found_schemes = set()
-        query_lower = query.lower()
+        query_lower = query_lower if query_lower is not None else query.lower()
+        
+        if self._automaton is not None:
+            # Single linear pass over the query finds every variant occurrence
+            for end, (variant, canonical) in self._automaton.iter(query_lower):
+                start = end - len(variant) + 1
+                # Use word boundaries to avoid partial matches
+                if _at_word_boundary(query_lower, start) and _at_word_boundary(query_lower, end + 1):
+                    found_schemes.add(canonical)
+                    logger.debug(f"Exact match: '{variant}' -> {canonical}")
+            return list(found_schemes)
         
         for variant, canonical in self.scheme_variations.items():
             # Use word boundaries to avoid partial matches
@@ -253,7 +284,7 @@ Scheme names:""",
             logger.warning(f"LLM extraction failed: {e}")
             return []
     
-    def extract_scheme_names(self, query: str) -> List[str]:
+    def extract_scheme_names(self, query) -> List[str]:
         """Extract scheme names using multi-stage approach
         
         Stages:
@@ -262,15 +293,17 @@ Scheme names:""",
         3. LLM extraction (fallback for complex cases)
         
         Args:
-            query: User query
+            query: User query (str or QueryContext)
             
         Returns:
             List of detected scheme names
         """
+        ctx = QueryContext.from_query(query)
+        query = ctx.raw
         logger.info(f"Extracting scheme names from: '{query[:80]}...'")
         
         # Stage 1: Try exact matching first (fastest)
-        exact_schemes = self._extract_with_exact_match(query)
+        exact_schemes = self._extract_with_exact_match(query, ctx.lower)
         if exact_schemes:
             logger.info(f"Exact match found: {exact_schemes}")
             return exact_schemes
@@ -311,10 +344,13 @@ Scheme names:""",
         
         return classification
     
-    def decompose(self, query: str) -> Dict[str, any]:
-        """Complete query decomposition pipeline"""
+    def decompose(self, query) -> Dict[str, any]:
+        """Complete query decomposition pipeline (query: str or QueryContext)"""
+        ctx = QueryContext.from_query(query)
+        query = ctx.raw
+        
         # Extract scheme names
-        detected_schemes = self.extract_scheme_names(query)
+        detected_schemes = self.extract_scheme_names(ctx)
         
         # Classify query
         classification = self.classify_query_type(query, detected_schemes)
@@ -1,25 +1,72 @@
-from qdrant_client import QdrantClient
+import asyncio
+import threading
+from functools import lru_cache
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from qdrant_client.http.exceptions import UnexpectedResponse
-from qdrant_client.models import Filter, FieldCondition, MatchAny
+from qdrant_client.models import (
+    Filter, FieldCondition, MatchAny, SearchParams, QuantizationSearchParams,
+    QueryRequest
+)
 from src.embeddings import embedding_model
+from src.query_context import QueryContext
+from src.query_cache import QueryCache
 from src.exceptions import RetrievalError, QdrantConnectionError
 from src.logger import setup_logger
 import config
 
 logger = setup_logger(__name__)
 
+# Shared query-time params: wider HNSW beam + oversampled quantized search with rescoring
+SEARCH_PARAMS = SearchParams(
+    hnsw_ef=config.HNSW_EF_SEARCH,
+    quantization=QuantizationSearchParams(
+        rescore=True,
+        oversampling=config.QUANTIZATION_OVERSAMPLING
+    )
+)
+
+
+@lru_cache(maxsize=1)
+def get_qdrant_client() -> QdrantClient:
+    """Process-wide gRPC Qdrant client (one channel shared by all retrievers)
+    
+    gRPC sends query vectors as packed protobuf floats instead of JSON lists.
+    """
+    return QdrantClient(
+        url=config.QDRANT_URL,
+        api_key=config.QDRANT_API_KEY,
+        prefer_grpc=True,
+        grpc_options=config.QDRANT_GRPC_OPTIONS,
+        pool_size=config.QDRANT_POOL_SIZE
+    )
+
 
 class VectorRetriever:
     """Simplified vector retriever with semantic search + metadata filtering"""
     
+    # Largest top_k any intent asks for; candidates fetched before the intent is known
+    _CANDIDATE_TOP_K = max(config.TOP_K, *config.INTENT_TOP_K.values())
+    
     def __init__(self):
+        # Prompt text per doc set: the judge, answer and quality loop re-format the same docs
+        self._format_cache = QueryCache(
+            config.FORMAT_CACHE_SIZE, config.FORMAT_CACHE_TTL_SECONDS, name="doc_format_cache"
+        )
         try:
             logger.info("Connecting to Qdrant...")
-            self.client = QdrantClient(
+            self.client = get_qdrant_client()
+            # Async client for the API / graph.ainvoke path (non-blocking I/O)
+            self.async_client = AsyncQdrantClient(
                 url=config.QDRANT_URL,
-                api_key=config.QDRANT_API_KEY
+                api_key=config.QDRANT_API_KEY,
+                prefer_grpc=True,
+                grpc_options=config.QDRANT_GRPC_OPTIONS,
+                pool_size=config.QDRANT_POOL_SIZE
             )
             self.collection_name = config.COLLECTION_NAME
+            # Built on first use (see metadata_retriever)
+            self._metadata_retriever = None
+            self._metadata_lock = threading.Lock()
             
             # Test connection
             collections = self.client.get_collections()
@@ -29,27 +76,64 @@ class VectorRetriever:
             logger.error(f"Qdrant connection failed: {str(e)}")
             raise QdrantConnectionError(f"Could not connect to Qdrant: {str(e)}")
     
-    def retrieve(self, query: str, top_k: int = None, intent: str = None):
+    @property
+    def metadata_retriever(self):
+        """MetadataRetriever, built on first use
+        
+        Only retrieve(decomposition=...) and the examples reach it, and no graph
+        node passes a decomposition, so workers skip its payload-index setup,
+        sparse-vector probe and Stage 2 prebuild until something does.
+        """
+        if self._metadata_retriever is None:
+            with self._metadata_lock:
+                if self._metadata_retriever is None:
+                    # Imported here: metadata_retrieval imports SEARCH_PARAMS from this module
+                    from src.metadata_retrieval import MetadataRetriever
+                    self._metadata_retriever = MetadataRetriever(self.client, self.collection_name)
+        return self._metadata_retriever
+    
+    def warmup(self):
+        """Open the Qdrant channel with a cheap approximate count"""
+        try:
+            self.client.count(collection_name=self.collection_name, exact=False)
+            logger.info("Qdrant client warmed up")
+        except Exception as e:
+            logger.warning(f"Qdrant warmup failed: {str(e)}")
+    
+    async def awarmup(self):
+        """Async variant of warmup() for the async client"""
+        try:
+            await self.async_client.count(collection_name=self.collection_name, exact=False)
+            logger.info("Async Qdrant client warmed up")
+        except Exception as e:
+            logger.warning(f"Async Qdrant warmup failed: {str(e)}")
+    
+    def retrieve(self, query, top_k: int = None, intent: str = None, query_vector=None, decomposition: dict = None):
         """Main retrieval method with intent-aware top_k
         
         Args:
-            query: Search query
+            query: Search query (str or QueryContext)
             top_k: Number of documents to retrieve (uses intent-specific if not specified)
             intent: Query intent for adaptive top_k
+            query_vector: Optional precomputed embedding of `query`
+            decomposition: Optional QueryDecomposer.decompose() result enabling the metadata-only fast path
         
         Returns:
             List of retrieved documents with metadata
         """
-        # Use intent-specific top_k if available
-        if top_k is None:
-            if intent and intent in config.INTENT_TOP_K:
-                top_k = config.INTENT_TOP_K[intent]
-                logger.debug(f"Using intent-specific top_k={top_k} for {intent}")
-            else:
-                top_k = config.TOP_K
+        top_k = self._resolve_top_k(top_k, intent)
+        ctx = QueryContext.from_query(query, query_vector)
+        
+        if self._use_metadata_only(decomposition, intent):
+            docs = self.metadata_retriever.retrieve_metadata_only(
+                ctx, decomposition['detected_schemes'], top_k
+            )
+            if docs:
+                return docs
+            logger.info("Metadata-only fast path returned nothing, falling back to vector search")
         
         # Perform semantic search
-        docs = self._semantic_retrieve(query, top_k)
+        docs = self._semantic_retrieve(ctx, top_k)
         
         # Apply simple score threshold filtering
         filtered_docs = self._filter_by_threshold(docs, intent)
@@ -58,26 +142,101 @@ class VectorRetriever:
         
         return filtered_docs
     
-    def _semantic_retrieve(self, query: str, top_k: int):
-        """Pure semantic retrieval using BGE-M3 embeddings"""
+    async def aretrieve(self, query, top_k: int = None, intent: str = None, query_vector=None, decomposition: dict = None):
+        """Async variant of retrieve() using the async Qdrant client"""
+        top_k = self._resolve_top_k(top_k, intent)
+        ctx = QueryContext.from_query(query, query_vector)
+        
+        if self._use_metadata_only(decomposition, intent):
+            docs = await asyncio.to_thread(
+                self.metadata_retriever.retrieve_metadata_only,
+                ctx, decomposition['detected_schemes'], top_k
+            )
+            if docs:
+                return docs
+            logger.info("Metadata-only fast path returned nothing, falling back to vector search")
+        
+        docs = await self._asemantic_retrieve(ctx, top_k)
+        filtered_docs = self._filter_by_threshold(docs, intent)
+        
+        logger.info(f"Retrieved {len(filtered_docs)}/{len(docs)} documents after filtering")
+        
+        return filtered_docs
+    
+    def retrieve_candidates(self, query, query_vector=None) -> list:
+        """Intent-independent half of retrieve(): semantic search at the largest intent top_k
+        
+        Lets the search run while the intent is still being classified;
+        select_for_intent() then applies the intent once it is known.
+        """
+        return self._semantic_retrieve(QueryContext.from_query(query, query_vector), self._CANDIDATE_TOP_K)
+    
+    async def aretrieve_candidates(self, query, query_vector=None) -> list:
+        """Async variant of retrieve_candidates()"""
+        return await self._asemantic_retrieve(QueryContext.from_query(query, query_vector), self._CANDIDATE_TOP_K)
+    
+    def select_for_intent(self, candidates: list, intent: str = None) -> list:
+        """Intent-dependent half of retrieve(): intent top_k, then threshold filtering
+        
+        Args:
+            candidates: retrieve_candidates() result (sorted by score)
+            intent: Classified query intent
+            
+        Returns:
+            Same documents retrieve(query, intent=intent) would return
+        """
+        docs = candidates[:self._resolve_top_k(None, intent)]
+        filtered_docs = self._filter_by_threshold(docs, intent)
+        
+        logger.info(f"Retrieved {len(filtered_docs)}/{len(docs)} documents after filtering")
+        
+        return filtered_docs
+    
+    def _use_metadata_only(self, decomposition: dict = None, intent: str = None) -> bool:
+        """High-confidence scheme match on a scheme-local intent -> skip embedding + ANN"""
+        return bool(
+            decomposition
+            and decomposition.get('detected_schemes')
+            and decomposition.get('confidence', 0.0) >= config.METADATA_ONLY_MIN_CONFIDENCE
+            and intent in config.METADATA_ONLY_INTENTS
+        )
+    
+    def _resolve_top_k(self, top_k: int = None, intent: str = None) -> int:
+        """Use intent-specific top_k if not specified"""
+        if top_k is not None:
+            return top_k
+        if intent and intent in config.INTENT_TOP_K:
+            logger.debug(f"Using intent-specific top_k={config.INTENT_TOP_K[intent]} for {intent}")
+            return config.INTENT_TOP_K[intent]
+        return config.TOP_K
+    
+    def _format_points(self, points, retrieval_method: str) -> list:
+        """Convert Qdrant scored points into document dicts"""
+        return [
+            {
+                "id": point.id,
+                "score": point.score,
+                "payload": point.payload,
+                "retrieval_method": retrieval_method
+            }
+            for point in points
+        ]
+    
+    def _semantic_retrieve(self, query, top_k: int, query_vector=None):
+        """Pure semantic retrieval using BGE-M3 embeddings (query: str or QueryContext)"""
         try:
-            query_vector = embedding_model.embed_query(query)
+            ctx = QueryContext.from_query(query, query_vector)
+            query_vector = embedding_model.embed_context(ctx)
             
             response = self.client.query_points(
                 collection_name=self.collection_name,
                 query=query_vector,
                 limit=top_k,
+                search_params=SEARCH_PARAMS,
                 with_payload=True
             )
             
-            retrieved_docs = []
-            for point in response.points:
-                retrieved_docs.append({
-                    "id": point.id,
-                    "score": point.score,
-                    "payload": point.payload,
-                    "retrieval_method": "semantic"
-                })
+            retrieved_docs = self._format_points(response.points, "semantic")
             
             logger.debug(
                 f"Semantic search returned {len(retrieved_docs)} documents with scores: "
@@ -93,6 +252,90 @@ class VectorRetriever:
             logger.error(f"Retrieval error: {str(e)}")
             raise RetrievalError(f"Could not retrieve documents: {str(e)}")
     
+    async def _asemantic_retrieve(self, query, top_k: int, query_vector=None):
+        """Async semantic retrieval (embedding runs in a worker thread)"""
+        try:
+            ctx = QueryContext.from_query(query, query_vector)
+            query_vector = ctx.embedding
+            if query_vector is None:
+                query_vector = await asyncio.to_thread(embedding_model.embed_context, ctx)
+            
+            response = await self.async_client.query_points(
+                collection_name=self.collection_name,
+                query=query_vector,
+                limit=top_k,
+                search_params=SEARCH_PARAMS,
+                with_payload=True
+            )
+            
+            retrieved_docs = self._format_points(response.points, "semantic")
+            
+            logger.debug(
+                f"Semantic search returned {len(retrieved_docs)} documents with scores: "
+                f"{[round(d['score'], 3) for d in retrieved_docs[:5]]}"
+            )
+            
+            return retrieved_docs
+            
+        except UnexpectedResponse as e:
+            logger.error(f"Qdrant query failed: {str(e)}")
+            raise RetrievalError(f"Vector search failed: {str(e)}")
+        except Exception as e:
+            logger.error(f"Retrieval error: {str(e)}")
+            raise RetrievalError(f"Could not retrieve documents: {str(e)}")
+    
+    def batch_retrieve(
+        self,
+        query_vectors: list,
+        query_filter: Filter = None,
+        top_k: int = None,
+        retrieval_method: str = "semantic"
+    ) -> list:
+        """Run several vector searches in a single Qdrant round trip
+        
+        Args:
+            query_vectors: Query embeddings to search with
+            query_filter: Optional filter applied to every search
+            top_k: Results per query
+            retrieval_method: Label stored on returned docs
+            
+        Returns:
+            One list of documents per query vector, in input order
+        """
+        if not query_vectors:
+            return []
+        
+        top_k = top_k or config.TOP_K
+        
+        try:
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=[
+                    QueryRequest(
+                        query=list(map(float, vector)),
+                        filter=query_filter,
+                        limit=top_k,
+                        params=SEARCH_PARAMS,
+                        with_payload=True
+                    )
+                    for vector in query_vectors
+                ]
+            )
+            
+            results = [
+                self._format_points(response.points, retrieval_method)
+                for response in responses
+            ]
+            logger.debug(f"Batch search returned {[len(r) for r in results]} documents per query")
+            return results
+            
+        except UnexpectedResponse as e:
+            logger.error(f"Qdrant batch query failed: {str(e)}")
+            raise RetrievalError(f"Batch vector search failed: {str(e)}")
+        except Exception as e:
+            logger.error(f"Batch retrieval error: {str(e)}")
+            raise RetrievalError(f"Could not batch retrieve documents: {str(e)}")
+    
     def _filter_by_threshold(self, docs: list, intent: str = None) -> list:
         """Simple threshold filtering based on intent
         
@@ -180,17 +423,11 @@ class VectorRetriever:
                 query=query_vector,
                 query_filter=filter_obj,
                 limit=top_k * 2,  # Retrieve more to account for filtering
+                search_params=SEARCH_PARAMS,
                 with_payload=True
             )
             
-            retrieved_docs = []
-            for point in response.points:
-                retrieved_docs.append({
-                    "id": point.id,
-                    "score": point.score,
-                    "payload": point.payload,
-                    "retrieval_method": "metadata_filtered"
-                })
+            retrieved_docs = self._format_points(response.points, "metadata_filtered")
             
             # Return top_k results
             final_docs = retrieved_docs[:top_k]
@@ -208,8 +445,30 @@ class VectorRetriever:
             logger.info("Falling back to semantic search")
             return self._semantic_retrieve(query, top_k)
     
+    def _format_memoized(self, kind: str, docs: list, render) -> str:
+        """render(docs), cached per (kind, doc ids + scores)
+        
+        Both formats print the score, so it is part of the key; payloads are
+        fixed per point id (FORMAT_CACHE_TTL_SECONDS bounds re-ingestion staleness).
+        """
+        key = (kind, tuple((d["id"], d.get("score", 0)) for d in docs))
+        text = self._format_cache.get(key)
+        if text is None:
+            text = render(docs)
+            self._format_cache.put(key, text)
+        return text
+    
     def format_for_judge(self, docs: list) -> str:
-        """Format docs for relevance judgment"""
+        """Format docs for relevance judgment (memoized per doc set)"""
+        return self._format_memoized("judge", docs, self._render_for_judge)
+    
+    def format_for_answer(self, docs: list) -> str:
+        """Format docs for answer generation - Full context (memoized per doc set)"""
+        return self._format_memoized("answer", docs, self._render_for_answer)
+    
+    @staticmethod
+    def _render_for_judge(docs: list) -> str:
+        """Relevance judge view: scheme, theme, score and a 200-char preview per doc"""
         if not docs:
             return "No documents retrieved."
         
@@ -228,8 +487,9 @@ class VectorRetriever:
             )
         return "\n\n".join(lines)
     
-    def format_for_answer(self, docs: list) -> str:
-        """Format docs for answer generation - Full context"""
+    @staticmethod
+    def _render_for_answer(docs: list) -> str:
+        """Answer view: full text plus scheme metadata and official URL per doc"""
         if not docs:
             return "No relevant documents found."
         
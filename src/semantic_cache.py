@@ -0,0 +1,188 @@
+"""Semantic response cache backed by a Qdrant collection
+
+Paraphrased re-asks of the same question are answered from a small cache
+collection instead of re-running retrieval + LLM generation.
+
+Lookup: nearest cached query embedding (cosine) above a similarity threshold,
+among entries with the same intent ("eligibility for PMEGP" and "benefits of
+PMEGP" embed almost identically but need different answers).
+Expiry: entries older than the TTL are ignored on lookup and purged in the background.
+"""
+import time
+import uuid
+from typing import Dict, Optional
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, PayloadSchemaType,
+    Filter, FieldCondition, MatchValue, Range, FilterSelector
+)
+from src.logger import setup_logger
+import config
+
+logger = setup_logger(__name__)
+
+
+class SemanticCache:
+    """Query-embedding keyed response cache stored in Qdrant"""
+
+    def __init__(
+        self,
+        qdrant_client,
+        collection_name: str = None,
+        similarity_threshold: float = None,
+        ttl_seconds: int = None,
+        async_client=None
+    ):
+        """
+        Args:
+            qdrant_client: Qdrant client instance
+            collection_name: Cache collection name
+            similarity_threshold: Minimum cosine similarity for a cache hit
+            ttl_seconds: Cache entry lifetime
+            async_client: Optional AsyncQdrantClient for alookup()/astore()/apurge_expired()
+        """
+        self.client = qdrant_client
+        self.async_client = async_client
+        self.collection_name = collection_name or config.SEMANTIC_CACHE_COLLECTION
+        self.similarity_threshold = similarity_threshold or config.SEMANTIC_CACHE_THRESHOLD
+        self.ttl_seconds = ttl_seconds or config.SEMANTIC_CACHE_TTL_SECONDS
+
+        self._ensure_collection()
+        logger.info(
+            f"Semantic cache initialized (collection={self.collection_name}, "
+            f"threshold={self.similarity_threshold}, ttl={self.ttl_seconds}s)"
+        )
+
+    def _ensure_collection(self):
+        """Create the cache collection and its created_at / intent indexes if missing"""
+        if self.client.collection_exists(self.collection_name):
+            return
+
+        self.client.create_collection(
+            collection_name=self.collection_name,
+            vectors_config=VectorParams(
+                size=config.EMBEDDING_DIMENSION,
+                distance=Distance.COSINE
+            )
+        )
+        self.client.create_payload_index(
+            collection_name=self.collection_name,
+            field_name="created_at",
+            field_schema=PayloadSchemaType.FLOAT
+        )
+        self.client.create_payload_index(
+            collection_name=self.collection_name,
+            field_name="intent",
+            field_schema=PayloadSchemaType.KEYWORD
+        )
+        logger.info(f"Created semantic cache collection: {self.collection_name}")
+
+    def _lookup_filter(self, intent: Optional[str] = None) -> Filter:
+        """Filter matching entries younger than the TTL (and answered for intent, if given)"""
+        conditions = [
+            FieldCondition(
+                key="created_at",
+                range=Range(gte=time.time() - self.ttl_seconds)
+            )
+        ]
+        if intent is not None:
+            conditions.append(FieldCondition(key="intent", match=MatchValue(value=intent)))
+        return Filter(must=conditions)
+
+    def _lookup_request(self, query_vector, intent: Optional[str] = None) -> Dict:
+        """query_points() arguments for the closest fresh entry"""
+        return {
+            "collection_name": self.collection_name,
+            "query": query_vector,
+            "query_filter": self._lookup_filter(intent),
+            "limit": 1,
+            "with_payload": True
+        }
+
+    def _store_request(self, query_vector, response: Dict) -> Dict:
+        """upsert() arguments for one cache entry"""
+        return {
+            "collection_name": self.collection_name,
+            "points": [
+                PointStruct(
+                    id=str(uuid.uuid4()),
+                    vector=list(map(float, query_vector)),
+                    payload={
+                        "response": response,
+                        "intent": response.get("intent"),
+                        "created_at": time.time()
+                    }
+                )
+            ],
+            "wait": False
+        }
+
+    def _purge_request(self) -> Dict:
+        """delete() arguments for entries older than the TTL"""
+        return {
+            "collection_name": self.collection_name,
+            "points_selector": FilterSelector(
+                filter=Filter(
+                    must=[
+                        FieldCondition(
+                            key="created_at",
+                            range=Range(lt=time.time() - self.ttl_seconds)
+                        )
+                    ]
+                )
+            ),
+            "wait": False
+        }
+
+    def lookup(self, query_vector, intent: Optional[str] = None) -> Optional[Dict]:
+        """Return the cached response for the closest query, if similar enough
+
+        Args:
+            query_vector: Normalized query embedding
+            intent: Classified intent of the query; only responses cached for
+                the same intent can hit
+
+        Returns:
+            Cached response dict, or None on miss
+        """
+        return self._hit(self.client.query_points(**self._lookup_request(query_vector, intent)))
+
+    async def alookup(self, query_vector, intent: Optional[str] = None) -> Optional[Dict]:
+        """Async variant of lookup() (requires async_client)"""
+        return self._hit(await self.async_client.query_points(**self._lookup_request(query_vector, intent)))
+
+    def _hit(self, response) -> Optional[Dict]:
+        """Cached response from a lookup result, or None below the similarity threshold"""
+        if not response.points:
+            return None
+
+        top = response.points[0]
+        if top.score < self.similarity_threshold:
+            logger.debug(f"Semantic cache miss (best score={top.score:.3f})")
+            return None
+
+        logger.info(f"Semantic cache hit (score={top.score:.3f})")
+        return top.payload["response"]
+
+    def store(self, query_vector, response: Dict):
+        """Cache a response under its query embedding
+
+        Args:
+            query_vector: Normalized query embedding
+            response: Serializable response dict (its "intent" scopes later lookups)
+        """
+        self.client.upsert(**self._store_request(query_vector, response))
+
+    async def astore(self, query_vector, response: Dict):
+        """Async variant of store() (requires async_client)"""
+        await self.async_client.upsert(**self._store_request(query_vector, response))
+
+    def purge_expired(self):
+        """Delete entries older than the TTL"""
+        self.client.delete(**self._purge_request())
+        logger.debug("Purged expired semantic cache entries")
+
+    async def apurge_expired(self):
+        """Async variant of purge_expired() (requires async_client)"""
+        await self.async_client.delete(**self._purge_request())
+        logger.debug("Purged expired semantic cache entries")
+
@@ -0,0 +1,91 @@
+"""Hashed BM25 sparse vectors for Qdrant's server-side keyword search
+
+Tokens are mapped to sparse indices with MurmurHash3, so no vocabulary has to
+be stored or shared between ingest and query time. Documents carry the BM25
+term-frequency component; Qdrant applies IDF itself (Modifier.IDF), so adding
+documents never requires re-encoding the rest of the collection.
+"""
+from collections import Counter
+from typing import Dict, List
+from qdrant_client.models import SparseVector
+from src.logger import setup_logger
+from src.query_context import tokenize
+import config
+
+logger = setup_logger(__name__)
+
+try:
+    import mmh3
+    MMH3_AVAILABLE = True
+except ImportError:
+    MMH3_AVAILABLE = False
+    logger.warning("mmh3 not installed. Server-side sparse BM25 disabled. Install: pip install mmh3")
+
+
+def bm25_document_text(payload: Dict) -> str:
+    """Searchable text for keyword matching: scheme name + theme + chunk text"""
+    return f"{payload.get('scheme_name', '')} {payload.get('theme', '')} {payload.get('text', '')}"
+
+
+def server_sparse_available(client, collection_name: str) -> bool:
+    """Whether server-side sparse BM25 is enabled and indexed in the collection
+
+    Args:
+        client: Qdrant client
+        collection_name: Collection to inspect
+
+    Returns:
+        True if queries can rank by the sparse vector; otherwise callers keep
+        their in-process BM25
+    """
+    if not config.SPARSE_BM25_ENABLED:
+        return False
+    if not MMH3_AVAILABLE:
+        logger.warning("SPARSE_BM25_ENABLED is set but mmh3 is not installed; using in-process BM25")
+        return False
+
+    try:
+        info = client.get_collection(collection_name)
+        if config.SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {}):
+            return True
+        logger.warning(
+            f"Collection has no '{config.SPARSE_VECTOR_NAME}' sparse vector "
+            f"(re-index with SPARSE_BM25_ENABLED=true); using in-process BM25"
+        )
+    except Exception as e:
+        logger.warning(f"Could not inspect collection for sparse vectors: {e}")
+    return False
+
+
+def _token_index(token: str) -> int:
+    """Unsigned 32-bit MurmurHash3 of a token (Qdrant sparse indices are u32)"""
+    return mmh3.hash(token, signed=False)
+
+
+def document_sparse_vector(text: str) -> SparseVector:
+    """BM25 term-frequency weights for one document
+
+    Args:
+        text: Document text (tokenized like queries)
+
+    Returns:
+        SparseVector with one saturated TF weight per distinct token
+    """
+    tokens = tokenize(text)
+    k1 = config.SPARSE_BM25_K1
+    b = config.SPARSE_BM25_B
+    length_norm = k1 * (1 - b + b * len(tokens) / config.SPARSE_BM25_AVG_DOC_LEN)
+
+    weights: Dict[int, float] = {}
+    for token, tf in Counter(tokens).items():
+        # Hash collisions between distinct tokens simply add up
+        index = _token_index(token)
+        weights[index] = weights.get(index, 0.0) + tf * (k1 + 1) / (tf + length_norm)
+
+    return SparseVector(indices=list(weights), values=list(weights.values()))
+
+
+def query_sparse_vector(tokens: List[str]) -> SparseVector:
+    """Query-side vector: unit weight per distinct token (server applies IDF)"""
+    indices = sorted({_token_index(token) for token in tokens})
+    return SparseVector(indices=indices, values=[1.0] * len(indices))
@@ -0,0 +1,22 @@
+"""Process-wide worker pool for blocking I/O fanned out by the retrievers
+
+BM25 scoring, scroll id ranges and intent classification all submit short,
+leaf tasks here instead of each owning a pool, so the total thread count stays
+bounded under concurrent requests. Only submit tasks that never wait on other
+pool tasks: a bounded pool whose workers block on each other can deadlock.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import config
+
+
+@lru_cache(maxsize=1)
+def get_thread_pool() -> ThreadPoolExecutor:
+    """Shared bounded ThreadPoolExecutor (created on first use)"""
+    return ThreadPoolExecutor(max_workers=config.THREAD_POOL_SIZE, thread_name_prefix="rag-worker")
+
+
+@lru_cache(maxsize=1)
+def get_draft_pool() -> ThreadPoolExecutor:
+    """Small dedicated pool for speculative answer drafts (long, non-interruptible LLM calls)"""
+    return ThreadPoolExecutor(max_workers=config.DRAFT_POOL_SIZE, thread_name_prefix="rag-draft")
@@ -15,7 +15,7 @@ print("[1/6] Checking imports...")
 try:
     from src.llm import get_ollama_llm, get_groq_llm
     from src.retrieval import VectorRetriever
-    from src.graph import app
+    from src.graph import get_app
     print("[PASS] All imports successful\n")
 except Exception as e:
     print(f"[FAIL] Import error: {e}")
@@ -81,7 +81,7 @@ print("       Processing...\n")
 
 try:
     start = time.time()
-    result = app.invoke({"query": "What is PMEGP scheme?"})
+    result = get_app().invoke({"query": "What is PMEGP scheme?"})
     elapsed = time.time() - start
     
     print("[PASS] Pipeline completed\n")
@@ -0,0 +1,160 @@
+"""Unit tests for src/batched_judge.py (fake chains, no LLM)"""
+import asyncio
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from src.batched_judge import BatchedJudge, parse_batch_verdicts
+
+
+# ----------------------------------------------------------------------------
+# parse_batch_verdicts
+# ----------------------------------------------------------------------------
+
+def test_parses_numbered_verdicts_with_rewrites():
+    content = "1. YES\n2. NO | PMEGP subsidy amount for women\n3) yes"
+
+    assert parse_batch_verdicts(content, 3) == [
+        ("YES", None),
+        ("NO", "PMEGP subsidy amount for women"),
+        ("YES", None),
+    ]
+
+
+def test_accepts_case_prefix_and_colon():
+    assert parse_batch_verdicts("Case 1: no\ncase 2: YES", 2) == [("NO", None), ("YES", None)]
+
+
+def test_missing_cases_are_none():
+    assert parse_batch_verdicts("2. YES", 3) == [None, ("YES", None), None]
+
+
+def test_ignores_prose_and_unparseable_lines():
+    content = (
+        "Here are my verdicts:\n"
+        "1. MAYBE\n"
+        "2. YESSIR\n"
+        "3. YES - the documents mention the subsidy\n"
+        "<think>case 4 looks relevant</think>\n"
+        "4. NO"
+    )
+
+    assert parse_batch_verdicts(content, 4) == [None, None, None, ("NO", None)]
+
+
+def test_ignores_out_of_range_case_numbers():
+    assert parse_batch_verdicts("0. YES\n3. NO\n1. YES", 2) == [("YES", None), None]
+
+
+def test_first_verdict_for_a_case_wins():
+    assert parse_batch_verdicts("1. NO | first rewrite\n1. YES\n1. NO | second", 1) == [("NO", "first rewrite")]
+
+
+def test_empty_rewrite_is_none():
+    assert parse_batch_verdicts("1. NO |   ", 1) == [("NO", None)]
+
+
+def test_empty_reply():
+    assert parse_batch_verdicts("", 2) == [None, None]
+
+
+# ----------------------------------------------------------------------------
+# BatchedJudge
+# ----------------------------------------------------------------------------
+
+class _Chain:
+    """Fake prompt | LLM chain: reply(inputs) -> content string (or raises)"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    async def ainvoke(self, inputs):
+        self.calls.append(inputs)
+        return SimpleNamespace(content=self.reply(inputs))
+
+
+def _case_count(inputs):
+    return len(re.findall(r"^Case \d+:", inputs["cases"], re.MULTILINE))
+
+
+def _judge(batch_reply, single_reply=lambda inputs: "YES", **kwargs):
+    kwargs.setdefault("batch_size", 8)
+    kwargs.setdefault("wait_ms", 10)
+    return BatchedJudge(
+        batch_chain=_Chain(batch_reply),
+        single_chain=_Chain(single_reply),
+        render_case=lambda inputs: inputs["query"],
+        parse_single=lambda content: (content.strip().upper(), None),
+        **kwargs
+    )
+
+
+def _submit_all(judge, queries):
+    async def run():
+        return await asyncio.gather(*(judge.submit({"query": q}) for q in queries))
+    return asyncio.run(run())
+
+
+def test_concurrent_calls_share_one_batch_request():
+    judge = _judge(lambda inputs: "1. YES\n2. NO | better query\n3. YES")
+
+    results = _submit_all(judge, ["q1", "q2", "q3"])
+
+    assert results == [("YES", None), ("NO", "better query"), ("YES", None)]
+    assert len(judge.batch_chain.calls) == 1
+    assert _case_count(judge.batch_chain.calls[0]) == 3
+    assert judge.single_chain.calls == []
+
+
+def test_lone_call_skips_the_batch_prompt():
+    judge = _judge(lambda inputs: pytest.fail("batch chain used for one case"))
+
+    assert _submit_all(judge, ["q1"]) == [("YES", None)]
+    assert judge.single_chain.calls == [{"query": "q1"}]
+
+
+def test_unanswered_cases_are_rejudged_singly():
+    judge = _judge(lambda inputs: "1. NO | rewrite\nI am not sure about case 2", single_reply=lambda inputs: "no")
+
+    results = _submit_all(judge, ["q1", "q2"])
+
+    assert results == [("NO", "rewrite"), ("NO", None)]
+    assert judge.single_chain.calls == [{"query": "q2"}]
+
+
+def test_failed_batch_falls_back_to_single_calls():
+    def broken(inputs):
+        raise RuntimeError("rate limited")
+
+    judge = _judge(broken)
+
+    assert _submit_all(judge, ["q1", "q2", "q3"]) == [("YES", None)] * 3
+    assert len(judge.single_chain.calls) == 3
+
+
+def test_single_call_errors_reach_the_caller():
+    def broken(inputs):
+        raise RuntimeError("groq down")
+
+    judge = _judge(lambda inputs: "", single_reply=broken)
+
+    with pytest.raises(RuntimeError, match="groq down"):
+        _submit_all(judge, ["q1"])
+
+
+def test_full_batch_flushes_without_waiting():
+    def all_yes(inputs):
+        return "\n".join(f"{i}. YES" for i in range(1, _case_count(inputs) + 1))
+
+    judge = _judge(all_yes, batch_size=2, wait_ms=60_000)  # Only the size trigger can flush in time
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(judge.submit({"query": "q1"}), judge.submit({"query": "q2"})),
+            timeout=5
+        )
+
+    assert asyncio.run(run()) == [("YES", None), ("YES", None)]
+    assert len(judge.batch_chain.calls) == 1
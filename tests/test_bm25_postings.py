@@ -0,0 +1,88 @@
+"""Unit tests for src/bm25_postings.py"""
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from src.bm25_postings import PostingsBM25
+
+CORPUS = [
+    ["pmegp", "subsidy", "manufacturing", "unit"],
+    ["mudra", "loan", "small", "business"],
+    ["pmegp", "eligibility", "age", "18", "years"],
+    ["stand", "up", "india", "loan", "women", "entrepreneurs", "loan"],
+    ["pm", "kisan", "income", "support", "farmers"],
+]
+
+
+def _reference_scores(corpus, query, k1=1.5, b=0.75, epsilon=0.25):
+    """Plain-Python Okapi BM25 with rank_bm25's IDF flooring"""
+    n = len(corpus)
+    avgdl = sum(len(doc) for doc in corpus) / n
+    df = Counter(term for doc in corpus for term in set(doc))
+    idf = {term: math.log((n - freq + 0.5) / (freq + 0.5)) for term, freq in df.items()}
+    floor = epsilon * sum(idf.values()) / len(idf)
+    idf = {term: value if value >= 0 else floor for term, value in idf.items()}
+
+    scores = []
+    for doc in corpus:
+        tf = Counter(doc)
+        norm = k1 * (1 - b + b * len(doc) / avgdl)
+        scores.append(sum(
+            idf[term] * tf[term] * (k1 + 1) / (tf[term] + norm) for term in query if term in tf
+        ))
+    return scores
+
+
+@pytest.mark.parametrize("query", [
+    ["pmegp"],
+    ["loan", "women"],
+    ["pmegp", "pmegp", "subsidy"],  # Repeated query terms count twice
+    ["farmers", "loan", "age"],
+])
+def test_scores_match_reference_bm25(query):
+    scores = PostingsBM25(CORPUS).get_scores(query)
+
+    assert scores.dtype == np.float32
+    np.testing.assert_allclose(scores, _reference_scores(CORPUS, query), rtol=1e-5, atol=1e-6)
+
+
+def test_common_terms_get_a_small_positive_idf():
+    corpus = [["loan", "a"], ["loan", "b"], ["loan", "c"], ["d"]]
+    scores = PostingsBM25(corpus).get_scores(["loan"])
+
+    assert (scores[:3] > 0).all()
+    assert scores[3] == 0
+    np.testing.assert_allclose(scores, _reference_scores(corpus, ["loan"]), rtol=1e-5)
+
+
+def test_unknown_terms_score_zero():
+    scores = PostingsBM25(CORPUS).get_scores(["unknown", "terms"])
+
+    assert scores.shape == (len(CORPUS),)
+    assert not scores.any()
+
+
+def test_ranking_prefers_term_dense_short_documents():
+    scores = PostingsBM25(CORPUS).get_scores(["loan"])
+
+    assert scores.argmax() == 3  # "loan" twice
+    assert scores[1] > 0 and scores[0] == 0
+
+
+def test_empty_corpus():
+    bm25 = PostingsBM25([])
+
+    assert bm25.get_scores(["pmegp"]).shape == (0,)
+
+
+def test_matches_rank_bm25_when_installed():
+    rank_bm25 = pytest.importorskip("rank_bm25")
+    query = ["pmegp", "loan", "women"]
+
+    np.testing.assert_allclose(
+        PostingsBM25(CORPUS).get_scores(query),
+        rank_bm25.BM25Okapi(CORPUS).get_scores(query),
+        rtol=1e-5
+    )
@@ -0,0 +1,129 @@
+"""Unit tests for the ranking helpers in src/fusion.py"""
+import copy
+
+import numpy as np
+import pytest
+
+from src.fusion import format_bm25_results, fuse, make_fuser, top_k_desc
+
+
+def _doc(doc_id, score=0.0):
+    return {"id": doc_id, "score": score, "payload": {"scheme_name": doc_id}}
+
+
+def _fuser(bm25_weight=0.4, semantic_weight=0.6, rrf_k=60):
+    return make_fuser(bm25_weight, semantic_weight, rrf_k)
+
+
+def _ids(results):
+    return [doc["id"] for doc in results]
+
+
+def test_top_of_both_rankings_scores_one():
+    results = _fuser()([_doc("a")], [_doc("a", 1.0)])
+
+    assert results[0]["score"] == pytest.approx(1.0, abs=1e-6)
+    assert results[0]["retrieval_sources"] == ["bm25", "semantic"]
+    assert results[0]["retrieval_method"] == "hybrid"
+
+
+def test_docs_in_both_rankings_outrank_single_source_docs():
+    bm25 = [_doc("bm25_only"), _doc("both")]
+    semantic = [_doc("semantic_only", 0.8), _doc("both", 0.8)]
+
+    results = _fuser()(bm25, semantic)
+
+    assert _ids(results)[0] == "both"
+    assert {doc["id"]: doc["retrieval_sources"] for doc in results} == {
+        "both": ["bm25", "semantic"],
+        "bm25_only": ["bm25"],
+        "semantic_only": ["semantic"],
+    }
+
+
+def test_results_are_sorted_and_truncated_to_top_k():
+    bm25 = [_doc(f"d{i}") for i in range(10)]
+    semantic = [_doc(f"d{i}", 0.9 - i * 0.05) for i in reversed(range(10))]
+
+    results = _fuser()(bm25, semantic, 3)
+    full = _fuser()(bm25, semantic)
+
+    scores = [doc["score"] for doc in full]
+    assert scores == sorted(scores, reverse=True)
+    assert _ids(results) == _ids(full)[:3]
+
+
+def test_semantic_weight_decides_between_single_source_docs():
+    bm25, semantic = [_doc("keyword")], [_doc("semantic", 0.0)]
+
+    assert _ids(_fuser(0.3, 0.7)(bm25, semantic))[0] == "semantic"
+    assert _ids(_fuser(0.7, 0.3)(bm25, semantic))[0] == "keyword"
+
+
+def test_ties_keep_first_seen_order():
+    # Equal weights, rank 1 in one list each, no semantic score: identical fused scores
+    bm25, semantic = [_doc("keyword")], [_doc("semantic", 0.0)]
+
+    results = _fuser(0.5, 0.5)(bm25, semantic)
+    assert results[0]["score"] == results[1]["score"]
+    assert _ids(results) == ["keyword", "semantic"]
+
+    assert _ids(_fuser(0.5, 0.5)(bm25, semantic, 5)) == ["keyword", "semantic"]
+
+
+def test_bm25_payload_wins_for_docs_in_both_rankings():
+    bm25 = [{"id": "a", "score": 3.2, "payload": {"source": "bm25"}}]
+    semantic = [{"id": "a", "score": 0.7, "payload": {"source": "semantic"}}]
+
+    assert _fuser()(bm25, semantic)[0]["payload"] == {"source": "bm25"}
+
+
+def test_inputs_are_not_mutated():
+    bm25 = [_doc("a"), _doc("b")]
+    semantic = [_doc("b", 0.9), _doc("c", 0.5)]
+    before = copy.deepcopy((bm25, semantic))
+
+    _fuser()(bm25, semantic, 2)
+
+    assert (bm25, semantic) == before
+
+
+def test_empty_rankings_fuse_to_nothing():
+    assert _fuser()([], []) == []
+
+
+def test_fuse_falls_back_to_semantic_without_bm25_hits():
+    semantic = [_doc("a", 0.9), _doc("b", 0.8), _doc("c", 0.7)]
+
+    assert fuse([], semantic, _fuser(), 2) == semantic[:2]
+
+
+def test_top_k_desc_returns_best_first():
+    scores = np.array([0.1, 0.9, 0.4, 0.7, 0.0], dtype=np.float32)
+
+    assert top_k_desc(scores, 3).tolist() == [1, 3, 2]
+    assert top_k_desc(scores).tolist() == [1, 3, 2, 0, 4]
+
+
+def test_top_k_desc_breaks_ties_by_index():
+    scores = np.array([0.5, 0.9, 0.5, 0.5], dtype=np.float32)
+
+    assert top_k_desc(scores, 3).tolist() == [1, 0, 2]
+
+
+@pytest.mark.parametrize("k", [0, 10])
+def test_top_k_desc_clamps_k(k):
+    scores = np.array([0.2, 0.8], dtype=np.float32)
+
+    assert top_k_desc(scores, k).tolist() == [1, 0][:k]
+
+
+def test_format_bm25_results_drops_zero_scores():
+    corpus = [{"id": f"d{i}", "payload": {"i": i}} for i in range(3)]
+
+    results = format_bm25_results(corpus, np.array([2, 0, 1]), np.array([3.5, 1.0, 0.0]))
+
+    assert results == [
+        {"id": "d2", "score": 3.5, "payload": {"i": 2}, "source": "bm25"},
+        {"id": "d0", "score": 1.0, "payload": {"i": 0}, "source": "bm25"},
+    ]
@@ -0,0 +1,113 @@
+"""Tests for the embedding-prototype intent classifier
+
+The unit tests run on hand-made prototype vectors. The held-out validation
+needs the real embedding model (sentence-transformers + config.EMBEDDING_MODEL)
+and is skipped when it cannot be loaded; run it before enabling
+EMBEDDING_INTENT_ENABLED or after changing EMBEDDING_MODEL, INTENT_EXAMPLES or
+INTENT_CONFIDENCE_MARGIN.
+"""
+import numpy as np
+import pytest
+
+import config
+from src.intent_classifier import EmbeddingIntentClassifier
+
+# Label -> example vectors; ELIGIBILITY's prototype is the normalized mean of two axes
+EXAMPLE_VECTORS = {
+    "ELIGIBILITY": [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]],
+    "BENEFITS": [[0.0, 0.0, 1.0]],
+}
+
+
+def _classifier(margin=0.1):
+    """Classifier over EXAMPLE_VECTORS (the example texts are never embedded)"""
+    examples = {label: [f"{label} example {i}" for i in range(len(rows))] for label, rows in EXAMPLE_VECTORS.items()}
+    vectors = np.array([row for rows in EXAMPLE_VECTORS.values() for row in rows])
+    return EmbeddingIntentClassifier(examples, margin=margin, example_vectors=vectors)
+
+
+def _unit(*components):
+    vector = np.array(components, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_clear_lead_is_classified():
+    assert _classifier().classify(_unit(1, 1, 0)) == "ELIGIBILITY"
+    assert _classifier().classify(_unit(0, 0, 1)) == "BENEFITS"
+
+
+def test_prototype_is_the_mean_of_its_examples():
+    # Closer to one ELIGIBILITY example than to BENEFITS, but not to the mean direction
+    classifier = _classifier(margin=0.0)
+
+    assert classifier.classify(_unit(1, -1, 0.5)) == "BENEFITS"
+
+
+def test_abstains_when_the_lead_is_below_the_margin():
+    # Equidistant from both prototypes: lead 0
+    query = _unit(1, 1, np.sqrt(2))
+
+    assert _classifier(margin=0.05).classify(query) is None
+
+
+def test_margin_decides_between_classify_and_abstain():
+    # Slightly closer to BENEFITS (lead ~0.09)
+    query = _unit(1, 1, 1.6)
+
+    assert _classifier(margin=0.05).classify(query) == "BENEFITS"
+    assert _classifier(margin=0.2).classify(query) is None
+
+# Labelled queries that are NOT in config.INTENT_EXAMPLES
+LABELLED_QUERIES = [
+    ("schemes for dairy farmers in rural areas", "DISCOVERY"),
+    ("are there any grants for women-led startups", "DISCOVERY"),
+    ("government support available for handloom weavers", "DISCOVERY"),
+    ("eligibility for PMEGP", "ELIGIBILITY"),
+    ("can a student apply for the Mudra loan", "ELIGIBILITY"),
+    ("is there an income limit for PM Kisan", "ELIGIBILITY"),
+    ("benefits of PMEGP", "BENEFITS"),
+    ("how much money do farmers receive under PM Kisan", "BENEFITS"),
+    ("what interest subsidy does Stand-Up India offer", "BENEFITS"),
+    ("PMEGP versus Stand-Up India for a first-time entrepreneur", "COMPARISON"),
+    ("how does CGTMSE differ from Mudra", "COMPARISON"),
+    ("Mudra or PMEGP, which one should I choose", "COMPARISON"),
+    ("where do I submit the PMEGP application", "PROCEDURE"),
+    ("how do I register for PM Kisan online", "PROCEDURE"),
+    ("which forms are needed to apply for CGTMSE", "PROCEDURE"),
+    ("what is the CGTMSE scheme", "GENERAL"),
+    ("give me an overview of Stand-Up India", "GENERAL"),
+    ("which ministry manages PMEGP", "GENERAL"),
+]
+
+
+@pytest.fixture(scope="module")
+def classifier_and_model():
+    pytest.importorskip("sentence_transformers")
+    try:
+        from src.embeddings import embedding_model
+        return EmbeddingIntentClassifier(), embedding_model
+    except Exception as e:
+        pytest.skip(f"Embedding model unavailable: {e}")
+
+
+def test_held_out_queries_are_never_mislabelled(classifier_and_model):
+    """With the configured margin the classifier may abstain, but must not guess wrong"""
+    classifier, embedding_model = classifier_and_model
+    vectors = embedding_model.embed_queries([query for query, _ in LABELLED_QUERIES])
+
+    mislabelled = []
+    for (query, expected), vector in zip(LABELLED_QUERIES, vectors):
+        label = classifier.classify(vector)
+        if label is not None and label != expected:
+            mislabelled.append((query, expected, label))
+
+    assert not mislabelled, f"margin {config.INTENT_CONFIDENCE_MARGIN} lets through: {mislabelled}"
+
+
+def test_examples_label_themselves(classifier_and_model):
+    """Every prototype example maps back to its own label or abstains"""
+    classifier, embedding_model = classifier_and_model
+    for label, examples in config.INTENT_EXAMPLES.items():
+        for vector in embedding_model.embed_queries(list(examples)):
+            assert classifier.classify(vector) in (label, None)
+
@@ -0,0 +1,100 @@
+"""Unit tests for src/query_cache.py"""
+import pytest
+
+from src import query_cache
+from src.query_cache import QueryCache
+
+
+class _Clock:
+    """Stand-in for the time module with a manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(query_cache, "time", fake)
+    return fake
+
+
+def test_get_returns_stored_value():
+    cache = QueryCache(max_size=4, ttl_seconds=60)
+    cache.put("q", [0.1, 0.2])
+
+    assert cache.get("q") == [0.1, 0.2]
+    assert cache.get("missing") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(max_size=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_put_refreshes_recency_of_existing_key():
+    cache = QueryCache(max_size=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 10)
+    cache.put("c", 3)
+
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = QueryCache(max_size=4, ttl_seconds=10)
+    cache.put("q", "value")
+
+    clock.now += 9.9
+    assert cache.get("q") == "value"
+
+    clock.now += 0.2
+    assert cache.get("q") is None
+    assert cache.get_stats()["size"] == 0  # Expired entry is dropped on lookup
+
+
+def test_put_restarts_ttl(clock):
+    cache = QueryCache(max_size=4, ttl_seconds=10)
+    cache.put("q", "old")
+    clock.now += 8
+    cache.put("q", "new")
+    clock.now += 8
+
+    assert cache.get("q") == "new"
+
+
+def test_stats_count_hits_misses_and_expiries(clock):
+    cache = QueryCache(max_size=4, ttl_seconds=10)
+    cache.put("q", 1)
+    cache.get("q")
+    cache.get("other")
+    clock.now += 11
+    cache.get("q")
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 2, 0)
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+
+def test_clear_keeps_counters():
+    cache = QueryCache(max_size=4, ttl_seconds=60)
+    cache.put("q", 1)
+    cache.get("q")
+    cache.clear()
+
+    assert cache.get("q") is None
+    assert cache.get_stats()["hits"] == 1
+    assert QueryCache().get_stats()["hit_rate"] == 0.0
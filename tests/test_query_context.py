@@ -0,0 +1,50 @@
+"""Unit tests for src/query_context.py"""
+import numpy as np
+
+from src.query_context import QueryContext, tokenize
+
+
+def test_tokenize_lowercases_and_splits_on_punctuation():
+    assert tokenize("PMEGP/Mudra: loan-limit?") == ["pmegp", "mudra", "loan", "limit"]
+
+
+def test_tokenize_drops_stopwords():
+    assert tokenize("What is the subsidy for women in PMEGP") == ["subsidy", "women", "pmegp"]
+
+
+def test_tokenize_keeps_numbers_and_underscores():
+    assert tokenize("Rs 25 lakh under scheme_2024") == ["rs", "25", "lakh", "under", "scheme_2024"]
+
+
+def test_tokenize_empty_and_stopword_only_text():
+    assert tokenize("") == []
+    assert tokenize("what is it?") == []
+
+
+def test_from_query_normalizes_once():
+    ctx = QueryContext.from_query("  Eligibility for   PMEGP ")
+
+    assert ctx.raw == "  Eligibility for   PMEGP "
+    assert ctx.lower == "  eligibility for   pmegp "
+    assert ctx.tokens == ["eligibility", "pmegp"]
+    assert ctx.normalized == "eligibility for pmegp"
+    assert ctx.embedding is None
+
+
+def test_from_query_returns_existing_context_and_fills_missing_embedding():
+    ctx = QueryContext.from_query("benefits of PMEGP")
+    vector = np.ones(3, dtype=np.float32)
+
+    same = QueryContext.from_query(ctx, vector)
+
+    assert same is ctx
+    assert same.embedding is vector
+
+
+def test_from_query_does_not_overwrite_memoized_embedding():
+    first = np.zeros(3, dtype=np.float32)
+    ctx = QueryContext.from_query("benefits of PMEGP", first)
+
+    QueryContext.from_query(ctx, np.ones(3, dtype=np.float32))
+
+    assert ctx.embedding is first
@@ -0,0 +1,57 @@
+"""Unit tests for src/semantic_cache.py (in-memory Qdrant, no embedding model)"""
+import math
+
+import pytest
+from qdrant_client import QdrantClient
+
+from src.semantic_cache import SemanticCache
+import config
+
+
+def _vector(*head):
+    """Unit vector of EMBEDDING_DIMENSION with the given leading components"""
+    values = list(head) + [0.0] * (config.EMBEDDING_DIMENSION - len(head))
+    norm = math.sqrt(sum(v * v for v in values))
+    return [v / norm for v in values]
+
+
+def _response(intent, answer):
+    return {"query": "q", "intent": intent, "answer": answer, "retrieved_docs": []}
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(QdrantClient(":memory:"), similarity_threshold=0.9, ttl_seconds=3600)
+
+
+def test_near_miss_with_different_intent_is_not_served(cache):
+    # "eligibility for PMEGP" vs "benefits of PMEGP": nearly identical embeddings
+    eligibility = _vector(1.0, 0.1)
+    benefits = _vector(1.0, 0.15)
+    cache.store(eligibility, _response("ELIGIBILITY", "Individuals above 18 years..."))
+
+    assert cache.lookup(benefits, intent="BENEFITS") is None
+
+
+def test_paraphrase_with_same_intent_is_served(cache):
+    cache.store(_vector(1.0, 0.1), _response("ELIGIBILITY", "Individuals above 18 years..."))
+
+    cached = cache.lookup(_vector(1.0, 0.15), intent="ELIGIBILITY")
+
+    assert cached is not None
+    assert cached["answer"] == "Individuals above 18 years..."
+
+
+def test_each_intent_gets_its_own_answer(cache):
+    cache.store(_vector(1.0, 0.1), _response("ELIGIBILITY", "eligibility answer"))
+    cache.store(_vector(1.0, 0.12), _response("BENEFITS", "benefits answer"))
+
+    assert cache.lookup(_vector(1.0, 0.11), intent="ELIGIBILITY")["answer"] == "eligibility answer"
+    assert cache.lookup(_vector(1.0, 0.11), intent="BENEFITS")["answer"] == "benefits answer"
+
+
+def test_dissimilar_query_misses(cache):
+    cache.store(_vector(1.0, 0.0), _response("ELIGIBILITY", "answer"))
+
+    assert cache.lookup(_vector(0.0, 1.0), intent="ELIGIBILITY") is None
+
@@ -0,0 +1,83 @@
+"""Unit tests for src/sparse_vectors.py"""
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("mmh3")
+
+from src import sparse_vectors
+from src.sparse_vectors import (
+    bm25_document_text, document_sparse_vector, query_sparse_vector, server_sparse_available
+)
+import config
+
+
+def _collection_info(sparse_vectors):
+    return SimpleNamespace(config=SimpleNamespace(params=SimpleNamespace(sparse_vectors=sparse_vectors)))
+
+
+class _Client:
+    def __init__(self, info=None, error=None):
+        self.info = info
+        self.error = error
+
+    def get_collection(self, collection_name):
+        if self.error:
+            raise self.error
+        return self.info
+
+
+def test_document_text_joins_scheme_theme_and_text():
+    payload = {"scheme_name": "PMEGP", "theme": "benefits", "text": "25% subsidy"}
+
+    assert bm25_document_text(payload) == "PMEGP benefits 25% subsidy"
+    assert bm25_document_text({"text": "only text"}) == "  only text"
+
+
+def test_query_vector_has_unit_weight_per_distinct_token():
+    vector = query_sparse_vector(["pmegp", "subsidy", "pmegp"])
+
+    assert len(vector.indices) == 2
+    assert vector.indices == sorted(vector.indices)
+    assert vector.values == [1.0, 1.0]
+
+
+def test_query_and_document_share_token_indices():
+    doc = document_sparse_vector("PMEGP subsidy for women")
+    query = query_sparse_vector(["pmegp", "women"])
+
+    assert set(query.indices) <= set(doc.indices)
+
+
+def test_document_weights_saturate_with_term_frequency():
+    once = document_sparse_vector("subsidy loan")
+    twice = document_sparse_vector("subsidy subsidy")
+    index = query_sparse_vector(["subsidy"]).indices[0]
+
+    weight_once = once.values[once.indices.index(index)]
+    weight_twice = twice.values[twice.indices.index(index)]
+
+    k1, b = config.SPARSE_BM25_K1, config.SPARSE_BM25_B
+    length_norm = k1 * (1 - b + b * 2 / config.SPARSE_BM25_AVG_DOC_LEN)
+    assert weight_once == pytest.approx((k1 + 1) / (1 + length_norm))
+    assert weight_once < weight_twice < 2 * weight_once
+
+
+def test_document_vector_skips_stopwords():
+    assert document_sparse_vector("what is the").indices == []
+
+
+def test_server_sparse_disabled_by_config(monkeypatch):
+    monkeypatch.setattr(config, "SPARSE_BM25_ENABLED", False)
+    client = _Client(_collection_info({config.SPARSE_VECTOR_NAME: object()}))
+
+    assert server_sparse_available(client, "schemes") is False
+
+
+def test_server_sparse_requires_indexed_vector(monkeypatch):
+    monkeypatch.setattr(config, "SPARSE_BM25_ENABLED", True)
+    monkeypatch.setattr(sparse_vectors, "MMH3_AVAILABLE", True)
+
+    assert server_sparse_available(_Client(_collection_info({config.SPARSE_VECTOR_NAME: object()})), "c") is True
+    assert server_sparse_available(_Client(_collection_info(None)), "c") is False
+    assert server_sparse_available(_Client(error=RuntimeError("down")), "c") is False